@@ -1 +1,10 @@
 from django.contrib import admin
+
+from .models import EmbeddingCacheEntry
+
+
+@admin.register(EmbeddingCacheEntry)
+class EmbeddingCacheEntryAdmin(admin.ModelAdmin):
+    list_display = ('model', 'text_hash', 'hits', 'created_at', 'last_used_at')
+    list_filter = ('model',)
+    exclude = ('vector',)
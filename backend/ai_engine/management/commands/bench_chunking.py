@@ -0,0 +1,134 @@
+import math
+import re
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from ai_engine.services.chunking import chunk_document
+from ai_engine.services.lexical import bm25_rank
+from ai_engine.services.tokens import count_tokens
+from benchmarks.fake_openai import fake_embedding
+from benchmarks.utils import load_fixture, write_results
+
+Chunk = Tuple[str, str]  # (document id, chunk text)
+
+
+def _legacy_chunks(text: str, chunk_size: int = 800, overlap: int = 120) -> List[str]:
+    # The fixed character windows resumes were indexed with before token-aware chunking.
+    chunks: List[str] = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_size, len(text))
+        chunks.append(text[start:end])
+        if end == len(text):
+            break
+        start = max(0, end - overlap)
+    return chunks
+
+
+def _normalized(text: str) -> str:
+    return re.sub(r'\s+', ' ', text)
+
+
+def _dot(a: List[float], b: List[float]) -> float:
+    return sum(x * y for x, y in zip(a, b))
+
+
+class Command(BaseCommand):
+    help = 'Compare legacy character-window chunking with token/structure-aware chunking on a fixture corpus'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fixture', default='chunking_corpus.json')
+        parser.add_argument('--max-tokens', type=int, default=settings.CHUNK_MAX_TOKENS)
+        parser.add_argument('--dimensions', type=int, default=512, help='Size of the offline hashed embeddings')
+        parser.add_argument('--output', help='Write results as JSON to this path')
+
+    def handle(self, *args, **options):
+        corpus = load_fixture(options['fixture'])
+        documents = corpus['documents']
+        strategies = {
+            # Resumes were cut into 800/120 character windows; jobs were embedded whole.
+            'legacy': [
+                (doc['id'], chunk)
+                for doc in documents
+                for chunk in (_legacy_chunks(doc['text']) if doc['kind'] == 'resume' else [doc['text']])
+            ],
+            'token_aware': [
+                (doc['id'], chunk)
+                for doc in documents
+                for chunk in chunk_document(doc['text'], title=doc['title'], max_tokens=options['max_tokens'])
+            ],
+        }
+        source_tokens = sum(count_tokens(doc['text']) for doc in documents)
+
+        results = {}
+        for name, chunks in strategies.items():
+            embedded_tokens = sum(count_tokens(text) for _, text in chunks)
+            results[name] = {
+                'chunks': len(chunks),
+                'embedding_inputs': len(chunks),
+                'embedding_tokens': embedded_tokens,
+                'redundancy': round(embedded_tokens / source_tokens - 1, 3),
+                'max_chunk_tokens': max(count_tokens(text) for _, text in chunks),
+                'retrieval': self._retrieval(chunks, corpus['queries'], options['dimensions']),
+            }
+
+        for name, row in results.items():
+            hybrid = row['retrieval']['hybrid']
+            self.stdout.write(
+                f"{name:>12}: chunks={row['chunks']} tokens={row['embedding_tokens']} "
+                f"redundancy={row['redundancy']:.0%} intact={row['retrieval']['answer_intact']:.0%} "
+                f"hybrid r@1={hybrid['recall_at_1']:.2f} r@3={hybrid['recall_at_3']:.2f} mrr={hybrid['mrr']:.2f} "
+                f"top3_tokens={row['retrieval']['top3_context_tokens']:.0f}"
+            )
+        if options['output']:
+            write_results(
+                options['output'],
+                'chunking',
+                {'params': {'fixture': options['fixture'], 'max_tokens': options['max_tokens']}, 'strategies': results},
+            )
+
+    def _retrieval(self, chunks: List[Chunk], queries: List[Dict], dimensions: int) -> Dict:
+        texts = [text for _, text in chunks]
+        vectors = [fake_embedding(text, dimensions) for text in texts]
+        rankers = {'dense': [], 'bm25': [], 'hybrid': []}
+        intact = 0
+        top3_tokens = []
+
+        for query in queries:
+            expected = _normalized(query['expected'])
+            relevant = {
+                i for i, (doc_id, text) in enumerate(chunks)
+                if doc_id == query['doc'] and expected in _normalized(text)
+            }
+            intact += bool(relevant)
+
+            query_vector = fake_embedding(query['query'], dimensions)
+            dense = sorted(range(len(texts)), key=lambda i: _dot(query_vector, vectors[i]), reverse=True)
+            lexical_scores = bm25_rank(query['query'], texts)
+            lexical = sorted(range(len(texts)), key=lambda i: lexical_scores[i], reverse=True)
+            fused_scores: Dict[int, float] = {}
+            for ranking in (dense, lexical):
+                for rank, i in enumerate(ranking, start=1):
+                    fused_scores[i] = fused_scores.get(i, 0.0) + 1 / (settings.RRF_K + rank)
+            hybrid = sorted(fused_scores, key=fused_scores.get, reverse=True)
+
+            for name, ranking in (('dense', dense), ('bm25', lexical), ('hybrid', hybrid)):
+                first = next((rank for rank, i in enumerate(ranking, start=1) if i in relevant), math.inf)
+                rankers[name].append(first)
+            top3_tokens.append(sum(count_tokens(texts[i]) for i in hybrid[:3]))
+
+        return {
+            'queries': len(queries),
+            'answer_intact': intact / len(queries),
+            'top3_context_tokens': sum(top3_tokens) / len(top3_tokens),
+            **{
+                name: {
+                    'recall_at_1': sum(rank <= 1 for rank in ranks) / len(ranks),
+                    'recall_at_3': sum(rank <= 3 for rank in ranks) / len(ranks),
+                    'mrr': round(sum(1 / rank for rank in ranks) / len(ranks), 3),
+                }
+                for name, ranks in rankers.items()
+            },
+        }
@@ -0,0 +1,146 @@
+import contextlib
+import hashlib
+import json
+import time
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from ai_engine.prompt_templates import CHAT_PROMPT
+from ai_engine.services import context_packing, openai_client
+from ai_engine.services.chunking import _fingerprint, chunk_document
+from ai_engine.services.crag import CRAGService
+from ai_engine.services.lexical import bm25_rank
+from ai_engine.services.tokens import count_tokens
+from benchmarks.fake_openai import running_fake_openai
+from benchmarks.utils import elapsed_ms, load_fixture, summarize, write_results
+
+MODES = {'unpacked': False, 'packed': True}
+
+
+def _chunks(corpus: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """The fixture chunked and described the way index_resume and index_jobs store it."""
+    chunks = []
+    for i, text in enumerate(chunk_document(corpus['resume']['text'])):
+        chunks.append({'id': f'resume-1-{i}', 'text': text, 'metadata': {'source': 'resume', 'resume_id': 1, 'idx': i}})
+    for job_id, job in enumerate(corpus['jobs'], start=1):
+        for i, text in enumerate(chunk_document(job['description'], title=f"{job['role']} at {job['company']}")):
+            chunks.append({'id': f'job-{job_id}-{i}', 'text': text, 'metadata': {'source': 'job', 'job_id': job_id, 'idx': i}})
+    for chunk in chunks:
+        chunk['metadata'].update(
+            user_id=1, content_hash=hashlib.sha256(chunk['text'].encode('utf-8')).hexdigest()
+        )
+    return chunks
+
+
+class Command(BaseCommand):
+    help = (
+        'Prompt tokens, packing time and chat answer latency of generate_answer with the retrieved '
+        'contexts sent as-is vs packed (adjacent chunks merged, overlap and metadata dropped, token budget)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fixture', default='prompt_compaction.json')
+        parser.add_argument('--top-k', type=int, default=12, help='Retrieved contexts per question')
+        parser.add_argument('--budget', type=int, default=settings.CONTEXT_MAX_TOKENS)
+        parser.add_argument('--repeat', type=int, default=3, help='LLM calls per question and mode')
+        parser.add_argument('--input-price', type=float, default=0.15, help='USD per million prompt tokens')
+        parser.add_argument('--skip-llm', action='store_true', help='Only count tokens and retained lines')
+        parser.add_argument(
+            '--fake-openai', action='store_true', help='Call a local fake OpenAI server instead of the configured API'
+        )
+        parser.add_argument('--chat-latency-ms', type=float, default=300)
+        parser.add_argument(
+            '--prefill-tokens-per-second', type=float, default=2000, help='Prompt read rate of the fake server'
+        )
+        parser.add_argument('--output', help='Write results as JSON to this path')
+
+    def handle(self, *args, **options):
+        corpus = load_fixture(options['fixture'])
+        chunks = _chunks(corpus)
+        cases = []
+        for question in corpus['questions']:
+            # A local BM25 ranking stands in for retrieval; packing only sees the ranked contexts.
+            scores = bm25_rank(question, [chunk['text'] for chunk in chunks])
+            order = sorted(range(len(chunks)), key=lambda i: -scores[i])[: options['top_k']]
+            cases.append((question, [{**chunks[i], 'distance': round(1 - scores[i] / (max(scores) or 1), 4)} for i in order]))
+
+        if options['fake_openai'] and not options['skip_llm']:
+            server = running_fake_openai(
+                chat_latency_ms=options['chat_latency_ms'],
+                prefill_tokens_per_second=options['prefill_tokens_per_second'],
+            )
+        else:
+            server = contextlib.nullcontext()
+
+        results: Dict[str, Any] = {}
+        with server as fake, override_settings(CONTEXT_MAX_TOKENS=options['budget']):
+            overrides = {'OPENAI_API_KEY': 'bench', 'OPENAI_BASE_URL': fake.base_url} if fake else {}
+            with override_settings(**overrides):
+                openai_client._forget_client()
+                try:
+                    for mode, enabled in MODES.items():
+                        with override_settings(CONTEXT_PACKING_ENABLED=enabled):
+                            results[mode] = self._run(cases, options)
+                finally:
+                    openai_client._forget_client()
+
+        summary = {}
+        for mode, rows in results.items():
+            tokens = [row['prompt_tokens'] for row in rows]
+            summary[mode] = {
+                'prompt_tokens': summarize(tokens),
+                'cost_per_1k_answers': round(sum(tokens) / len(tokens) * 1000 * options['input_price'] / 1e6, 6),
+                'contexts_sent': sum(row['contexts_sent'] for row in rows) / len(rows),
+                'line_recall': sum(row['line_recall'] for row in rows) / len(rows),
+                'pack_ms': summarize([row['pack_ms'] for row in rows]),
+            }
+            if not options['skip_llm']:
+                summary[mode]['generate_ms'] = summarize([value for row in rows for value in row['generate_ms']])
+            row = summary[mode]
+            line = (
+                f"{mode:>8}: prompt_tokens mean={row['prompt_tokens']['mean']:.0f} "
+                f"cost_per_1k=${row['cost_per_1k_answers']:.4f} contexts={row['contexts_sent']:.1f} "
+                f"line_recall={row['line_recall']:.2f} pack p50={row['pack_ms']['p50']:.2f}ms"
+            )
+            if 'generate_ms' in row:
+                line += f" generate p50={row['generate_ms']['p50']:.0f}ms p95={row['generate_ms']['p95']:.0f}ms"
+            self.stdout.write(line)
+
+        if options['output']:
+            params = {
+                key: options[key] for key in ('top_k', 'budget', 'repeat', 'input_price', 'fake_openai', 'skip_llm')
+            }
+            write_results(options['output'], 'context_packing', {'params': params, 'summary': summary, 'questions': results})
+
+    def _run(self, cases, options) -> List[Dict[str, Any]]:
+        model = settings.OPENAI_MODEL
+        rows = []
+        for question, contexts in cases:
+            started = time.perf_counter()
+            sent = context_packing.prompt_contexts(contexts, 'chat')
+            pack_ms = elapsed_ms(started)
+            user_message = json.dumps({'question': question, 'contexts': sent})
+            # Share of the distinct retrieved lines that reach the model; repeats folded by packing still count.
+            retrieved = {_fingerprint(line) for context in contexts for line in context['text'].splitlines()}
+            delivered = {_fingerprint(line) for context in sent for line in context['text'].splitlines()}
+            row = {
+                'question': question,
+                'prompt_tokens': count_tokens(CHAT_PROMPT, model) + count_tokens(user_message, model),
+                'contexts_sent': len(sent),
+                'line_recall': len(retrieved & delivered) / (len(retrieved) or 1),
+                'pack_ms': round(pack_ms, 3),
+            }
+            if not options['skip_llm']:
+                timings = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    data = CRAGService().generate_answer(question=question, contexts=contexts, mode='chat')
+                    timings.append(elapsed_ms(started))
+                    if data.get('answer') == 'Generation failed. Please retry.':
+                        raise RuntimeError(f'Generation failed for {question!r}')
+                row['generate_ms'] = [round(value, 1) for value in timings]
+            rows.append(row)
+        return rows
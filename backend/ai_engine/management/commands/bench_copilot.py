@@ -0,0 +1,172 @@
+import logging
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Tuple
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+
+from ai_engine.services import openai_client, vector_store
+from ai_engine.views import CopilotViewSet
+from benchmarks.fake_openai import running_fake_openai
+from benchmarks.utils import api_client, elapsed_ms, get_bench_user, load_fixture, summarize, write_results
+from chat.models import ChatSession
+from core.timing import collect_stages
+from jobs.models import JobDescription
+from jobs.services.indexing import index_jobs
+from resumes.models import Resume
+from resumes.services import index_resume
+
+ENDPOINTS = ('analyze', 'match', 'tailor', 'chat')
+
+
+class Command(BaseCommand):
+    help = (
+        'End-to-end latency of analyze, match, tailor and chat ask against a local fake OpenAI server '
+        'and a seeded Chroma store, with p50/p95/p99 per stage at several concurrency levels'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', default='1,4,8', help='Comma-separated concurrency levels')
+        parser.add_argument('--requests', type=int, default=24, help='Requests per endpoint per concurrency level')
+        parser.add_argument('--endpoints', default=','.join(ENDPOINTS))
+        parser.add_argument('--embedding-latency-ms', type=float, default=40)
+        parser.add_argument('--chat-latency-ms', type=float, default=300)
+        parser.add_argument('--tokens-per-second', type=float, default=80)
+        parser.add_argument('--email', default='bench-copilot@example.com')
+        parser.add_argument('--output', help='Write results as JSON to this path')
+
+    def handle(self, *args, **options):
+        levels = [int(level) for level in options['concurrency'].split(',')]
+        endpoints = [name for name in options['endpoints'].split(',') if name in ENDPOINTS]
+        corpus = load_fixture('copilot_corpus.json')
+        chroma_dir = tempfile.mkdtemp(prefix='bench-chroma-')
+        # The seeded store is smaller than the retrieval depth; Chroma warns about that on every query.
+        logging.getLogger('chromadb').setLevel(logging.ERROR)
+
+        fake = running_fake_openai(
+            embedding_latency_ms=options['embedding_latency_ms'],
+            chat_latency_ms=options['chat_latency_ms'],
+            tokens_per_second=options['tokens_per_second'],
+        )
+        with fake as server, override_settings(
+            OPENAI_API_KEY='bench',
+            OPENAI_BASE_URL=server.base_url,
+            VECTOR_BACKEND='chroma',
+            CHROMA_PERSIST_DIR=chroma_dir,
+            EXACT_SEARCH_DIR=os.path.join(chroma_dir, 'exact'),
+            # Every request must reach the model; cached answers would hide the generate stage.
+            ANSWER_CACHE_ENABLED=False,
+        ), mock.patch.object(CopilotViewSet, 'throttle_classes', []):
+            # Both are process singletons; rebuild them against the fake server and the scratch store.
+            openai_client._forget_client()
+            vector_store._forget_collection()
+            try:
+                user, targets = self._seed(options['email'], corpus)
+                results: Dict[str, Any] = {}
+                for endpoint in endpoints:
+                    results[endpoint] = {}
+                    for level in levels:
+                        results[endpoint][str(level)] = self._run(user, endpoint, targets, corpus, level, options['requests'])
+                        row = results[endpoint][str(level)]
+                        self.stdout.write(
+                            f"{endpoint:>8} c={level:<3} p50={row['total_ms']['p50']:.0f}ms "
+                            f"p95={row['total_ms']['p95']:.0f}ms p99={row['total_ms']['p99']:.0f}ms "
+                            f"rps={row['throughput_rps']:.1f} errors={row['errors']} "
+                            + ' '.join(f"{stage}={stats['p50']:.0f}" for stage, stats in sorted(row['stages'].items()))
+                        )
+                calls = dict(server.calls)
+                self._cleanup(user, targets)
+            finally:
+                openai_client._forget_client()
+                vector_store._forget_collection()
+                shutil.rmtree(chroma_dir, ignore_errors=True)
+
+        results = {
+            'endpoints': results,
+            'openai_calls': calls,
+            'params': {
+                'concurrency': levels,
+                'requests': options['requests'],
+                'embedding_latency_ms': options['embedding_latency_ms'],
+                'chat_latency_ms': options['chat_latency_ms'],
+                'tokens_per_second': options['tokens_per_second'],
+            },
+        }
+        if options['output']:
+            write_results(options['output'], 'copilot_e2e', results)
+
+    def _seed(self, email: str, corpus: Dict[str, Any]) -> Tuple[Any, Dict[str, Any]]:
+        user = get_bench_user(email)
+        resume = Resume.objects.create(
+            user=user,
+            title=corpus['resume']['title'],
+            file='resumes/bench.pdf',
+            extracted_text=corpus['resume']['text'],
+            status=Resume.Status.INDEXED,
+        )
+        jobs = [JobDescription.objects.create(user=user, **job) for job in corpus['jobs']]
+        index_resume(user.id, resume.id, resume.extracted_text)
+        index_jobs(jobs)
+        session = ChatSession.objects.create(user=user, title='Benchmark')
+        return user, {'resume': resume, 'jobs': jobs, 'session': session}
+
+    def _cleanup(self, user, targets: Dict[str, Any]) -> None:
+        vector_store.delete_documents(user.id)
+        targets['session'].delete()
+        targets['resume'].delete()
+        for job in targets['jobs']:
+            job.delete()
+
+    def _request(self, user, endpoint: str, targets: Dict[str, Any], corpus: Dict[str, Any], n: int):
+        questions = corpus['questions']
+        # A per-request suffix keeps questions distinct so the embed stage is not all cache hits.
+        question = f'{questions[n % len(questions)]} (request {n})'
+        job = targets['jobs'][n % len(targets['jobs'])]
+        path, payload = {
+            'analyze': ('/api/copilot/analyze/', {'query': question, 'top_k': 8}),
+            'match': ('/api/copilot/match/', {'resume_id': targets['resume'].id, 'job_id': job.id, 'force': True}),
+            'tailor': ('/api/copilot/tailor/', {'resume_id': targets['resume'].id, 'job_id': job.id}),
+            'chat': (f"/api/chat/{targets['session'].id}/ask/", {'message': question}),
+        }[endpoint]
+
+        client = api_client(user)
+        try:
+            with collect_stages() as stages:
+                started = time.perf_counter()
+                reply = client.post(path, payload, format='json')
+                total = elapsed_ms(started)
+        finally:
+            connection.close()
+        return reply.status_code, total, {stage: sum(values) for stage, values in stages.items()}
+
+    def _run(self, user, endpoint: str, targets, corpus, level: int, count: int) -> Dict[str, Any]:
+        totals: List[float] = []
+        stages: Dict[str, List[float]] = {}
+        errors = 0
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=level) as pool:
+            replies = list(pool.map(lambda n: self._request(user, endpoint, targets, corpus, n), range(count)))
+        wall_seconds = elapsed_ms(started) / 1000
+
+        for status_code, total, request_stages in replies:
+            if status_code >= 400:
+                errors += 1
+                continue
+            totals.append(total)
+            for stage, ms in request_stages.items():
+                stages.setdefault(stage, []).append(ms)
+
+        return {
+            'requests': count,
+            'errors': errors,
+            'throughput_rps': round(count / wall_seconds, 2) if wall_seconds else 0.0,
+            'total_ms': summarize(totals),
+            'stages': {stage: summarize(values) for stage, values in stages.items()},
+        }
@@ -0,0 +1,71 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from ai_engine.services.crag import CRAGService
+from ai_engine.services.relevance import score_context_locally
+from benchmarks.utils import elapsed_ms, load_fixture, summarize, write_results
+
+# CRAG accepts a context set once it scores at or above this value.
+ACCEPT_SCORE = 7
+
+
+class Command(BaseCommand):
+    help = 'Compare latency and agreement of the local and LLM CRAG relevance scorers on a fixture set'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fixture', default='crag_scoring.json')
+        parser.add_argument('--repeat', type=int, default=50, help='Local scorer runs per case')
+        parser.add_argument('--skip-llm', action='store_true', help='Only benchmark the local scorer')
+        parser.add_argument('--output', help='Write results as JSON to this path')
+
+    def handle(self, *args, **options):
+        cases = load_fixture(options['fixture'])
+        scorers = {'local': score_context_locally}
+        if not options['skip_llm']:
+            scorers['llm'] = CRAGService().llm_score_context
+
+        scores = {name: [] for name in scorers}
+        latencies = {name: [] for name in scorers}
+        for case in cases:
+            for name, scorer in scorers.items():
+                runs = options['repeat'] if name == 'local' else 1
+                for _ in range(runs):
+                    started = time.perf_counter()
+                    result = scorer(case['question'], case['contexts'])
+                    latencies[name].append(elapsed_ms(started))
+                scores[name].append(result.relevance_score)
+
+        expected = [case['expected_score'] for case in cases]
+        results = {'cases': len(cases), 'scorers': {}}
+        for name in scorers:
+            results['scorers'][name] = {
+                'latency_ms': summarize(latencies[name]),
+                'vs_expected': self._agreement(scores[name], expected),
+                'scores': scores[name],
+            }
+        if 'llm' in scorers:
+            results['local_vs_llm'] = self._agreement(scores['local'], scores['llm'])
+
+        for name, data in results['scorers'].items():
+            self.stdout.write(
+                f"{name:>5}: p50={data['latency_ms']['p50']:.3f}ms p95={data['latency_ms']['p95']:.3f}ms "
+                f"decision_agreement={data['vs_expected']['decision_agreement']:.0%} "
+                f"mae={data['vs_expected']['mean_abs_error']:.2f}"
+            )
+        if 'local_vs_llm' in results:
+            agreement = results['local_vs_llm']
+            self.stdout.write(
+                f"local vs llm: decision_agreement={agreement['decision_agreement']:.0%} "
+                f"mae={agreement['mean_abs_error']:.2f}"
+            )
+        if options['output']:
+            write_results(options['output'], 'crag_scorer', results)
+
+    @staticmethod
+    def _agreement(actual, reference):
+        pairs = list(zip(actual, reference))
+        return {
+            'decision_agreement': sum((a >= ACCEPT_SCORE) == (r >= ACCEPT_SCORE) for a, r in pairs) / len(pairs),
+            'mean_abs_error': sum(abs(a - r) for a, r in pairs) / len(pairs),
+        }
@@ -0,0 +1,166 @@
+import logging
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from ai_engine.services import chroma_store, exact_index
+from benchmarks.synthetic_vectors import clustered_vectors
+from benchmarks.utils import elapsed_ms, summarize, write_results
+
+USER_ID = 1
+
+
+def _disk_bytes(path: str) -> int:
+    return sum(file.stat().st_size for file in Path(path).rglob('*') if file.is_file())
+
+
+def _shorten(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    # What the embeddings API does for `dimensions`: keep the leading components, re-normalize.
+    short = vectors[:, :dimensions]
+    return short / np.linalg.norm(short, axis=1, keepdims=True)
+
+
+class Command(BaseCommand):
+    help = (
+        'Disk size, scanned memory, query latency and recall@k of shortened embeddings stored in Chroma '
+        'and in the exact index as float32, int8 or binary with full-precision re-ranking'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunks', type=int, default=5000, help='Chunks in the benchmarked user corpus')
+        parser.add_argument('--full-dimensions', type=int, default=1536)
+        parser.add_argument('--dimensions', default='1536,512,256', help='Comma-separated shortened widths')
+        parser.add_argument('--quantizations', default=','.join(exact_index.QUANTIZATIONS))
+        parser.add_argument('--rerank-factor', type=int, default=settings.VECTOR_RERANK_FACTOR)
+        parser.add_argument('--decay', type=float, default=0.5, help='Signal decay across dimensions')
+        parser.add_argument('--queries', type=int, default=100)
+        parser.add_argument('--top-k', type=int, default=8)
+        parser.add_argument('--seed', type=int, default=7)
+        parser.add_argument('--skip-chroma', action='store_true')
+        parser.add_argument('--output', help='Write results as JSON to this path')
+
+    def handle(self, *args, **options):
+        logging.getLogger('chromadb').setLevel(logging.ERROR)
+        top_k = options['top_k']
+        corpus = clustered_vectors(
+            1, options['chunks'], options['full_dimensions'], 40, options['seed'], decay=options['decay']
+        )[0]
+        rng = np.random.default_rng(options['seed'])
+        queries = corpus[rng.integers(0, len(corpus), size=options['queries'])]
+        queries = queries + rng.normal(scale=0.05, size=queries.shape) * np.abs(queries).mean()
+        queries = (queries / np.linalg.norm(queries, axis=1, keepdims=True)).astype(np.float32)
+        # Ground truth: exact neighbours at full width and full precision.
+        truth = [set(np.argsort(-(corpus @ query))[:top_k]) for query in queries]
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for dimensions in [int(value) for value in options['dimensions'].split(',')]:
+            vectors = _shorten(corpus, dimensions).astype(np.float32)
+            short_queries = _shorten(queries, dimensions).astype(np.float32)
+            rows = results[str(dimensions)] = {}
+            with override_settings(EMBEDDING_DIMENSIONS=0 if dimensions == options['full_dimensions'] else dimensions):
+                if not options['skip_chroma']:
+                    rows['chroma'] = self._chroma(vectors, short_queries, truth, top_k)
+                for quantization in options['quantizations'].split(','):
+                    rows[quantization] = self._exact(vectors, short_queries, truth, quantization, options)
+            for name, row in rows.items():
+                self.stdout.write(
+                    f"{dimensions:>5} dims {name:>7}: disk={row['disk_bytes'] / 2**20:7.2f}MiB "
+                    f"scanned={row['scanned_bytes'] / 2**20:7.2f}MiB p50={row['query_ms']['p50']:.2f}ms "
+                    f"p95={row['query_ms']['p95']:.2f}ms recall@{top_k}={row['recall']:.3f}"
+                )
+
+        if options['output']:
+            params = {
+                key: options[key]
+                for key in ('chunks', 'full_dimensions', 'rerank_factor', 'decay', 'queries', 'top_k')
+            }
+            write_results(options['output'], 'embedding_storage', {'params': params, 'dimensions': results})
+
+    def _recall(self, found: List[List[int]], truth: List[set], top_k: int) -> float:
+        return sum(len(set(ids) & expected) for ids, expected in zip(found, truth)) / (len(truth) * top_k)
+
+    def _chroma(self, vectors: np.ndarray, queries: np.ndarray, truth: List[set], top_k: int) -> Dict[str, Any]:
+        chroma_dir = tempfile.mkdtemp(prefix='bench-chroma-')
+        with override_settings(CHROMA_PERSIST_DIR=chroma_dir, VECTOR_PARTITIONING='none'):
+            chroma_store.forget()
+            try:
+                ids = [str(i) for i in range(len(vectors))]
+                for start in range(0, len(ids), 2000):
+                    end = start + 2000
+                    chroma_store.upsert(
+                        ids[start:end],
+                        [''] * len(ids[start:end]),
+                        [{'user_id': USER_ID}] * len(ids[start:end]),
+                        vectors[start:end].tolist(),
+                    )
+                timings, found = [], []
+                for query in queries:
+                    started = time.perf_counter()
+                    hits = chroma_store.query(USER_ID, query.tolist(), top_k)
+                    timings.append(elapsed_ms(started))
+                    found.append([int(hit['id']) for hit in hits])
+                disk_bytes = _disk_bytes(chroma_dir)
+            finally:
+                chroma_store.forget()
+                shutil.rmtree(chroma_dir, ignore_errors=True)
+        return {
+            'disk_bytes': disk_bytes,
+            # The HNSW graph and vectors are held in memory whole.
+            'scanned_bytes': disk_bytes,
+            'query_ms': summarize(timings),
+            'recall': self._recall(found, truth, top_k),
+        }
+
+    def _exact(self, vectors: np.ndarray, queries: np.ndarray, truth: List[set], quantization: str, options) -> Dict[str, Any]:
+        top_k = options['top_k']
+        exact_dir = tempfile.mkdtemp(prefix='bench-exact-')
+        records = {
+            'ids': [str(i) for i in range(len(vectors))],
+            'documents': [''] * len(vectors),
+            'metadatas': [{}] * len(vectors),
+        }
+
+        def load(full: bool):
+            return {**records, 'embeddings': vectors.tolist() if full else []}
+
+        with override_settings(
+            EXACT_SEARCH_DIR=exact_dir,
+            EXACT_SEARCH_ENABLED=True,
+            EXACT_SEARCH_MAX_CHUNKS=len(vectors),
+            VECTOR_QUANTIZATION=quantization,
+            VECTOR_RERANK_FACTOR=options['rerank_factor'],
+        ):
+            try:
+                exact_index.invalidate([USER_ID])
+                exact_index.search(USER_ID, queries[0].tolist(), top_k, load)
+                _, matrix, quantized, _ = exact_index._entries[USER_ID]
+                timings, found = [], []
+                for query in queries:
+                    vector = query.tolist()
+                    started = time.perf_counter()
+                    hits = exact_index.search(USER_ID, vector, top_k, load)
+                    timings.append(elapsed_ms(started))
+                    found.append([int(hit['id']) for hit in hits])
+                disk_bytes = _disk_bytes(exact_dir)
+            finally:
+                exact_index.invalidate([USER_ID])
+                shutil.rmtree(exact_dir, ignore_errors=True)
+
+        if quantized is None:
+            scanned_bytes = matrix.nbytes
+        else:
+            # The quantized copy, plus the full-precision rows gathered for re-ranking.
+            scanned_bytes = quantized.nbytes + min(len(matrix), top_k * options['rerank_factor']) * matrix.shape[1] * 4
+        return {
+            'disk_bytes': disk_bytes,
+            'scanned_bytes': scanned_bytes,
+            'query_ms': summarize(timings),
+            'recall': self._recall(found, truth, top_k),
+        }
@@ -0,0 +1,124 @@
+import logging
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from ai_engine.services import exact_index, vector_store
+from benchmarks.synthetic_vectors import clustered_vectors
+from benchmarks.utils import elapsed_ms, summarize, write_results
+
+
+class Command(BaseCommand):
+    help = (
+        'Per-user query latency of the exact memory-mapped NumPy scan vs the ANN index across corpus '
+        'sizes, to place EXACT_SEARCH_MAX_CHUNKS at the crossover'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='50,200,1000,2000,5000,10000', help='Comma-separated chunks per user')
+        parser.add_argument('--other-users', type=int, default=2000, help='Users sharing the index with 5 chunks each')
+        parser.add_argument('--dimensions', type=int, default=1536)
+        parser.add_argument('--queries', type=int, default=100)
+        parser.add_argument('--top-k', type=int, default=8)
+        parser.add_argument('--seed', type=int, default=7)
+        parser.add_argument('--output', help='Write results as JSON to this path')
+
+    def handle(self, *args, **options):
+        sizes = [int(size) for size in options['sizes'].split(',')]
+        logging.getLogger('chromadb').setLevel(logging.ERROR)
+        chroma_dir = tempfile.mkdtemp(prefix='bench-chroma-')
+        results: Dict[str, Any] = {}
+
+        with override_settings(
+            VECTOR_BACKEND='chroma',
+            CHROMA_PERSIST_DIR=chroma_dir,
+            EXACT_SEARCH_DIR=os.path.join(chroma_dir, 'exact'),
+            EXACT_SEARCH_ENABLED=True,
+            EXACT_SEARCH_MAX_CHUNKS=max(sizes),
+        ):
+            vector_store._forget_collection()
+            backend = vector_store._backend()
+            try:
+                others = clustered_vectors(options['other_users'], 5, options['dimensions'], 40, options['seed'])
+                self._load(backend, others, first_user_id=1)
+                for size in sizes:
+                    user_id = 1_000_000 + size
+                    corpus = clustered_vectors(1, size, options['dimensions'], 40, options['seed'] + size)
+                    self._load(backend, corpus, first_user_id=user_id)
+                    results[str(size)] = self._run(backend, user_id, corpus, options)
+                    row = results[str(size)]
+                    self.stdout.write(
+                        f"{size:>6} chunks: ann p50={row['ann_ms']['p50']:.2f}ms p95={row['ann_ms']['p95']:.2f}ms "
+                        f"recall={row['ann_recall']:.3f} | exact p50={row['exact_ms']['p50']:.2f}ms "
+                        f"p95={row['exact_ms']['p95']:.2f}ms | build={row['build_ms']:.0f}ms "
+                        f"reload={row['reload_ms']:.1f}ms matrix={row['matrix_bytes'] // 1024}KiB"
+                    )
+            finally:
+                vector_store._forget_collection()
+                shutil.rmtree(chroma_dir, ignore_errors=True)
+
+        faster = [int(size) for size, row in results.items() if row['exact_ms']['p50'] < row['ann_ms']['p50']]
+        crossover = max(faster) if faster else None
+        self.stdout.write(f'Exact search is faster up to {crossover} chunks per user.')
+        if options['output']:
+            params = {key: options[key] for key in ('other_users', 'dimensions', 'queries', 'top_k')}
+            write_results(
+                options['output'], 'exact_search', {'params': params, 'sizes': results, 'exact_faster_up_to': crossover}
+            )
+
+    def _load(self, backend, corpus: np.ndarray, first_user_id: int) -> None:
+        users, docs_per_user, _ = corpus.shape
+        ids = [f'u{first_user_id + u}-{i}' for u in range(users) for i in range(docs_per_user)]
+        metadatas = [{'user_id': first_user_id + u} for u in range(users) for _ in range(docs_per_user)]
+        embeddings = corpus.reshape(len(ids), -1).tolist()
+        for start in range(0, len(ids), 2000):
+            end = start + 2000
+            backend.upsert(ids[start:end], [''] * len(ids[start:end]), metadatas[start:end], embeddings[start:end])
+
+    def _run(self, backend, user_id: int, corpus: np.ndarray, options) -> Dict[str, Any]:
+        top_k = options['top_k']
+        rng = np.random.default_rng(options['seed'])
+        queries = corpus[0, rng.integers(0, corpus.shape[1], size=options['queries'])]
+        queries = queries + rng.normal(scale=0.05, size=queries.shape)
+        queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+
+        def load(full: bool):
+            return backend.get(user_id, include_embeddings=full, include_documents=full)
+
+        # Cold: snapshot the user from the backend and write the matrix; then a reload from disk alone.
+        exact_index.invalidate([user_id])
+        started = time.perf_counter()
+        exact_index.search(user_id, queries[0].tolist(), top_k, load)
+        build_ms = elapsed_ms(started)
+        exact_index._entries.pop(user_id, None)
+        started = time.perf_counter()
+        exact_index.search(user_id, queries[0].tolist(), top_k, load)
+        reload_ms = elapsed_ms(started)
+
+        ann_ms: List[float] = []
+        exact_ms: List[float] = []
+        hits = 0
+        for query in queries:
+            vector = query.tolist()
+            started = time.perf_counter()
+            ann = backend.query(user_id, vector, top_k)
+            ann_ms.append(elapsed_ms(started))
+            started = time.perf_counter()
+            exact = exact_index.search(user_id, vector, top_k, load)
+            exact_ms.append(elapsed_ms(started))
+            hits += len({hit['id'] for hit in exact} & {hit['id'] for hit in ann})
+
+        return {
+            'ann_ms': summarize(ann_ms),
+            'exact_ms': summarize(exact_ms),
+            'ann_recall': hits / (len(queries) * min(top_k, corpus.shape[1])),
+            'build_ms': round(build_ms, 1),
+            'reload_ms': round(reload_ms, 2),
+            'matrix_bytes': exact_index._entries[user_id][1].nbytes,
+        }
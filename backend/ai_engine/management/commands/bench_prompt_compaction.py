@@ -0,0 +1,150 @@
+import contextlib
+import json
+import time
+from typing import Any, Dict, List
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from ai_engine.prompt_templates import MATCH_PROMPT
+from ai_engine.services import openai_client, prompt_compaction
+from ai_engine.services.crag import CRAGService
+from ai_engine.services.tokens import count_tokens
+from benchmarks.fake_openai import running_fake_openai
+from benchmarks.utils import elapsed_ms, load_fixture, summarize, write_results
+
+# The character cap match_resume_job applies with compaction off.
+MATCH_MAX_CHARS = 14000
+MODES = {'truncate': False, 'compact': True}
+
+
+class Command(BaseCommand):
+    help = (
+        'Prompt tokens, cost, match latency and match agreement of match_resume_job with character '
+        'truncation vs token-budgeted prompt compaction, over a fixture of job postings'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fixture', default='prompt_compaction.json')
+        parser.add_argument('--resume-budget', type=int, default=settings.PROMPT_RESUME_MAX_TOKENS)
+        parser.add_argument('--job-budget', type=int, default=settings.PROMPT_JOB_MAX_TOKENS)
+        parser.add_argument('--repeat', type=int, default=3, help='LLM calls per job and mode')
+        parser.add_argument('--input-price', type=float, default=0.15, help='USD per million prompt tokens')
+        parser.add_argument('--skip-llm', action='store_true', help='Only count tokens and keyword retention')
+        parser.add_argument(
+            '--fake-openai', action='store_true', help='Call a local fake OpenAI server instead of the configured API'
+        )
+        parser.add_argument('--chat-latency-ms', type=float, default=300)
+        parser.add_argument(
+            '--prefill-tokens-per-second', type=float, default=2000, help='Prompt read rate of the fake server'
+        )
+        parser.add_argument('--output', help='Write results as JSON to this path')
+
+    def handle(self, *args, **options):
+        corpus = load_fixture(options['fixture'])
+        resume_text = corpus['resume']['text']
+        if options['fake_openai'] and not options['skip_llm']:
+            server = running_fake_openai(
+                chat_latency_ms=options['chat_latency_ms'],
+                prefill_tokens_per_second=options['prefill_tokens_per_second'],
+            )
+        else:
+            server = contextlib.nullcontext()
+
+        results: Dict[str, Any] = {}
+        with server as fake, override_settings(
+            PROMPT_RESUME_MAX_TOKENS=options['resume_budget'], PROMPT_JOB_MAX_TOKENS=options['job_budget']
+        ):
+            overrides = {'OPENAI_API_KEY': 'bench', 'OPENAI_BASE_URL': fake.base_url} if fake else {}
+            with override_settings(**overrides):
+                openai_client._forget_client()
+                try:
+                    for mode, enabled in MODES.items():
+                        with override_settings(PROMPT_COMPACTION_ENABLED=enabled):
+                            results[mode] = self._run(resume_text, corpus['jobs'], options)
+                finally:
+                    openai_client._forget_client()
+
+        summary = self._compare(results, options)
+        for mode in MODES:
+            row = summary[mode]
+            line = (
+                f"{mode:>8}: prompt_tokens mean={row['prompt_tokens']['mean']:.0f} "
+                f"cost_per_1k=${row['cost_per_1k_matches']:.4f} keyword_recall={row['keyword_recall']:.2f} "
+                f"prepare p50={row['prepare_ms']['p50']:.2f}ms"
+            )
+            if 'match_ms' in row:
+                line += f" match p50={row['match_ms']['p50']:.0f}ms p95={row['match_ms']['p95']:.0f}ms"
+            self.stdout.write(line)
+        if 'agreement' in summary:
+            agreement = summary['agreement']
+            self.stdout.write(
+                f"compact vs truncate: score_mae={agreement['score_mae']:.1f} "
+                f"matched_keywords_jaccard={agreement['matched_keywords_jaccard']:.2f}"
+            )
+
+        if options['output']:
+            params = {
+                key: options[key]
+                for key in ('resume_budget', 'job_budget', 'repeat', 'input_price', 'fake_openai', 'skip_llm')
+            }
+            write_results(options['output'], 'prompt_compaction', {'params': params, 'summary': summary, 'jobs': results})
+
+    def _run(self, resume_text: str, jobs: List[Dict[str, Any]], options) -> List[Dict[str, Any]]:
+        model = settings.OPENAI_MODEL
+        rows = []
+        for job in jobs:
+            started = time.perf_counter()
+            resume, job_text = prompt_compaction.compact_pair(resume_text, job['description'], 'match', MATCH_MAX_CHARS)
+            prepare_ms = elapsed_ms(started)
+            # What match_resume_job sends: the system prompt plus the JSON payload.
+            sent = json.dumps({'resume_text': resume, 'job_text': job_text})
+            row = {
+                'company': job['company'],
+                'prompt_tokens': count_tokens(MATCH_PROMPT, model) + count_tokens(sent, model),
+                'prepare_ms': round(prepare_ms, 3),
+                'keyword_recall': sum(k.lower() in job_text.lower() for k in job['keywords']) / len(job['keywords']),
+            }
+            if not options['skip_llm']:
+                timings, scores, keywords = [], [], set()
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    data = CRAGService().match_resume_job(resume_text=resume_text, job_text=job['description'])
+                    timings.append(elapsed_ms(started))
+                    if data.get('failed'):
+                        raise RuntimeError(f"Match failed for {job['company']}")
+                    scores.append(float(data['match_score']))
+                    keywords |= {str(keyword).lower() for keyword in data['matched_keywords']}
+                row.update(
+                    match_ms=[round(value, 1) for value in timings],
+                    match_score=sum(scores) / len(scores),
+                    matched_keywords=sorted(keywords),
+                )
+            rows.append(row)
+        return rows
+
+    def _compare(self, results: Dict[str, List[Dict[str, Any]]], options) -> Dict[str, Any]:
+        summary: Dict[str, Any] = {}
+        for mode, rows in results.items():
+            tokens = [row['prompt_tokens'] for row in rows]
+            summary[mode] = {
+                'prompt_tokens': summarize(tokens),
+                'cost_per_1k_matches': round(sum(tokens) / len(tokens) * 1000 * options['input_price'] / 1e6, 6),
+                'keyword_recall': sum(row['keyword_recall'] for row in rows) / len(rows),
+                'prepare_ms': summarize([row['prepare_ms'] for row in rows]),
+            }
+            if not options['skip_llm']:
+                summary[mode]['match_ms'] = summarize([value for row in rows for value in row['match_ms']])
+        if not options['skip_llm']:
+            pairs = list(zip(results['truncate'], results['compact']))
+            jaccard = [
+                len(set(a['matched_keywords']) & set(b['matched_keywords']))
+                / (len(set(a['matched_keywords']) | set(b['matched_keywords'])) or 1)
+                for a, b in pairs
+            ]
+            summary['agreement'] = {
+                'score_mae': sum(abs(a['match_score'] - b['match_score']) for a, b in pairs) / len(pairs),
+                'matched_keywords_jaccard': sum(jaccard) / len(jaccard),
+            }
+        return summary
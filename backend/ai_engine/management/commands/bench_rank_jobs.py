@@ -0,0 +1,98 @@
+import logging
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Dict, List
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from ai_engine.services import exact_index, vector_store
+from benchmarks.synthetic_vectors import clustered_vectors
+from benchmarks.utils import api_client, elapsed_ms, get_bench_user, summarize, write_results
+from jobs.models import JobDescription
+from resumes.models import Resume
+
+
+class Command(BaseCommand):
+    help = 'Latency of /api/copilot/rank-jobs/ over synthetic stored vectors, with and without the exact-search matrix'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', default='100,500,1000', help='Comma-separated job counts')
+        parser.add_argument('--chunks-per-job', type=int, default=3)
+        parser.add_argument('--resume-chunks', type=int, default=6)
+        parser.add_argument('--dimensions', type=int, default=1536)
+        parser.add_argument('--requests', type=int, default=30)
+        parser.add_argument('--email', default='bench-rank@example.com')
+        parser.add_argument('--seed', type=int, default=7)
+        parser.add_argument('--output', help='Write results as JSON to this path')
+
+    def handle(self, *args, **options):
+        logging.getLogger('chromadb').setLevel(logging.ERROR)
+        user = get_bench_user(options['email'])
+        client = api_client(user)
+        chroma_dir = tempfile.mkdtemp(prefix='bench-chroma-')
+        results: Dict[str, Any] = {}
+
+        with override_settings(
+            VECTOR_BACKEND='chroma',
+            CHROMA_PERSIST_DIR=chroma_dir,
+            EXACT_SEARCH_DIR=os.path.join(chroma_dir, 'exact'),
+            EXACT_SEARCH_MAX_CHUNKS=100_000,
+        ):
+            vector_store._forget_collection()
+            resume = Resume.objects.create(user=user, title='Benchmark', file='resumes/bench.pdf', extracted_text='-')
+            try:
+                for count in [int(value) for value in options['jobs'].split(',')]:
+                    jobs = self._seed(user, resume, count, options)
+                    rows = results[str(count)] = {}
+                    for mode, enabled in (('exact_matrix', True), ('backend_get', False)):
+                        with override_settings(EXACT_SEARCH_ENABLED=enabled):
+                            rows[mode] = self._measure(client, resume, options['requests'])
+                        self.stdout.write(
+                            f"{count:>6} jobs {mode:>12}: first={rows[mode]['first_ms']:.1f}ms "
+                            f"p50={rows[mode]['request_ms']['p50']:.2f}ms p95={rows[mode]['request_ms']['p95']:.2f}ms"
+                        )
+                    vector_store.delete_documents(user.id, where={'source': 'job'})
+                    JobDescription.objects.filter(id__in=[job.id for job in jobs]).delete()
+            finally:
+                vector_store.delete_documents(user.id)
+                resume.delete()
+                vector_store._forget_collection()
+                shutil.rmtree(chroma_dir, ignore_errors=True)
+
+        if options['output']:
+            params = {key: options[key] for key in ('chunks_per_job', 'resume_chunks', 'dimensions', 'requests')}
+            write_results(options['output'], 'rank_jobs', {'params': params, 'jobs': results})
+
+    def _seed(self, user, resume, count: int, options) -> List[JobDescription]:
+        jobs = JobDescription.objects.bulk_create(
+            [JobDescription(user=user, role=f'Role {i}', company='Bench', description='-') for i in range(count)]
+        )
+        per_job = options['chunks_per_job']
+        vectors = clustered_vectors(1, options['resume_chunks'] + count * per_job, options['dimensions'], 40, options['seed'])[0]
+        ids = [f'resume-{resume.id}-{i}' for i in range(options['resume_chunks'])]
+        metadatas = [{'user_id': user.id, 'source': 'resume', 'resume_id': resume.id, 'idx': i} for i in range(options['resume_chunks'])]
+        for job in jobs:
+            ids += [f'job-{job.id}-{i}' for i in range(per_job)]
+            metadatas += [{'user_id': user.id, 'source': 'job', 'job_id': job.id, 'idx': i} for i in range(per_job)]
+        # Stored straight into the backend: the benchmark measures ranking, not embedding.
+        backend = vector_store._backend()
+        for start in range(0, len(ids), 2000):
+            end = start + 2000
+            backend.upsert(ids[start:end], [''] * len(ids[start:end]), metadatas[start:end], vectors[start:end].tolist())
+        exact_index.invalidate([user.id])
+        return jobs
+
+    def _measure(self, client, resume, requests: int) -> Dict[str, Any]:
+        exact_index.invalidate([resume.user_id])
+        timings: List[float] = []
+        for _ in range(requests + 1):
+            started = time.perf_counter()
+            response = client.post('/api/copilot/rank-jobs/', {'resume_id': resume.id, 'limit': 20}, format='json')
+            timings.append(elapsed_ms(started))
+            if response.status_code != 200:
+                raise RuntimeError(f'rank-jobs returned {response.status_code}: {response.content[:200]!r}')
+        # The first request builds the exact-search matrix (or is simply the first backend read).
+        return {'first_ms': round(timings[0], 1), 'request_ms': summarize(timings[1:])}
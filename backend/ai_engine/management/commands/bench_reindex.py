@@ -0,0 +1,139 @@
+import logging
+import os
+import shutil
+import tempfile
+import time
+from typing import Any, Callable, Dict, List
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from ai_engine.services import openai_client, vector_store
+from ai_engine.services.chunking import chunk_document
+from benchmarks.fake_openai import running_fake_openai
+from benchmarks.utils import elapsed_ms, get_bench_user, load_fixture, summarize, write_results
+from resumes.services import index_resume
+
+
+def _edit_bullet(text: str) -> str:
+    lines = text.splitlines()
+    i = next(i for i, line in enumerate(lines) if line.startswith('- '))
+    lines[i] = lines[i].rstrip('.') + ', and mentored two junior engineers.'
+    return '\n'.join(lines)
+
+
+def _append_bullet(text: str) -> str:
+    return text + '\n- Speaker at two regional engineering meetups on on-call health.'
+
+
+def _prepend_section(text: str) -> str:
+    # Shifts every later chunk one position, so positional ids all see new text.
+    name, rest = text.split('\n', 1)
+    return f'{name}\nHIGHLIGHTS\n- Open-source maintainer with 2k GitHub stars across three projects.\n{rest}'
+
+
+def _drop_last_section(text: str) -> str:
+    lines = text.rstrip().splitlines()
+    return '\n'.join(lines[: len(lines) * 3 // 4])
+
+
+SCENARIOS: Dict[str, Callable[[str], str]] = {
+    'unchanged': lambda text: text,
+    'edit_bullet': _edit_bullet,
+    'append_bullet': _append_bullet,
+    'prepend_section': _prepend_section,
+    'drop_last_section': _drop_last_section,
+}
+
+
+class Command(BaseCommand):
+    help = 'Embedding work and latency of re-indexing edited resumes: delete-and-upsert vs the content-hash diff'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fixture', default='chunking_corpus.json')
+        parser.add_argument('--embedding-latency-ms', type=float, default=40)
+        parser.add_argument('--email', default='bench-reindex@example.com')
+        parser.add_argument('--output', help='Write results as JSON to this path')
+
+    def handle(self, *args, **options):
+        resumes = [doc['text'] for doc in load_fixture(options['fixture'])['documents'] if doc['kind'] == 'resume']
+        chroma_dir = tempfile.mkdtemp(prefix='bench-chroma-')
+        logging.getLogger('chromadb').setLevel(logging.ERROR)
+        embedded: List[int] = []
+        embed = vector_store._embed
+
+        def counting_embed(texts):
+            embedded.append(len(texts))
+            return embed(texts)
+
+        with running_fake_openai(embedding_latency_ms=options['embedding_latency_ms']) as server, override_settings(
+            OPENAI_API_KEY='bench',
+            OPENAI_BASE_URL=server.base_url,
+            VECTOR_BACKEND='chroma',
+            CHROMA_PERSIST_DIR=chroma_dir,
+            EXACT_SEARCH_DIR=os.path.join(chroma_dir, 'exact'),
+            # The cache would hide re-embedding in both modes; this measures what reaches the API.
+            EMBEDDING_CACHE_ENABLED=False,
+        ), mock.patch.object(vector_store, '_embed', counting_embed):
+            openai_client._forget_client()
+            vector_store._forget_collection()
+            user = get_bench_user(options['email'])
+            try:
+                results = {
+                    scenario: {
+                        mode: self._run(user.id, resumes, edit, reindex, embedded)
+                        for mode, reindex in (('full', self._full), ('diff', index_resume))
+                    }
+                    for scenario, edit in SCENARIOS.items()
+                }
+            finally:
+                vector_store.delete_documents(user.id)
+                openai_client._forget_client()
+                vector_store._forget_collection()
+                shutil.rmtree(chroma_dir, ignore_errors=True)
+
+        for scenario, modes in results.items():
+            self.stdout.write(
+                f'{scenario:>18}: '
+                + ' '.join(
+                    f"{mode}: embedded={row['embedded']}/{row['chunks']} p50={row['reindex_ms']['p50']:.0f}ms "
+                    f"stale={row['stale']}"
+                    for mode, row in modes.items()
+                )
+            )
+        if options['output']:
+            write_results(
+                options['output'],
+                'reindex',
+                {'params': {'fixture': options['fixture'], 'embedding_latency_ms': options['embedding_latency_ms']},
+                 'scenarios': results},
+            )
+
+    def _full(self, user_id: int, resume_id: int, text: str) -> None:
+        # What re-indexing cost before the diff: drop everything, embed every chunk again.
+        chunks = chunk_document(text)
+        vector_store.delete_documents(user_id, where={'resume_id': resume_id})
+        vector_store.upsert_documents(
+            ids=[f'resume-{resume_id}-{i}' for i in range(len(chunks))],
+            documents=chunks,
+            metadatas=[{'user_id': user_id, 'source': 'resume', 'resume_id': resume_id, 'idx': i} for i in range(len(chunks))],
+        )
+
+    def _run(self, user_id: int, resumes: List[str], edit, reindex, embedded: List[int]) -> Dict[str, Any]:
+        timings, chunks, embedded_total, stale = [], 0, 0, 0
+        for resume_id, text in enumerate(resumes, start=1):
+            index_resume(user_id, resume_id, text)
+            edited = edit(text)
+            mark = sum(embedded)
+            started = time.perf_counter()
+            reindex(user_id, resume_id, edited)
+            timings.append(elapsed_ms(started))
+            embedded_total += sum(embedded) - mark
+
+            expected = {f'resume-{resume_id}-{i}' for i in range(len(chunk_document(edited)))}
+            stored = vector_store.document_ids(user_id, {'resume_id': resume_id})
+            chunks += len(expected)
+            stale += len(set(stored) - expected)
+            vector_store.delete_documents(user_id, where={'resume_id': resume_id})
+        return {'chunks': chunks, 'embedded': embedded_total, 'stale': stale, 'reindex_ms': summarize(timings)}
@@ -0,0 +1,124 @@
+import logging
+import shutil
+import tempfile
+import time
+from typing import Any, Dict
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import override_settings
+
+from ai_engine.services import chroma_store, pgvector_store
+from benchmarks.synthetic_vectors import clustered_vectors, noisy_queries
+from benchmarks.utils import elapsed_ms, summarize, write_results
+
+BENCH_TABLE = 'bench_vector_document'
+
+
+class Command(BaseCommand):
+    help = 'Build time, query latency and recall of the Chroma and pgvector backends on the same synthetic corpus'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', default='1000,10000', help='Comma-separated user counts')
+        parser.add_argument('--docs-per-user', type=int, default=5)
+        parser.add_argument('--dimensions', type=int, default=64)
+        parser.add_argument('--topics', type=int, default=40)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--top-k', type=int, default=3)
+        parser.add_argument('--ef-search', type=int, default=settings.PGVECTOR_EF_SEARCH)
+        parser.add_argument('--exact-max-rows', type=int, default=settings.PGVECTOR_EXACT_MAX_ROWS)
+        parser.add_argument('--seed', type=int, default=7)
+        parser.add_argument('--output', help='Write results as JSON to this path')
+
+    def handle(self, *args, **options):
+        user_counts = [int(users) for users in options['users'].split(',')]
+        logging.getLogger('chromadb').setLevel(logging.ERROR)
+        if connection.vendor != 'postgresql':
+            self.stderr.write('DATABASE_URL is not Postgres; only the Chroma backend will be measured.')
+
+        results: Dict[str, Dict[str, Any]] = {}
+        for users in user_counts:
+            corpus = clustered_vectors(
+                users, options['docs_per_user'], options['dimensions'], options['topics'], options['seed']
+            )
+            query_users, queries = noisy_queries(corpus, options['queries'], options['seed'] + users)
+            rows = results[str(users)] = {'chroma': self._chroma(corpus, query_users, queries, options)}
+            if connection.vendor == 'postgresql':
+                rows.update(self._pgvector(corpus, query_users, queries, options))
+            for backend, row in rows.items():
+                self.stdout.write(
+                    f"{users:>7} users {backend:>16}: build={row['build_seconds']:.1f}s "
+                    f"p50={row['query_ms']['p50']:.2f}ms p95={row['query_ms']['p95']:.2f}ms "
+                    f"p99={row['query_ms']['p99']:.2f}ms recall@{options['top_k']}={row['recall']:.3f} "
+                    f"short_results={row['short_results']}"
+                )
+
+        if options['output']:
+            keys = ('docs_per_user', 'dimensions', 'topics', 'queries', 'top_k', 'ef_search', 'exact_max_rows')
+            params = {key: options[key] for key in keys}
+            params['partitioning'] = settings.VECTOR_PARTITIONING
+            write_results(options['output'], 'vector_backends', {'params': params, 'users': results})
+
+    def _rows(self, corpus: np.ndarray):
+        users, docs_per_user, _ = corpus.shape
+        ids = [f'u{user_id}-{i}' for user_id in range(users) for i in range(docs_per_user)]
+        metadatas = [{'user_id': user_id} for user_id in range(users) for _ in range(docs_per_user)]
+        documents = [''] * len(ids)
+        return ids, documents, metadatas, corpus.reshape(len(ids), -1).tolist()
+
+    def _load(self, backend, corpus: np.ndarray) -> float:
+        ids, documents, metadatas, embeddings = self._rows(corpus)
+        started = time.perf_counter()
+        for start in range(0, len(ids), 5000):
+            end = start + 5000
+            backend.upsert(ids[start:end], documents[start:end], metadatas[start:end], embeddings[start:end])
+        return elapsed_ms(started) / 1000
+
+    def _measure(self, backend, corpus: np.ndarray, query_users, queries: np.ndarray, top_k: int) -> Dict[str, Any]:
+        timings, hits, short = [], 0, 0
+        for user_id, query in zip(query_users, queries):
+            # Ground truth: exact neighbours among this user's own vectors.
+            exact = np.argsort(np.linalg.norm(corpus[user_id] - query, axis=1))[:top_k]
+            expected = {f'u{user_id}-{i}' for i in exact}
+            started = time.perf_counter()
+            found = backend.query(int(user_id), query.tolist(), top_k)
+            timings.append(elapsed_ms(started))
+            hits += len(expected & {hit['id'] for hit in found})
+            short += len(found) < top_k
+        return {'query_ms': summarize(timings), 'recall': hits / (len(query_users) * top_k), 'short_results': short}
+
+    def _chroma(self, corpus: np.ndarray, query_users, queries: np.ndarray, options) -> Dict[str, Any]:
+        chroma_dir = tempfile.mkdtemp(prefix='bench-chroma-')
+        with override_settings(CHROMA_PERSIST_DIR=chroma_dir):
+            chroma_store.forget()
+            try:
+                build_seconds = self._load(chroma_store, corpus)
+                row = self._measure(chroma_store, corpus, query_users, queries, options['top_k'])
+            finally:
+                chroma_store.forget()
+                shutil.rmtree(chroma_dir, ignore_errors=True)
+        return {'build_seconds': round(build_seconds, 2), **row}
+
+    def _pgvector(self, corpus: np.ndarray, query_users, queries: np.ndarray, options) -> Dict[str, Dict[str, Any]]:
+        results = {}
+        with override_settings(PGVECTOR_TABLE=BENCH_TABLE, PGVECTOR_EF_SEARCH=options['ef_search']):
+            self._drop_table()
+            try:
+                build_seconds = round(self._load(pgvector_store, corpus), 2)
+                with connection.cursor() as cursor:
+                    cursor.execute(f'ANALYZE {pgvector_store._table()}')
+                # pgvector_exact ranks every user's rows exactly; pgvector picks HNSW or exact per user.
+                for mode, max_rows in (('pgvector_exact', len(corpus[0])), ('pgvector', options['exact_max_rows'])):
+                    with override_settings(PGVECTOR_EXACT_MAX_ROWS=max_rows):
+                        row = self._measure(pgvector_store, corpus, query_users, queries, options['top_k'])
+                    results[mode] = {'build_seconds': build_seconds, **row}
+            finally:
+                self._drop_table()
+        return results
+
+    def _drop_table(self) -> None:
+        with connection.cursor() as cursor:
+            cursor.execute(f'DROP TABLE IF EXISTS {pgvector_store._table()}')
+        pgvector_store.forget()
@@ -0,0 +1,118 @@
+import logging
+import shutil
+import tempfile
+import time
+from collections import defaultdict
+from typing import Any, Dict, List
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from ai_engine.services import chroma_store
+from benchmarks.synthetic_vectors import clustered_vectors, noisy_queries
+from benchmarks.utils import elapsed_ms, summarize, write_results
+
+LAYOUTS = ('none', 'bucket', 'user')
+
+
+class Command(BaseCommand):
+    help = (
+        'Query latency and recall of the shared collection vs bucket and per-user collections '
+        'on synthetic vectors at several user counts'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', default='1000,10000,100000', help='Comma-separated user counts')
+        parser.add_argument('--layouts', default=','.join(LAYOUTS))
+        parser.add_argument('--buckets', type=int, default=64)
+        parser.add_argument('--docs-per-user', type=int, default=5)
+        parser.add_argument('--dimensions', type=int, default=64)
+        parser.add_argument('--topics', type=int, default=40)
+        parser.add_argument('--queries', type=int, default=200)
+        parser.add_argument('--top-k', type=int, default=3)
+        parser.add_argument(
+            '--max-user-collections',
+            type=int,
+            default=10000,
+            help="Skip the 'user' layout above this many users; every collection costs disk and open files",
+        )
+        parser.add_argument('--seed', type=int, default=7)
+        parser.add_argument('--output', help='Write results as JSON to this path')
+
+    def handle(self, *args, **options):
+        user_counts = [int(users) for users in options['users'].split(',')]
+        layouts = [layout for layout in options['layouts'].split(',') if layout in LAYOUTS]
+        logging.getLogger('chromadb').setLevel(logging.ERROR)
+        results: Dict[str, Dict[str, Any]] = {}
+
+        for users in user_counts:
+            corpus = clustered_vectors(
+                users, options['docs_per_user'], options['dimensions'], options['topics'], options['seed']
+            )
+            query_users, queries = noisy_queries(corpus, options['queries'], options['seed'] + users)
+
+            results[str(users)] = {}
+            for layout in layouts:
+                if layout == 'user' and users > options['max_user_collections']:
+                    results[str(users)][layout] = {'skipped': f"more than {options['max_user_collections']} users"}
+                    self.stdout.write(f'{users:>7} users {layout:>6}: skipped')
+                    continue
+                row = self._run(layout, corpus, query_users, queries, options)
+                results[str(users)][layout] = row
+                self.stdout.write(
+                    f"{users:>7} users {layout:>6}: build={row['build_seconds']:.1f}s "
+                    f"p50={row['query_ms']['p50']:.2f}ms p95={row['query_ms']['p95']:.2f}ms "
+                    f"p99={row['query_ms']['p99']:.2f}ms recall@{options['top_k']}={row['recall']:.3f} "
+                    f"collections={row['collections']}"
+                )
+
+        if options['output']:
+            params = {key: options[key] for key in ('buckets', 'docs_per_user', 'dimensions', 'topics', 'queries', 'top_k')}
+            write_results(options['output'], 'vector_partitioning', {'params': params, 'users': results})
+
+    def _run(self, layout: str, corpus: np.ndarray, query_users, queries: np.ndarray, options) -> Dict[str, Any]:
+        chroma_dir = tempfile.mkdtemp(prefix='bench-chroma-')
+        users, docs_per_user, _ = corpus.shape
+        top_k = options['top_k']
+        with override_settings(
+            CHROMA_PERSIST_DIR=chroma_dir, VECTOR_PARTITIONING=layout, VECTOR_BUCKETS=options['buckets']
+        ):
+            chroma_store.forget()
+            try:
+                started = time.perf_counter()
+                by_collection: Dict[str, List[int]] = defaultdict(list)
+                for user_id in range(users):
+                    by_collection[chroma_store.collection_name(user_id)].append(user_id)
+                batch_size = chroma_store._get_client().get_max_batch_size()
+                for name, user_ids in by_collection.items():
+                    collection = chroma_store._get_collection(name)
+                    rows = [(user_id, i) for user_id in user_ids for i in range(docs_per_user)]
+                    for start in range(0, len(rows), batch_size):
+                        batch = rows[start:start + batch_size]
+                        collection.add(
+                            ids=[f'u{user_id}-{i}' for user_id, i in batch],
+                            embeddings=[corpus[user_id, i].tolist() for user_id, i in batch],
+                            metadatas=[{'user_id': int(user_id)} for user_id, _ in batch],
+                        )
+                build_seconds = elapsed_ms(started) / 1000
+
+                timings, hits = [], 0
+                for user_id, query in zip(query_users, queries):
+                    # Ground truth: exact L2 neighbours among this user's own vectors.
+                    exact = np.argsort(np.linalg.norm(corpus[user_id] - query, axis=1))[:top_k]
+                    expected = {f'u{user_id}-{i}' for i in exact}
+                    started = time.perf_counter()
+                    found = chroma_store.query(int(user_id), query.tolist(), top_k)
+                    timings.append(elapsed_ms(started))
+                    hits += len(expected & {hit['id'] for hit in found})
+            finally:
+                chroma_store.forget()
+                shutil.rmtree(chroma_dir, ignore_errors=True)
+
+        return {
+            'build_seconds': round(build_seconds, 2),
+            'collections': len(by_collection),
+            'query_ms': summarize(timings),
+            'recall': hits / (len(query_users) * top_k),
+        }
@@ -0,0 +1,31 @@
+from importlib import import_module
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ai_engine.services.vector_store import BACKENDS
+
+
+class Command(BaseCommand):
+    help = 'Copy every stored chunk and its embedding from one vector backend to another, without re-embedding'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', choices=sorted(BACKENDS), required=True)
+        parser.add_argument('--target', choices=sorted(BACKENDS), required=True)
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        if options['source'] == options['target']:
+            raise CommandError('Source and target backends must differ.')
+        source = import_module(BACKENDS[options['source']])
+        target = import_module(BACKENDS[options['target']])
+
+        copied = 0
+        # Upserts by chunk id, so an interrupted copy can simply be started again.
+        for page in source.iter_documents(batch_size=options['batch_size'], include_embeddings=True):
+            target.upsert(page['ids'], page['documents'], page['metadatas'], page['embeddings'])
+            copied += len(page['ids'])
+            self.stdout.write(f'Copied {copied} chunks...')
+        self.stdout.write(
+            f"Copied {copied} chunks from {options['source']} to {options['target']}; "
+            f"set VECTOR_BACKEND={options['target']} to serve from it."
+        )
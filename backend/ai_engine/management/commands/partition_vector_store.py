@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from ai_engine.services import chroma_store
+
+
+class Command(BaseCommand):
+    help = (
+        'Copy vectors from the shared career_copilot collection into the partitions selected by '
+        'VECTOR_PARTITIONING, reusing stored embeddings'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument(
+            '--delete-source', action='store_true', help='Drop the shared collection once every vector is copied'
+        )
+
+    def handle(self, *args, **options):
+        if settings.VECTOR_PARTITIONING == 'none':
+            raise CommandError("Set VECTOR_PARTITIONING to 'bucket' or 'user' before partitioning the store.")
+
+        client = chroma_store._get_client()
+        if chroma_store.base_name() not in {collection.name for collection in client.list_collections()}:
+            self.stdout.write('No shared collection to partition.')
+            return
+
+        source = chroma_store._get_collection(chroma_store.base_name())
+        copied = 0
+        partitions = set()
+        offset = 0
+        # Copying is an upsert by chunk id, so an interrupted run can simply be started again.
+        while True:
+            page = source.get(
+                include=['documents', 'metadatas', 'embeddings'], limit=options['batch_size'], offset=offset
+            )
+            if not page['ids']:
+                break
+            chroma_store.upsert(
+                page['ids'], page['documents'], page['metadatas'], [list(vector) for vector in page['embeddings']]
+            )
+            partitions.update(chroma_store.collection_name(metadata['user_id']) for metadata in page['metadatas'])
+            copied += len(page['ids'])
+            offset += len(page['ids'])
+            self.stdout.write(f'Copied {copied} vectors into {len(partitions)} collections...')
+
+        if options['delete_source']:
+            client.delete_collection(chroma_store.base_name())
+            chroma_store._collections.pop(chroma_store.base_name(), None)
+        self.stdout.write(
+            f"Partitioned {copied} vectors into {len(partitions)} '{settings.VECTOR_PARTITIONING}' collections"
+            + (' and dropped the shared collection.' if options['delete_source'] else '.')
+        )
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from ai_engine.models import LexicalDocument
+from ai_engine.services import lexical_index
+from ai_engine.services.vector_store import iter_documents
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the BM25 lexical index from the chunks stored in the vector store'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        LexicalDocument.objects.all().delete()
+        total = 0
+        for ids, documents, metadatas in iter_documents(batch_size=options['batch_size']):
+            lexical_index.index_documents(ids, documents, metadatas)
+            total += len(ids)
+        self.stdout.write(f'Indexed {total} chunks.')
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from ai_engine.services.embedding_cache import embedding_key
+from jobs.models import JobDescription
+from jobs.services.indexing import index_jobs
+from resumes.models import Resume
+from resumes.services import index_resume
+
+
+class Command(BaseCommand):
+    help = (
+        'Index every extracted resume and job description into the configured vector store, embedding '
+        'only chunks it lacks; run after changing OPENAI_EMBEDDING_MODEL or EMBEDDING_DIMENSIONS'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200)
+
+    def handle(self, *args, **options):
+        resumes = Resume.objects.exclude(extracted_text='').only('id', 'user_id', 'extracted_text').order_by('id')
+        indexed = 0
+        for resume in resumes.iterator(chunk_size=options['batch_size']):
+            index_resume(resume.user_id, resume.id, resume.extracted_text)
+            indexed += 1
+            if indexed % options['batch_size'] == 0:
+                self.stdout.write(f'Indexed {indexed} resumes...')
+        self.stdout.write(f'Indexed {indexed} resumes.')
+
+        # index_jobs syncs per user, so a batch costs one diff per user in it.
+        jobs = 0
+        batch = []
+        for job in JobDescription.objects.order_by('id').iterator(chunk_size=options['batch_size']):
+            batch.append(job)
+            if len(batch) == options['batch_size']:
+                jobs += index_jobs(batch)
+                batch = []
+                self.stdout.write(f'Indexed {jobs} jobs...')
+        jobs += index_jobs(batch)
+        self.stdout.write(f'Indexed {jobs} jobs with {embedding_key()} embeddings.')
@@ -0,0 +1,29 @@
+# Generated by Django 5.1.5 on 2026-10-18 04:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0003_analysisresult_improvement_suggestions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmbeddingCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('model', models.CharField(max_length=100)),
+                ('text_hash', models.CharField(help_text='SHA-256 of the embedded text', max_length=64)),
+                ('vector', models.BinaryField()),
+                ('hits', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['last_used_at'], name='ai_engine_e_last_us_699595_idx')],
+                'constraints': [models.UniqueConstraint(fields=('model', 'text_hash'), name='uniq_embedding_cache_key')],
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.5 on 2026-10-18 04:22
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0004_embeddingcacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LexicalDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chunk_id', models.CharField(max_length=255, unique=True)),
+                ('user_id', models.BigIntegerField(db_index=True)),
+                ('text', models.TextField()),
+                ('metadata', models.JSONField(default=dict)),
+                ('length', models.PositiveIntegerField(default=0, help_text='Token count after tokenization')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='LexicalPosting',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('user_id', models.BigIntegerField()),
+                ('term', models.CharField(max_length=100)),
+                ('tf', models.PositiveIntegerField()),
+                ('document', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='postings', to='ai_engine.lexicaldocument')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user_id', 'term'], name='ai_engine_l_user_id_f2933f_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.1.5 on 2026-10-18 04:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_engine', '0005_lexicaldocument_lexicalposting'),
+        ('jobs', '0003_jobdescription_apply_url_jobdescription_location_and_more'),
+        ('resumes', '0003_resume_status'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisresult',
+            name='cover_letter_snippet',
+            field=models.TextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='analysisresult',
+            name='job_text_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='analysisresult',
+            name='model',
+            field=models.CharField(blank=True, default='', max_length=100),
+        ),
+        migrations.AddField(
+            model_name='analysisresult',
+            name='prompt_version',
+            field=models.CharField(blank=True, default='', max_length=32),
+        ),
+        migrations.AddField(
+            model_name='analysisresult',
+            name='resume_text_hash',
+            field=models.CharField(blank=True, default='', max_length=64),
+        ),
+        migrations.AddField(
+            model_name='analysisresult',
+            name='tailored_resume_bullets',
+            field=models.JSONField(default=list),
+        ),
+        migrations.AddIndex(
+            model_name='analysisresult',
+            index=models.Index(fields=['user', 'resume_text_hash', 'job_text_hash'], name='ai_engine_a_user_id_adc8c7_idx'),
+        ),
+    ]
@@ -13,11 +13,74 @@ class AnalysisResult(models.Model):
     matched_keywords = models.JSONField(default=list)
     missing_keywords = models.JSONField(default=list)
     improvement_suggestions = models.JSONField(default=list)
-    
+    tailored_resume_bullets = models.JSONField(default=list)
+    cover_letter_snippet = models.TextField(blank=True, default='')
+
+    # Identify the inputs a result was computed from so unchanged pairs can reuse it.
+    # Left blank on failed matches, which must never be served again.
+    resume_text_hash = models.CharField(max_length=64, blank=True, default='')
+    job_text_hash = models.CharField(max_length=64, blank=True, default='')
+    model = models.CharField(max_length=100, blank=True, default='')
+    prompt_version = models.CharField(max_length=32, blank=True, default='')
+
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-created_at']
+        indexes = [models.Index(fields=['user', 'resume_text_hash', 'job_text_hash'])]
 
     def __str__(self):
         return f"{self.user.email} - {self.job.title} ({self.match_score}%)"
+
+    def to_match_payload(self):
+        return {
+            'match_score': self.match_score,
+            'matched_keywords': self.matched_keywords,
+            'missing_keywords': self.missing_keywords,
+            'improvement_suggestions': self.improvement_suggestions,
+            'tailored_resume_bullets': self.tailored_resume_bullets,
+            'cover_letter_snippet': self.cover_letter_snippet,
+        }
+
+
+class EmbeddingCacheEntry(models.Model):
+    model = models.CharField(max_length=100)
+    text_hash = models.CharField(max_length=64, help_text="SHA-256 of the embedded text")
+    # float32 vector packed with array('f')
+    vector = models.BinaryField()
+    hits = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['model', 'text_hash'], name='uniq_embedding_cache_key'),
+        ]
+        indexes = [models.Index(fields=['last_used_at'])]
+
+    def __str__(self):
+        return f"{self.model}:{self.text_hash[:12]} ({self.hits} hits)"
+
+
+class LexicalDocument(models.Model):
+    """A vector-store chunk mirrored into the per-user BM25 index."""
+
+    chunk_id = models.CharField(max_length=255, unique=True)
+    user_id = models.BigIntegerField(db_index=True)
+    text = models.TextField()
+    metadata = models.JSONField(default=dict)
+    length = models.PositiveIntegerField(default=0, help_text="Token count after tokenization")
+
+    def __str__(self):
+        return self.chunk_id
+
+
+class LexicalPosting(models.Model):
+    document = models.ForeignKey(LexicalDocument, on_delete=models.CASCADE, related_name='postings')
+    user_id = models.BigIntegerField()
+    term = models.CharField(max_length=100)
+    tf = models.PositiveIntegerField()
+
+    class Meta:
+        indexes = [models.Index(fields=['user_id', 'term'])]
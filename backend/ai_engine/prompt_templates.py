@@ -1,3 +1,5 @@
+import hashlib
+
 ANALYSIS_PROMPT = """
 You are an expert ATS and career strategist.
 Given resume and job context, return strict JSON with keys:
@@ -17,6 +19,12 @@ If context is weak, clearly say what is missing and give next best guidance.
 Return strict JSON with key: answer.
 """
 
+CHAT_STREAM_PROMPT = """
+You are Career Copilot. Ground answers in provided context only.
+If context is weak, clearly say what is missing and give next best guidance.
+Answer in plain text. No JSON, no markdown headings.
+"""
+
 MATCH_PROMPT = """
 You are an ATS and recruiter screening engine.
 Compare the provided resume text and job description text.
@@ -30,3 +38,7 @@ cover_letter_snippet (string).
 No markdown.
 """
 
+
+def prompt_version(template: str) -> str:
+    """Short content hash, so editing a prompt retires everything cached under the old one."""
+    return hashlib.sha256(template.encode('utf-8')).hexdigest()[:12]
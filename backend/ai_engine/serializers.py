@@ -1,3 +1,4 @@
+from django.conf import settings
 from rest_framework import serializers
 
 
@@ -16,6 +17,23 @@ class TailorRequestSerializer(serializers.Serializer):
 class MatchRequestSerializer(serializers.Serializer):
     resume_id = serializers.IntegerField(min_value=1)
     job_id = serializers.IntegerField(min_value=1)
+    force = serializers.BooleanField(default=False, help_text='Recompute even if this resume/job content was matched before.')
+
+
+class BatchMatchRequestSerializer(serializers.Serializer):
+    resume_id = serializers.IntegerField(min_value=1)
+    job_ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1), min_length=1, max_length=settings.MATCH_BATCH_MAX_JOBS
+    )
+    force = serializers.BooleanField(default=False, help_text='Recompute even if this resume/job content was matched before.')
+
+    def validate_job_ids(self, value):
+        return list(dict.fromkeys(value))
+
+
+class RankJobsRequestSerializer(serializers.Serializer):
+    resume_id = serializers.IntegerField(min_value=1)
+    limit = serializers.IntegerField(min_value=1, max_value=1000, default=50)
 
 
 class AnalysisResultSerializer(serializers.ModelSerializer):
@@ -0,0 +1,94 @@
+import hashlib
+import json
+import logging
+import re
+import threading
+from collections import Counter
+from typing import Any, Dict, Iterable, List, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+_stats_lock = threading.Lock()
+_stats: Counter = Counter()
+
+
+def _cache():
+    return caches[settings.ANSWER_CACHE_ALIAS]
+
+
+def normalize_question(question: str) -> str:
+    return re.sub(r'\s+', ' ', question).strip().rstrip('?.!').lower()
+
+
+def context_fingerprint(contexts: List[Dict[str, Any]]) -> str:
+    digest = hashlib.sha256()
+    for context in contexts:
+        digest.update(str(context.get('id')).encode('utf-8'))
+        digest.update(b'\0')
+        digest.update((context.get('text') or '').encode('utf-8'))
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+
+def _generation_key(user_id: int) -> str:
+    return f'answer-cache:generation:{user_id}'
+
+
+def make_key(user_id: int, mode: str, question: str, contexts: List[Dict[str, Any]], model: str, prompt_version: str) -> str:
+    try:
+        generation = _cache().get(_generation_key(user_id), 0)
+    except Exception:
+        logger.exception('Answer cache generation lookup failed.')
+        generation = 0
+    parts = [user_id, generation, mode, normalize_question(question), context_fingerprint(contexts), model, prompt_version]
+    return 'answer-cache:' + hashlib.sha256(json.dumps(parts).encode('utf-8')).hexdigest()
+
+
+def lookup(key: str, mode: str) -> Optional[Dict[str, Any]]:
+    if not settings.ANSWER_CACHE_ENABLED:
+        return None
+    try:
+        payload = _cache().get(key)
+    except Exception:
+        logger.exception('Answer cache lookup failed.')
+        payload = None
+    outcome = 'hit' if payload is not None else 'miss'
+    with _stats_lock:
+        _stats[(mode, outcome)] += 1
+    metrics.record_cache('answer', hits=int(payload is not None), misses=int(payload is None))
+    logger.info('Answer cache %s mode=%s', outcome, mode)
+    return payload
+
+
+def store(key: str, payload: Dict[str, Any]) -> None:
+    if not settings.ANSWER_CACHE_ENABLED:
+        return
+    try:
+        _cache().set(key, payload, timeout=settings.ANSWER_CACHE_TTL)
+    except Exception:
+        logger.exception('Answer cache write failed.')
+
+
+def invalidate_users(user_ids: Iterable[int]) -> None:
+    """Bumps each user's generation so answers computed over their old chunks are never served."""
+    cache = _cache()
+    for user_id in set(user_ids):
+        key = _generation_key(user_id)
+        try:
+            if not cache.add(key, 1, timeout=None):
+                cache.incr(key)
+        except Exception:
+            logger.exception('Answer cache invalidation failed for user_id=%s', user_id)
+
+
+def stats() -> Dict[str, Dict[str, int]]:
+    with _stats_lock:
+        summary: Dict[str, Dict[str, int]] = {}
+        for (mode, outcome), count in _stats.items():
+            summary.setdefault(mode, {'hit': 0, 'miss': 0})[outcome] = count
+        return summary
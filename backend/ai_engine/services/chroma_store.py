@@ -0,0 +1,179 @@
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, Iterator, List, Optional
+
+import chromadb
+from chromadb.api.client import SharedSystemClient
+from django.conf import settings
+
+from core.timing import timed
+
+logger = logging.getLogger(__name__)
+
+COLLECTION_NAME = 'career_copilot'
+
+_lock = threading.Lock()
+_client = None
+_client_pid = None
+_collections: Dict[str, Any] = {}
+
+
+def forget() -> None:
+    # Chroma caches its SQLite-backed system per process; a forked child opens its own.
+    global _client, _client_pid
+    _client = None
+    _client_pid = None
+    _collections.clear()
+    SharedSystemClient.clear_system_cache()
+
+
+os.register_at_fork(after_in_child=forget)
+
+
+def _get_client():
+    """Opens the Chroma store on first use, once per process, instead of at import time."""
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _lock:
+            if _client is None or _client_pid != pid:
+                started = time.perf_counter()
+                _collections.clear()
+                _client = chromadb.PersistentClient(path=settings.CHROMA_PERSIST_DIR)
+                _client_pid = pid
+                logger.info('Vector store loaded pid=%s in %.0fms', pid, (time.perf_counter() - started) * 1000)
+    return _client
+
+
+def base_name() -> str:
+    """``COLLECTION_NAME``, suffixed with ``EMBEDDING_DIMENSIONS`` when embeddings are shortened."""
+    # A collection holds one vector width; a different width starts a collection of its own.
+    return f'{COLLECTION_NAME}_d{settings.EMBEDDING_DIMENSIONS}' if settings.EMBEDDING_DIMENSIONS else COLLECTION_NAME
+
+
+def _get_collection(name: Optional[str] = None):
+    name = name or base_name()
+    client = _get_client()
+    collection = _collections.get(name)
+    if collection is None:
+        with _lock:
+            collection = _collections.get(name)
+            if collection is None:
+                collection = _collections[name] = client.get_or_create_collection(name)
+    return collection
+
+
+def collection_name(user_id: int) -> str:
+    """
+    The collection holding ``user_id``'s chunks under ``VECTOR_PARTITIONING``: the shared
+    collection ('none'), one of ``VECTOR_BUCKETS`` collections ('bucket') or the user's own ('user').
+    """
+    if settings.VECTOR_PARTITIONING == 'user':
+        return f'{base_name()}_user_{user_id}'
+    if settings.VECTOR_PARTITIONING == 'bucket':
+        # User ids are sequential, so the modulo spreads them evenly.
+        return f'{base_name()}_bucket_{user_id % settings.VECTOR_BUCKETS:04d}'
+    return base_name()
+
+
+def _collection_for(user_id: int):
+    return _get_collection(collection_name(user_id))
+
+
+def partition_names() -> List[str]:
+    """Existing collections that belong to the configured layout."""
+    if settings.VECTOR_PARTITIONING == 'none':
+        return [base_name()]
+    prefix = f'{base_name()}_{settings.VECTOR_PARTITIONING}_'
+    return sorted(collection.name for collection in _get_client().list_collections() if collection.name.startswith(prefix))
+
+
+def _user_where(user_id: int, where: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    clauses = [{'user_id': user_id}] + [{key: value} for key, value in (where or {}).items()]
+    return {'$and': clauses} if len(clauses) > 1 else clauses[0]
+
+
+def warm_up() -> None:
+    _get_client().heartbeat()
+
+
+def is_loaded() -> bool:
+    return _client is not None and _client_pid == os.getpid()
+
+
+def upsert(ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]], embeddings: List[List[float]]) -> None:
+    by_collection: Dict[str, List[int]] = defaultdict(list)
+    for i, metadata in enumerate(metadatas):
+        by_collection[collection_name(metadata['user_id'])].append(i)
+    for name, rows in by_collection.items():
+        _get_collection(name).upsert(
+            ids=[ids[i] for i in rows],
+            documents=[documents[i] for i in rows],
+            metadatas=[metadatas[i] for i in rows],
+            embeddings=[embeddings[i] for i in rows],
+        )
+
+
+def get(
+    user_id: int,
+    where: Optional[Dict[str, Any]] = None,
+    include_embeddings: bool = False,
+    include_documents: bool = False,
+) -> Dict[str, List[Any]]:
+    include = ['metadatas'] + (['embeddings'] if include_embeddings else []) + (['documents'] if include_documents else [])
+    result = _collection_for(user_id).get(where=_user_where(user_id, where), include=include)
+    embeddings = result.get('embeddings')
+    return {
+        'ids': result['ids'],
+        'metadatas': result['metadatas'],
+        'embeddings': [list(vector) for vector in embeddings] if embeddings is not None else [],
+        'documents': result.get('documents') or [],
+    }
+
+
+def delete(user_id: int, ids: List[str]) -> None:
+    _collection_for(user_id).delete(ids=ids)
+
+
+def query(user_id: int, vector: List[float], top_k: int) -> List[Dict[str, Any]]:
+    # A per-user collection holds nothing else, so its search needs no metadata filter.
+    where = None if settings.VECTOR_PARTITIONING == 'user' else {'user_id': user_id}
+    with timed('chroma_query'):
+        result = _collection_for(user_id).query(
+            query_embeddings=[vector],
+            n_results=top_k,
+            where=where,
+        )
+    ids = result.get('ids', [[]])[0]
+    docs = result.get('documents', [[]])[0]
+    metas = result.get('metadatas', [[]])[0]
+    distances = result.get('distances', [[]])[0]
+    return [
+        {
+            'id': ids[i],
+            'text': docs[i],
+            'metadata': metas[i],
+            'distance': distances[i] if i < len(distances) else None,
+        }
+        for i in range(len(ids))
+    ]
+
+
+def iter_documents(batch_size: int = 500, include_embeddings: bool = False) -> Iterator[Dict[str, List[Any]]]:
+    include = ['documents', 'metadatas', 'embeddings'] if include_embeddings else ['documents', 'metadatas']
+    for name in partition_names():
+        offset = 0
+        while True:
+            page = _get_collection(name).get(include=include, limit=batch_size, offset=offset)
+            if not page['ids']:
+                break
+            yield {
+                'ids': page['ids'],
+                'documents': page['documents'],
+                'metadatas': page['metadatas'],
+                'embeddings': [list(vector) for vector in page['embeddings']] if include_embeddings else [],
+            }
+            offset += len(page['ids'])
@@ -0,0 +1,152 @@
+import re
+from typing import List, Optional, Tuple
+
+from django.conf import settings
+
+from .tokens import count_tokens
+
+_BULLET = re.compile(r'^\s*(?:[-*•▪●◦‣–]|\d{1,2}[.)])\s+')
+_MARKDOWN_HEADING = re.compile(r'^\s*#{1,6}\s+')
+_SENTENCE_END = re.compile(r'(?<=[.!?;])\s+')
+_PAGE_MARKER = re.compile(r'^(?:page\s*)?\d+(?:\s*(?:of|/)\s*\d+)?$', re.IGNORECASE)
+_PAGE_FOOTER = re.compile(r'\bpage\s+\d+\s*(?:of|/)\s*\d+\b', re.IGNORECASE)
+_NON_WORD = re.compile(r'\W+')
+
+
+def _fingerprint(text: str) -> str:
+    return _NON_WORD.sub(' ', text.lower()).strip()
+
+
+def _is_heading(line: str) -> bool:
+    stripped = line.strip()
+    if not stripped or len(stripped) > 60 or _BULLET.match(line):
+        return False
+    if _MARKDOWN_HEADING.match(stripped):
+        return True
+    words = stripped.rstrip(':').split()
+    if len(words) > 6:
+        return False
+    # "EXPERIENCE", "TECHNICAL SKILLS" or "Requirements:"
+    letters = sum(1 for char in stripped if char.isalpha())
+    return (letters >= 3 and stripped.upper() == stripped) or stripped.endswith(':')
+
+
+def _sections(text: str) -> List[Tuple[str, List[str]]]:
+    """
+    Splits text into (heading, blocks). A block is a bullet or a paragraph; wrapped lines
+    (PDF extraction breaks every visual line) are joined back onto the block they continue.
+    Page footers are dropped and repeated blocks, such as running headers, are kept only once.
+    """
+    sections: List[Tuple[str, List[str]]] = [('', [])]
+    seen = set()
+    current: List[str] = []
+
+    def flush() -> None:
+        if not current:
+            return
+        block = ' '.join(current)
+        key = _fingerprint(block)
+        current.clear()
+        if key and key not in seen and not _PAGE_MARKER.match(key):
+            seen.add(key)
+            sections[-1][1].append(block)
+
+    for raw in text.splitlines():
+        line = ' '.join(raw.split())
+        if len(line) <= 80 and _PAGE_FOOTER.search(line):
+            # "Jane Doe | Page 2 of 3" would otherwise be glued onto the bullet it interrupts.
+            continue
+        if not line:
+            flush()
+        elif _is_heading(raw):
+            flush()
+            sections.append((_MARKDOWN_HEADING.sub('', line).rstrip(':'), []))
+        elif _BULLET.match(raw):
+            flush()
+            current.append(line)
+        else:
+            current.append(line)
+    flush()
+    return [(heading, blocks) for heading, blocks in sections if blocks]
+
+
+def _split(block: str, budget: int) -> List[str]:
+    """Breaks a block larger than the budget at sentence ends, or at words for one long sentence."""
+    if count_tokens(block) <= budget:
+        return [block]
+    sentences = [sentence for sentence in _SENTENCE_END.split(block) if sentence]
+    if len(sentences) > 1:
+        units = [piece for sentence in sentences for piece in _split(sentence, budget)]
+    else:
+        units = block.split()
+        if len(units) == 1:
+            return [block]
+
+    pieces: List[str] = []
+    current: List[str] = []
+    used = 0
+    for unit in units:
+        tokens = count_tokens(unit) + 1
+        if current and used + tokens > budget:
+            pieces.append(' '.join(current))
+            current, used = [], 0
+        current.append(unit)
+        used += tokens
+    if current:
+        pieces.append(' '.join(current))
+    return pieces
+
+
+def chunk_document(
+    text: str,
+    title: str = '',
+    max_tokens: Optional[int] = None,
+    min_tokens: Optional[int] = None,
+) -> List[str]:
+    """
+    Chunks text along its section headings and bullets, sized in embedding-model tokens.
+    Each chunk starts with its section heading (and ``title``, if given) so it reads on its
+    own; short neighbouring sections share a chunk, a section under ``min_tokens`` always joins a
+    neighbour (even past ``max_tokens``) rather than being lost, and duplicate chunks are dropped.
+    """
+    max_tokens = max_tokens or settings.CHUNK_MAX_TOKENS
+    min_tokens = settings.CHUNK_MIN_TOKENS if min_tokens is None else min_tokens
+    budget = max_tokens - (count_tokens(title) + 1 if title else 0)
+
+    parts: List[Tuple[List[str], int]] = []
+    for heading, blocks in _sections(text):
+        head_tokens = count_tokens(heading) + 1 if heading else 0
+        lines: List[str] = []
+        used = head_tokens
+        for block in blocks:
+            for piece in _split(block, budget - head_tokens):
+                tokens = count_tokens(piece) + 1
+                if lines and used + tokens > budget:
+                    parts.append(([heading] + lines if heading else lines, used))
+                    lines, used = [], head_tokens
+                lines.append(piece)
+                used += tokens
+        if lines:
+            parts.append(([heading] + lines if heading else lines, used))
+
+    merged: List[Tuple[List[str], int]] = []
+    for lines, used in parts:
+        if merged and (merged[-1][1] + used <= budget or used < min_tokens):
+            merged[-1] = (merged[-1][0] + lines, merged[-1][1] + used)
+        else:
+            merged.append((lines, used))
+    if len(merged) > 1 and merged[0][1] < min_tokens:
+        # A short lead, such as the name atop a resume, has no chunk before it to join.
+        lines, used = merged.pop(0)
+        merged[0] = (lines + merged[0][0], used + merged[0][1])
+
+    chunks: List[str] = []
+    seen = set()
+    for lines, _ in merged:
+        body = '\n'.join(lines)
+        key = _fingerprint(body)
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        chunks.append(f'{title}\n{body}' if title else body)
+    return chunks
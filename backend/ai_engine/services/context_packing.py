@@ -0,0 +1,143 @@
+import json
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from django.conf import settings
+
+from core import metrics
+from core.timing import timed
+
+from .chunking import _fingerprint, _split
+from .tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the packing rules change, retiring answers cached from the old prompts.
+VERSION = '1'
+# Contexts sent per prompt before packing, which replaced this cap with a token budget.
+LEGACY_CONTEXTS = 12
+# Chunks cut by characters before heading-aware chunking shared up to 120 characters with the next one.
+_MIN_OVERLAP = 20
+_MAX_OVERLAP = 400
+# Room below which a passage that does not fit is skipped rather than cut.
+_MIN_PIECE_TOKENS = 24
+
+
+def _document(context: Dict[str, Any]) -> Tuple[Any, ...]:
+    metadata = context.get('metadata') or {}
+    if metadata.get('source') == 'job' and metadata.get('job_id') is not None:
+        return 'job', metadata['job_id']
+    if metadata.get('resume_id') is not None:
+        return 'resume', metadata['resume_id']
+    return 'other', context.get('id')
+
+
+def _continuation(previous: str, text: str) -> Optional[str]:
+    """What ``text`` adds after repeating the end of ``previous``, or None if it does not overlap it."""
+    head = text[:_MIN_OVERLAP]
+    start = max(len(previous) - _MAX_OVERLAP, 0)
+    # The earliest match in the tail of ``previous`` that runs to its end is the longest overlap.
+    position = previous.find(head, start)
+    while position != -1:
+        if text.startswith(previous[position:]):
+            return text[len(previous) - position:]
+        position = previous.find(head, position + 1)
+    return None
+
+
+def _join(passage: str, seen: Set[str], text: str) -> str:
+    continuation = _continuation(passage, text)
+    if continuation is not None:
+        # A character window picks up mid-line where the previous one ended.
+        seen.update(_fingerprint(line) for line in continuation.splitlines())
+        return passage + continuation
+    # Each chunk repeats its document title and section heading; keep lines the passage lacks.
+    lines = []
+    for line in text.splitlines():
+        key = _fingerprint(line)
+        if key and key in seen:
+            continue
+        seen.add(key)
+        lines.append(line)
+    return '\n'.join([passage, *lines]) if lines else passage
+
+
+def _passages(contexts: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Runs of consecutive chunks of one document merged into one passage each, in relevance order."""
+    ranked: Dict[Tuple[Any, ...], List[Tuple[int, Dict[str, Any]]]] = {}
+    for rank, context in enumerate(contexts):
+        ranked.setdefault(_document(context), []).append((rank, context))
+
+    # [best rank among its chunks, passage, fingerprints of its lines]
+    passages: List[List[Any]] = []
+    for document, members in ranked.items():
+        members.sort(key=lambda member: (member[1].get('metadata') or {}).get('idx', -1))
+        current = None
+        previous_idx = None
+        for rank, context in members:
+            idx = (context.get('metadata') or {}).get('idx')
+            text = (context.get('text') or '').strip()
+            if not text:
+                continue
+            if current is not None and idx is not None and previous_idx is not None and idx == previous_idx + 1:
+                current[0] = min(current[0], rank)
+                current[1]['text'] = _join(current[1]['text'], current[2], text)
+            else:
+                current = [rank, {'source': document[0], 'text': text}, {_fingerprint(line) for line in text.splitlines()}]
+                passages.append(current)
+            previous_idx = idx
+    passages.sort(key=lambda item: item[0])
+    return [passage for _, passage, _ in passages]
+
+
+def pack(contexts: List[Dict[str, Any]], budget: int) -> List[Dict[str, Any]]:
+    """
+    Retrieved contexts as the model needs them: adjacent chunks of the same resume or job merged
+    with their repeated headings and overlap removed, only ``source`` and ``text`` kept, and
+    passages added in relevance order until ``budget`` chat-model tokens are used.
+    """
+    model = settings.OPENAI_MODEL
+    packed: List[Dict[str, Any]] = []
+    remaining = budget
+    seen = set()
+    for passage in _passages(contexts):
+        key = _fingerprint(passage['text'])
+        if key in seen:
+            continue
+        seen.add(key)
+        tokens = count_tokens(passage['text'], model)
+        if tokens > remaining:
+            if remaining < _MIN_PIECE_TOKENS:
+                continue
+            # The head of a long passage, cut at a sentence or word end.
+            passage = {**passage, 'text': _split(passage['text'], remaining)[0]}
+            tokens = count_tokens(passage['text'], model)
+            if tokens > remaining:
+                continue
+        packed.append(passage)
+        remaining -= tokens
+    return packed
+
+
+def signature() -> str:
+    """Identifies the packing applied, for cache keys of answers generated from packed contexts."""
+    if not settings.CONTEXT_PACKING_ENABLED:
+        return ''
+    return f'pack-{VERSION}:{settings.CONTEXT_MAX_TOKENS}'
+
+
+def prompt_contexts(contexts: List[Dict[str, Any]], purpose: str) -> List[Dict[str, Any]]:
+    """
+    The contexts to serialize into a ``purpose`` prompt: packed, with prompt tokens recorded before
+    and after, or the first ``LEGACY_CONTEXTS`` as retrieved with ``CONTEXT_PACKING_ENABLED`` off.
+    """
+    if not settings.CONTEXT_PACKING_ENABLED:
+        return contexts[:LEGACY_CONTEXTS]
+    with timed('pack'):
+        packed = pack(contexts, settings.CONTEXT_MAX_TOKENS)
+        model = settings.OPENAI_MODEL
+        before = count_tokens(json.dumps(contexts[:LEGACY_CONTEXTS]), model)
+        after = count_tokens(json.dumps(packed), model)
+    metrics.record_prompt_compaction(purpose, before, after)
+    logger.debug('Packed %s contexts into %s passages, %s to %s tokens', len(contexts), len(packed), before, after)
+    return packed
@@ -1,27 +1,58 @@
 import json
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 from django.conf import settings
+from openai import OpenAI
 
-from ai_engine.prompt_templates import ANALYSIS_PROMPT, CHAT_PROMPT, MATCH_PROMPT, TAILOR_PROMPT
+from ai_engine.prompt_templates import (
+    ANALYSIS_PROMPT,
+    CHAT_PROMPT,
+    CHAT_STREAM_PROMPT,
+    MATCH_PROMPT,
+    TAILOR_PROMPT,
+    prompt_version,
+)
 from ai_engine.schemas import CRAGScoreResponse
+from core import metrics
+from core.timing import timed
 
+from . import answer_cache, context_packing, prompt_compaction
 from .openai_client import get_openai_client
+from .relevance import is_ambiguous, score_context_locally
 from .vector_store import query_documents
 
 logger = logging.getLogger(__name__)
 
+# Widest window any CRAG attempt can ask for; retrieval runs once at this size.
+MAX_TOP_K = 20
+
 
 class CRAGService:
-    def __init__(self, max_retries: int = 2) -> None:
+    def __init__(self, max_retries: int = 2, client: Optional[OpenAI] = None) -> None:
         self.max_retries = max_retries
-        self.client = get_openai_client()
+        self.client = client or get_openai_client()
+        self._retrieved: Dict[Tuple[int, str], List[Dict[str, Any]]] = {}
 
     def retrieve_context(self, user_id: int, question: str, top_k: int = 8) -> List[Dict[str, Any]]:
-        return query_documents(user_id=user_id, query=question, top_k=top_k)
+        # A service instance lives for one request, so the question is embedded and
+        # searched once and every retry takes a wider slice of the same ranking.
+        key = (user_id, question)
+        if key not in self._retrieved:
+            self._retrieved[key] = query_documents(user_id=user_id, query=question, top_k=max(top_k, MAX_TOP_K))
+        return self._retrieved[key][:top_k]
 
     def score_context(self, question: str, contexts: List[Dict[str, Any]]) -> CRAGScoreResponse:
+        with timed('score'):
+            if settings.CRAG_SCORER == 'llm':
+                return self.llm_score_context(question, contexts)
+
+            score = score_context_locally(question, contexts)
+            if settings.CRAG_SCORER == 'hybrid' and is_ambiguous(score):
+                return self.llm_score_context(question, contexts)
+            return score
+
+    def llm_score_context(self, question: str, contexts: List[Dict[str, Any]]) -> CRAGScoreResponse:
         prompt = (
             'Score relevance from 1-10 for how well context answers question. '
             'Return strict JSON: {"relevance_score": int, "reasoning": "..."}.\n'
@@ -35,10 +66,12 @@ class CRAGService:
                 response_format={'type': 'json_object'},
                 messages=[{'role': 'user', 'content': prompt}],
             )
+            metrics.record_tokens('score', response.usage)
             parsed = json.loads(response.choices[0].message.content)
             return CRAGScoreResponse(**parsed)
         except Exception:
             logger.exception('Context scoring failed, using conservative default score.')
+            metrics.record_fallback('score')
             return CRAGScoreResponse(relevance_score=5, reasoning='Scoring failed.')
 
     def retry_logic(self, user_id: int, question: str, top_k: int = 8) -> List[Dict[str, Any]]:
@@ -46,9 +79,14 @@ class CRAGService:
         current_top_k = top_k
         best_context: List[Dict[str, Any]] = []
         best_score = 0
+        seen = -1
 
         while attempt <= self.max_retries:
             contexts = self.retrieve_context(user_id=user_id, question=question, top_k=current_top_k)
+            if len(contexts) <= seen:
+                # The wider slice found nothing new; re-scoring the same chunks is wasted work.
+                break
+            seen = len(contexts)
             score = self.score_context(question, contexts)
             logger.info('CRAG attempt=%s score=%s', attempt + 1, score.relevance_score)
 
@@ -57,35 +95,62 @@ class CRAGService:
                 best_context = contexts
 
             if score.relevance_score >= 7:
+                metrics.observe_crag_attempts(attempt + 1)
                 return contexts
 
             attempt += 1
-            current_top_k = min(current_top_k + 4, 20)
+            current_top_k = min(current_top_k + 4, MAX_TOP_K)
 
+        metrics.observe_crag_attempts(attempt)
         return best_context
 
-    def generate_answer(self, question: str, contexts: List[Dict[str, Any]], mode: str = 'analysis') -> Dict[str, Any]:
+    def generate_answer(
+        self,
+        question: str,
+        contexts: List[Dict[str, Any]],
+        mode: str = 'analysis',
+        user_id: Optional[int] = None,
+    ) -> Dict[str, Any]:
         system_prompt = ANALYSIS_PROMPT if mode == 'analysis' else CHAT_PROMPT
         if mode == 'tailor':
             system_prompt = TAILOR_PROMPT
 
         if not contexts:
+            metrics.record_fallback('no_context')
             return {
                 'missing_keywords': [],
                 'improvement_suggestions': ['Could not retrieve enough context. Upload resume and jobs first.'],
                 'rewritten_bullets': [],
+                'cached': False,
             }
 
-        try:
-            response = self.client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                temperature=0.3,
-                response_format={'type': 'json_object'},
-                messages=[
-                    {'role': 'system', 'content': system_prompt},
-                    {'role': 'user', 'content': json.dumps({'question': question, 'contexts': contexts[:12]})},
-                ],
+        cache_key = None
+        if user_id is not None:
+            cache_key = answer_cache.make_key(
+                user_id,
+                mode,
+                question,
+                contexts,
+                settings.OPENAI_MODEL,
+                prompt_version(system_prompt + context_packing.signature()),
             )
+            cached = answer_cache.lookup(cache_key, mode)
+            if cached is not None:
+                return {**cached, 'cached': True}
+
+        try:
+            packed = context_packing.prompt_contexts(contexts, mode)
+            with timed('generate'):
+                response = self.client.chat.completions.create(
+                    model=settings.OPENAI_MODEL,
+                    temperature=0.3,
+                    response_format={'type': 'json_object'},
+                    messages=[
+                        {'role': 'system', 'content': system_prompt},
+                        {'role': 'user', 'content': json.dumps({'question': question, 'contexts': packed})},
+                    ],
+                )
+            metrics.record_tokens(mode, response.usage)
             payload = json.loads(response.choices[0].message.content)
             if mode == 'analysis':
                 payload.setdefault('missing_keywords', [])
@@ -93,34 +158,112 @@ class CRAGService:
                 payload.setdefault('rewritten_bullets', [])
             if mode == 'chat':
                 payload.setdefault('answer', 'I could not produce a complete answer. Please try again.')
-            return payload
+            if cache_key:
+                answer_cache.store(cache_key, payload)
+            return {**payload, 'cached': False}
         except Exception:
             logger.exception('Answer generation failed.')
+            metrics.record_fallback(f'generate_{mode}')
             if mode == 'analysis':
                 return {
                     'missing_keywords': [],
                     'improvement_suggestions': ['Generation failed. Try again with a more specific query.'],
                     'rewritten_bullets': [],
+                    'cached': False,
                 }
             if mode == 'tailor':
                 return {
                     'tailored_bullets': [],
                     'cover_letter': 'Generation failed. Please retry.',
+                    'cached': False,
                 }
-            return {'answer': 'Generation failed. Please retry.'}
+            return {'answer': 'Generation failed. Please retry.', 'cached': False}
 
-    def match_resume_job(self, resume_text: str, job_text: str) -> Dict[str, Any]:
-        payload = {'resume_text': resume_text[:14000], 'job_text': job_text[:14000]}
+    def stream_answer(
+        self,
+        question: str,
+        contexts: List[Dict[str, Any]],
+        user_id: Optional[int] = None,
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Streams a plain-text chat answer. Yields {'delta': str} events as tokens arrive,
+        then a single {'answer': str, 'cached': bool} event with the full text.
+        """
+        if not contexts:
+            metrics.record_fallback('no_context')
+            answer = 'Could not retrieve enough context. Upload resume and jobs first.'
+            yield {'delta': answer}
+            yield {'answer': answer, 'cached': False}
+            return
+
+        cache_key = None
+        if user_id is not None:
+            cache_key = answer_cache.make_key(
+                user_id,
+                'chat_stream',
+                question,
+                contexts,
+                settings.OPENAI_MODEL,
+                prompt_version(CHAT_STREAM_PROMPT + context_packing.signature()),
+            )
+            cached = answer_cache.lookup(cache_key, 'chat_stream')
+            if cached is not None:
+                yield {'delta': cached['answer']}
+                yield {'answer': cached['answer'], 'cached': True}
+                return
+
+        parts: List[str] = []
+        completed = False
         try:
-            response = self.client.chat.completions.create(
+            packed = context_packing.prompt_contexts(contexts, 'chat_stream')
+            stream = get_openai_client('stream').chat.completions.create(
                 model=settings.OPENAI_MODEL,
-                temperature=0.2,
-                response_format={'type': 'json_object'},
+                temperature=0.3,
+                stream=True,
+                stream_options={'include_usage': True},
                 messages=[
-                    {'role': 'system', 'content': MATCH_PROMPT},
-                    {'role': 'user', 'content': json.dumps(payload)},
+                    {'role': 'system', 'content': CHAT_STREAM_PROMPT},
+                    {'role': 'user', 'content': json.dumps({'question': question, 'contexts': packed})},
                 ],
             )
+            for chunk in stream:
+                # With include_usage the last chunk has no choices and carries the token counts.
+                if chunk.usage is not None:
+                    metrics.record_tokens('chat_stream', chunk.usage)
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield {'delta': delta}
+            completed = True
+        except Exception:
+            logger.exception('Streaming answer generation failed.')
+            metrics.record_fallback('chat_stream')
+            if not parts:
+                answer = 'Generation failed. Please retry.'
+                yield {'delta': answer}
+                yield {'answer': answer, 'cached': False}
+                return
+
+        answer = ''.join(parts) or 'I could not produce a complete answer. Please try again.'
+        if cache_key and completed and parts:
+            answer_cache.store(cache_key, {'answer': answer})
+        yield {'answer': answer, 'cached': False}
+
+    def match_resume_job(self, resume_text: str, job_text: str) -> Dict[str, Any]:
+        resume_text, job_text = prompt_compaction.compact_pair(resume_text, job_text, 'match', max_chars=14000)
+        payload = {'resume_text': resume_text, 'job_text': job_text}
+        try:
+            with timed('generate'):
+                response = self.client.chat.completions.create(
+                    model=settings.OPENAI_MODEL,
+                    temperature=0.2,
+                    response_format={'type': 'json_object'},
+                    messages=[
+                        {'role': 'system', 'content': MATCH_PROMPT},
+                        {'role': 'user', 'content': json.dumps(payload)},
+                    ],
+                )
+            metrics.record_tokens('match', response.usage)
             data = json.loads(response.choices[0].message.content)
             data.setdefault('match_score', 0)
             data.setdefault('matched_keywords', [])
@@ -131,6 +274,7 @@ class CRAGService:
             return data
         except Exception:
             logger.exception('Resume/job match generation failed.')
+            metrics.record_fallback('match')
             return {
                 'match_score': 0,
                 'matched_keywords': [],
@@ -138,6 +282,7 @@ class CRAGService:
                 'improvement_suggestions': ['Matching failed. Please retry.'],
                 'tailored_resume_bullets': [],
                 'cover_letter_snippet': '',
+                'failed': True,
             }
 
     def tailor_resume_job(self, resume_text: str, job_text: str) -> Dict[str, Any]:
@@ -145,23 +290,27 @@ class CRAGService:
         Generates tailored bullets and cover letter using specific resume and job text.
         Bypasses retrieval logic.
         """
-        payload = {'resume_text': resume_text[:12000], 'job_text': job_text[:12000]}
+        resume_text, job_text = prompt_compaction.compact_pair(resume_text, job_text, 'tailor', max_chars=12000)
+        payload = {'resume_text': resume_text, 'job_text': job_text}
         try:
-            response = self.client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                temperature=0.4,
-                response_format={'type': 'json_object'},
-                messages=[
-                    {'role': 'system', 'content': TAILOR_PROMPT},
-                    {'role': 'user', 'content': json.dumps(payload)},
-                ],
-            )
+            with timed('generate'):
+                response = self.client.chat.completions.create(
+                    model=settings.OPENAI_MODEL,
+                    temperature=0.4,
+                    response_format={'type': 'json_object'},
+                    messages=[
+                        {'role': 'system', 'content': TAILOR_PROMPT},
+                        {'role': 'user', 'content': json.dumps(payload)},
+                    ],
+                )
+            metrics.record_tokens('tailor', response.usage)
             data = json.loads(response.choices[0].message.content)
             data.setdefault('tailored_bullets', [])
             data.setdefault('cover_letter', '')
             return data
         except Exception:
             logger.exception('Tailoring failed.')
+            metrics.record_fallback('tailor')
             return {
                 'tailored_bullets': [],
                 'cover_letter': 'Generation failed. Please retry.',
@@ -0,0 +1,98 @@
+import hashlib
+import logging
+import threading
+from array import array
+from typing import Dict, Iterable, List
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+from ai_engine.models import EmbeddingCacheEntry
+from core import metrics
+
+logger = logging.getLogger(__name__)
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def embedding_key() -> str:
+    """
+    The embedding model plus ``EMBEDDING_DIMENSIONS`` when shortened; vectors are only
+    comparable under the same key, so it namespaces cache entries and stored content hashes.
+    """
+    dimensions = settings.EMBEDDING_DIMENSIONS
+    return f'{settings.OPENAI_EMBEDDING_MODEL}@{dimensions}' if dimensions else settings.OPENAI_EMBEDDING_MODEL
+
+
+def _pack(vector: List[float]) -> bytes:
+    return array('f', vector).tobytes()
+
+
+def _unpack(blob: bytes) -> List[float]:
+    vector = array('f')
+    vector.frombytes(bytes(blob))
+    return vector.tolist()
+
+
+def get_many(model: str, hashes: Iterable[str]) -> Dict[str, List[float]]:
+    """Single batch lookup; touches every hit so eviction stays least-recently-used."""
+    if not settings.EMBEDDING_CACHE_ENABLED:
+        return {}
+    try:
+        rows = list(
+            EmbeddingCacheEntry.objects.filter(model=model, text_hash__in=set(hashes)).values_list(
+                'id', 'text_hash', 'vector'
+            )
+        )
+        if rows:
+            EmbeddingCacheEntry.objects.filter(id__in=[row[0] for row in rows]).update(
+                hits=F('hits') + 1,
+                last_used_at=timezone.now(),
+            )
+        return {digest: _unpack(blob) for _, digest, blob in rows}
+    except Exception:
+        logger.exception('Embedding cache lookup failed, embedding without cache.')
+        return {}
+
+
+def set_many(model: str, vectors: Dict[str, List[float]]) -> None:
+    if not settings.EMBEDDING_CACHE_ENABLED or not vectors:
+        return
+    try:
+        EmbeddingCacheEntry.objects.bulk_create(
+            [EmbeddingCacheEntry(model=model, text_hash=digest, vector=_pack(vector)) for digest, vector in vectors.items()],
+            ignore_conflicts=True,
+        )
+        _evict()
+    except Exception:
+        logger.exception('Embedding cache write failed.')
+
+
+def _evict() -> None:
+    max_entries = settings.EMBEDDING_CACHE_MAX_ENTRIES
+    if max_entries <= 0:
+        return
+    overflow = EmbeddingCacheEntry.objects.count() - max_entries
+    if overflow <= 0:
+        return
+    stale_ids = list(EmbeddingCacheEntry.objects.order_by('last_used_at').values_list('id', flat=True)[:overflow])
+    EmbeddingCacheEntry.objects.filter(id__in=stale_ids).delete()
+    logger.info('Embedding cache evicted %s entries', len(stale_ids))
+
+
+def record(hits: int, misses: int) -> None:
+    with _stats_lock:
+        _stats['hits'] += hits
+        _stats['misses'] += misses
+    metrics.record_cache('embedding', hits=hits, misses=misses)
+
+
+def stats() -> Dict[str, int]:
+    with _stats_lock:
+        return dict(_stats)
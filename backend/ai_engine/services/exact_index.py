@@ -0,0 +1,248 @@
+import json
+import logging
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+
+from core import metrics
+from core.timing import timed
+
+from . import embedding_cache
+
+logger = logging.getLogger(__name__)
+
+# user_id -> ((stamp of the records file, layout), unit-row float32 matrix, quantized copy or None,
+# records). The matrices and records are None for a corpus over EXACT_SEARCH_MAX_CHUNKS.
+_Entry = Tuple[Tuple[Any, ...], Optional[np.ndarray], Optional[np.ndarray], Optional[Dict[str, List[Any]]]]
+
+QUANTIZATIONS = ('none', 'int8', 'binary')
+# Set bits per byte value, for Hamming distances over packed sign bits.
+_POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.uint8)
+# Rows converted from int8 per matrix product, bounding the float32 scratch space.
+_SCAN_ROWS = 4096
+
+_lock = threading.Lock()
+_entries: 'OrderedDict[int, _Entry]' = OrderedDict()
+
+
+def _paths(user_id: int) -> Tuple[Path, Path]:
+    base = Path(settings.EXACT_SEARCH_DIR)
+    return base / f'{user_id}.json', base / f'{user_id}.epoch'
+
+
+def _matrix_files(user_id: int) -> List[Path]:
+    # Every build writes its matrices under its own token, named in the records file that publishes them.
+    return list(Path(settings.EXACT_SEARCH_DIR).glob(f'{user_id}.*npy'))
+
+
+def _layout() -> Dict[str, str]:
+    # Matrices built under another embedding width, quantization or file format are rebuilt rather than read.
+    return {'embedding': embedding_cache.embedding_key(), 'quantization': settings.VECTOR_QUANTIZATION, 'format': '2'}
+
+
+def quantize(matrix: np.ndarray, quantization: str) -> Optional[np.ndarray]:
+    """
+    The compact copy scanned first: int8 components on one scale for the whole matrix (a shared
+    scale keeps the ranking), or one sign bit per dimension packed into bytes.
+    """
+    if quantization == 'int8':
+        peak = float(np.abs(matrix).max()) if matrix.size else 0.0
+        return np.rint(matrix * (127 / (peak or 1.0))).astype(np.int8)
+    if quantization == 'binary':
+        return np.packbits(matrix > 0, axis=1)
+    return None
+
+
+def _candidates(quantized: np.ndarray, quantization: str, query: np.ndarray, count: int) -> np.ndarray:
+    """Indices of the ``count`` rows scoring best on the quantized copy, in no particular order."""
+    if quantization == 'binary':
+        bits = np.packbits(query > 0)
+        scores = -_POPCOUNT[np.bitwise_xor(quantized, bits)].sum(axis=1, dtype=np.int32)
+    else:
+        scores = np.concatenate(
+            [quantized[start:start + _SCAN_ROWS].astype(np.float32) @ query for start in range(0, len(quantized), _SCAN_ROWS)]
+        )
+    if count >= len(scores):
+        return np.arange(len(scores))
+    return np.argpartition(-scores, count - 1)[:count]
+
+
+def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns
+
+
+def invalidate(user_ids: Iterable[int]) -> None:
+    """
+    Drops the users' matrices here and on disk. The epoch file changes first, so a rebuild that
+    read the store before this write will not publish its now stale snapshot.
+    """
+    if not settings.EXACT_SEARCH_ENABLED:
+        return
+    for user_id in set(user_ids):
+        records_path, epoch_path = _paths(user_id)
+        epoch_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = epoch_path.with_name(f'{epoch_path.name}.{uuid.uuid4().hex}')
+        tmp.write_text('')
+        os.replace(tmp, epoch_path)
+        for path in (records_path, *_matrix_files(user_id)):
+            path.unlink(missing_ok=True)
+        with _lock:
+            _entries.pop(user_id, None)
+
+
+def _build(user_id: int, load: Callable[[bool], Dict[str, List[Any]]]) -> None:
+    records_path, epoch_path = _paths(user_id)
+    records_path.parent.mkdir(parents=True, exist_ok=True)
+    epoch = _stamp(epoch_path)
+    # Count ids before pulling every vector: an oversized user only needs its count recorded.
+    stored = load(False)
+    layout = _layout()
+    token = uuid.uuid4().hex
+    # Readers open exactly the files the records name, so a matrix is never paired with another build's records.
+    matrix_name = f'{user_id}.{token}.npy'
+    quantized_name = f'{user_id}.{token}.{layout["quantization"]}.npy' if layout['quantization'] != 'none' else None
+    tmp_records = records_path.with_name(f'{records_path.name}.{token}')
+
+    if len(stored['ids']) > settings.EXACT_SEARCH_MAX_CHUNKS:
+        # Too large for a scan to beat the ANN index; remember that instead of the vectors.
+        tmp_records.write_text(json.dumps({'count': len(stored['ids']), 'layout': layout}))
+    else:
+        stored = load(True)
+        matrix = np.asarray(stored['embeddings'], dtype=np.float32)
+        if not len(matrix):
+            matrix = np.zeros((0, 0), dtype=np.float32)
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        matrix = matrix / np.where(norms == 0, 1, norms)
+        with open(records_path.with_name(matrix_name), 'wb') as fh:
+            np.save(fh, matrix, allow_pickle=False)
+        quantized = quantize(matrix, layout['quantization'])
+        if quantized is not None:
+            with open(records_path.with_name(quantized_name), 'wb') as fh:
+                np.save(fh, quantized, allow_pickle=False)
+        records = {key: stored[key] for key in ('ids', 'documents', 'metadatas')}
+        files = {'matrix': matrix_name, 'quantized': quantized_name}
+        tmp_records.write_text(json.dumps({'count': len(stored['ids']), 'layout': layout, **files, **records}))
+
+    ours = [tmp_records, *(records_path.with_name(name) for name in (matrix_name, quantized_name) if name)]
+    if _stamp(epoch_path) != epoch:
+        for path in ours:
+            path.unlink(missing_ok=True)
+        return
+    # Publishing the records is the one step readers see; it names the matrices written above.
+    # Matrices of an earlier layout or a concurrent build stay until the next invalidate().
+    os.replace(tmp_records, records_path)
+    if _stamp(epoch_path) != epoch:
+        # invalidate() ran between the check and the publish; take the stale snapshot back.
+        records_path.unlink(missing_ok=True)
+        for path in ours:
+            path.unlink(missing_ok=True)
+        return
+    logger.info('Built exact index user_id=%s chunks=%s', user_id, len(stored['ids']))
+
+
+def _read(user_id: int) -> Optional[_Entry]:
+    records_path, _ = _paths(user_id)
+    stamp = _stamp(records_path)
+    version = (stamp, tuple(_layout().values()))
+    if stamp is None:
+        return None
+    try:
+        records = json.loads(records_path.read_text())
+        if records.get('layout') != _layout():
+            return None
+        if 'ids' not in records:
+            return version, None, None, None
+        matrix = np.load(records_path.with_name(records['matrix']), mmap_mode='r')
+        quantized = np.load(records_path.with_name(records['quantized']), mmap_mode='r') if records['quantized'] else None
+    except (FileNotFoundError, ValueError):
+        # Invalidated while reading.
+        return None
+    return version, matrix, quantized, records
+
+
+def _entry(user_id: int, load: Callable[[bool], Dict[str, List[Any]]]) -> Optional[_Entry]:
+    version = (_stamp(_paths(user_id)[0]), tuple(_layout().values()))
+    with _lock:
+        entry = _entries.get(user_id)
+        if entry is not None and entry[0] == version:
+            _entries.move_to_end(user_id)
+            metrics.record_cache('exact_index', hits=1, misses=0)
+            return entry
+
+    metrics.record_cache('exact_index', hits=0, misses=1)
+    entry = _read(user_id)
+    if entry is None:
+        _build(user_id, load)
+        entry = _read(user_id)
+    if entry is None:
+        # A write raced the rebuild; the ANN index answers this query.
+        return None
+    with _lock:
+        _entries[user_id] = entry
+        _entries.move_to_end(user_id)
+        while len(_entries) > settings.EXACT_SEARCH_CACHE_USERS:
+            _entries.popitem(last=False)
+    return entry
+
+
+def matrix(
+    user_id: int, load: Callable[[bool], Dict[str, List[Any]]]
+) -> Optional[Tuple[np.ndarray, List[Dict[str, Any]]]]:
+    """The user's unit-row float32 matrix and the metadata of each row, or None where search() would be."""
+    entry = _entry(user_id, load)
+    if entry is None or entry[1] is None:
+        return None
+    return entry[1], entry[3]['metadatas']
+
+
+def search(
+    user_id: int, vector: List[float], top_k: int, load: Callable[[bool], Dict[str, List[Any]]]
+) -> Optional[List[Dict[str, Any]]]:
+    """
+    Exact cosine top-k over the user's memory-mapped matrix, or None when the user has more than
+    ``EXACT_SEARCH_MAX_CHUNKS`` chunks and the ANN index should answer instead. ``load(full)`` returns
+    the user's ids and metadatas from the vector backend, plus documents and embeddings when ``full``.
+
+    With ``VECTOR_QUANTIZATION`` set, the quantized copy is scanned for ``top_k *
+    VECTOR_RERANK_FACTOR`` candidates and only their full-precision rows are read to rank them.
+    """
+    entry = _entry(user_id, load)
+    if entry is None or entry[1] is None:
+        return None
+    _, matrix, quantized, records = entry
+    with timed('exact_query'):
+        if not len(records['ids']):
+            return []
+        query = np.asarray(vector, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+        if quantized is None:
+            rows = np.arange(len(matrix))
+            scores = matrix @ query
+        else:
+            count = top_k * settings.VECTOR_RERANK_FACTOR
+            # Sorted, so the gather walks the memory-mapped file front to back.
+            rows = np.sort(_candidates(quantized, records['layout']['quantization'], query, count))
+            scores = matrix[rows] @ query
+        k = min(top_k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+    # 2 - 2cos is the squared L2 distance between unit vectors, the scale Chroma reports.
+    return [
+        {
+            'id': records['ids'][rows[i]],
+            'text': records['documents'][rows[i]],
+            'metadata': records['metadatas'][rows[i]],
+            'distance': float(2 - 2 * scores[i]),
+        }
+        for i in best
+    ]
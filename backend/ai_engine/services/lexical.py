@@ -0,0 +1,68 @@
+import math
+import re
+from collections import Counter
+from typing import Dict, List, Sequence
+
+# Keeps skill tokens such as "c++", "c#", "node.js" and "ci/cd" intact.
+_TOKEN_RE = re.compile(r'[a-z0-9][a-z0-9+#./-]*')
+
+STOPWORDS = frozenset(
+    """
+    a about an and any are as at be been but by can could did do does for from had has have how i if in
+    into is it its me my no not of on or our should so than that the their them then there these they
+    this to was we were what when where which who why will with would you your
+    """.split()
+)
+
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> List[str]:
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower()):
+        token = token.strip('./-')
+        if token and token not in STOPWORDS:
+            tokens.append(token)
+    return tokens
+
+
+def idf(doc_count: int, doc_freq: int) -> float:
+    # BM25+ style floor keeps terms that occur in every document from going negative.
+    return math.log(1 + (doc_count - doc_freq + 0.5) / (doc_freq + 0.5))
+
+
+def bm25_score(
+    query_terms: Sequence[str],
+    term_freqs: Dict[str, int],
+    doc_length: int,
+    avg_doc_length: float,
+    doc_freqs: Dict[str, int],
+    doc_count: int,
+) -> float:
+    score = 0.0
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * doc_length / (avg_doc_length or 1))
+    for term in set(query_terms):
+        tf = term_freqs.get(term, 0)
+        if not tf:
+            continue
+        score += idf(doc_count, doc_freqs.get(term, 0)) * tf * (BM25_K1 + 1) / (tf + norm)
+    return score
+
+
+def bm25_rank(query: str, documents: Sequence[str]) -> List[float]:
+    """Scores an ad-hoc set of documents against the query, with statistics taken from that set."""
+    query_terms = tokenize(query)
+    doc_terms = [Counter(tokenize(doc)) for doc in documents]
+    if not query_terms or not doc_terms:
+        return [0.0 for _ in documents]
+
+    doc_freqs: Counter = Counter()
+    for terms in doc_terms:
+        doc_freqs.update(terms.keys())
+    lengths = [sum(terms.values()) for terms in doc_terms]
+    avg_length = sum(lengths) / len(lengths)
+    return [
+        bm25_score(query_terms, terms, length, avg_length, doc_freqs, len(doc_terms))
+        for terms, length in zip(doc_terms, lengths)
+    ]
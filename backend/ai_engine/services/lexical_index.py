@@ -0,0 +1,74 @@
+from collections import Counter, defaultdict
+from typing import Any, Dict, List
+
+from django.db import transaction
+from django.db.models import Avg, Count
+
+from ai_engine.models import LexicalDocument, LexicalPosting
+
+from .lexical import bm25_score, tokenize
+
+MAX_TERM_LENGTH = 100
+
+
+def index_documents(ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]) -> None:
+    rows = []
+    term_counts = []
+    for chunk_id, text, metadata in zip(ids, documents, metadatas):
+        terms = Counter(t for t in tokenize(text) if len(t) <= MAX_TERM_LENGTH)
+        term_counts.append(terms)
+        rows.append(
+            LexicalDocument(
+                chunk_id=chunk_id,
+                user_id=metadata['user_id'],
+                text=text,
+                metadata=metadata,
+                length=sum(terms.values()),
+            )
+        )
+
+    with transaction.atomic():
+        LexicalDocument.objects.filter(chunk_id__in=ids).delete()
+        created = LexicalDocument.objects.bulk_create(rows)
+        LexicalPosting.objects.bulk_create(
+            [
+                LexicalPosting(document_id=document.id, user_id=document.user_id, term=term, tf=tf)
+                for document, terms in zip(created, term_counts)
+                for term, tf in terms.items()
+            ],
+            batch_size=1000,
+        )
+
+
+def delete_documents(ids: List[str]) -> None:
+    LexicalDocument.objects.filter(chunk_id__in=ids).delete()
+
+
+def search(user_id: int, query: str, top_k: int = 8) -> List[Dict[str, Any]]:
+    query_terms = set(tokenize(query))
+    if not query_terms:
+        return []
+
+    postings = LexicalPosting.objects.filter(user_id=user_id, term__in=query_terms).values_list('document_id', 'term', 'tf')
+    doc_terms: Dict[int, Dict[str, int]] = defaultdict(dict)
+    doc_freqs: Counter = Counter()
+    for document_id, term, tf in postings:
+        doc_terms[document_id][term] = tf
+        doc_freqs[term] += 1
+    if not doc_terms:
+        return []
+
+    stats = LexicalDocument.objects.filter(user_id=user_id).aggregate(count=Count('id'), avg_length=Avg('length'))
+    documents = LexicalDocument.objects.filter(id__in=doc_terms.keys()).values('id', 'chunk_id', 'text', 'metadata', 'length')
+    scored = [
+        (
+            bm25_score(query_terms, doc_terms[doc['id']], doc['length'], stats['avg_length'], doc_freqs, stats['count']),
+            doc,
+        )
+        for doc in documents
+    ]
+    scored.sort(key=lambda item: item[0], reverse=True)
+    return [
+        {'id': doc['chunk_id'], 'text': doc['text'], 'metadata': doc['metadata'], 'bm25': score}
+        for score, doc in scored[:top_k]
+    ]
@@ -0,0 +1,117 @@
+import contextvars
+import logging
+import threading
+import time
+import weakref
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+from django.conf import settings
+
+from ai_engine.models import AnalysisResult
+from core import metrics
+from core.timing import timed
+
+from . import match_store
+from .crag import CRAGService
+from .openai_client import get_openai_client
+
+logger = logging.getLogger(__name__)
+
+_slots_lock = threading.Lock()
+# user_id -> semaphore shared by every batch that user has running in this process; dropped once idle.
+_user_slots: 'weakref.WeakValueDictionary[int, threading.BoundedSemaphore]' = weakref.WeakValueDictionary()
+
+
+def _slots(user_id: int) -> threading.BoundedSemaphore:
+    with _slots_lock:
+        slots = _user_slots.get(user_id)
+        if slots is None:
+            slots = _user_slots[user_id] = threading.BoundedSemaphore(settings.MATCH_BATCH_CONCURRENCY)
+        return slots
+
+
+def _match(resume_text: str, job_text: str, slots: threading.BoundedSemaphore, deadline: float) -> Optional[Dict[str, Any]]:
+    """One LLM match within the batch deadline, or None if no slot or time was left for it."""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0 or not slots.acquire(timeout=remaining):
+        return None
+    try:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return None
+        # No SDK retries: a retry would restart the timeout and outlive the deadline.
+        client = get_openai_client().with_options(
+            timeout=httpx.Timeout(remaining, connect=min(remaining, settings.OPENAI_CONNECT_TIMEOUT)),
+            max_retries=0,
+        )
+        return CRAGService(client=client).match_resume_job(resume_text=resume_text, job_text=job_text)
+    finally:
+        slots.release()
+
+
+def _job_fields(job) -> Dict[str, Any]:
+    return {'job_id': job.id, 'role': job.role, 'company': job.company}
+
+
+def _score(result: Dict[str, Any]) -> float:
+    # LLM output: match_score is usually an int but may arrive as a string.
+    try:
+        return float(result['match_score'])
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def match_jobs(user, resume, jobs: List, force: bool = False) -> Tuple[List[Dict[str, Any]], Dict[int, str]]:
+    """
+    Matches ``resume`` against each job: cached results (unless ``force``) come from one query,
+    the rest run concurrently, and every new AnalysisResult is saved with one bulk_create.
+    Returns the match payloads ranked by score and the failures by job id ('failed' or 'timeout').
+    """
+    deadline = time.monotonic() + settings.MATCH_BATCH_DEADLINE_SECONDS
+    results: List[Dict[str, Any]] = []
+    errors: Dict[int, str] = {}
+    rows: List[AnalysisResult] = []
+
+    pending = list(jobs)
+    if not force:
+        cached = match_store.find_cached_many(user, resume, pending)
+        metrics.record_cache('match', hits=len(cached), misses=len(pending) - len(cached))
+        for job in pending:
+            if job.id in cached:
+                copy = match_store.reuse_result(cached[job.id], resume, job)
+                if copy is not None:
+                    rows.append(copy)
+                results.append({**_job_fields(job), **cached[job.id].to_match_payload(), 'cached': True})
+        pending = [job for job in pending if job.id not in cached]
+
+    if pending:
+        slots = _slots(user.id)
+        pool = ThreadPoolExecutor(max_workers=min(len(pending), settings.MATCH_BATCH_CONCURRENCY))
+        # Each call runs in a copy of this context so its timed() stages reach the caller's collect_stages().
+        futures = {
+            pool.submit(contextvars.copy_context().run, _match, resume.extracted_text, job.description, slots, deadline): job
+            for job in pending
+        }
+        done, _ = wait(futures, timeout=max(deadline - time.monotonic(), 0))
+        # Calls still running finish in the background within their own timeout; their results are dropped.
+        pool.shutdown(wait=False, cancel_futures=True)
+
+        for future, job in futures.items():
+            data = future.result() if future in done else None
+            if data is None:
+                errors[job.id] = 'timeout'
+            elif data.get('failed'):
+                errors[job.id] = 'failed'
+            else:
+                rows.append(match_store.build_result(user, resume, job, data))
+                results.append({**_job_fields(job), **data, 'cached': False})
+        if errors:
+            logger.warning('Batch match user_id=%s resume_id=%s errors=%s', user.id, resume.id, errors)
+
+    if rows:
+        with timed('db_write'):
+            AnalysisResult.objects.bulk_create(rows)
+    results.sort(key=_score, reverse=True)
+    return results, errors
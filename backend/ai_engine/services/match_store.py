@@ -0,0 +1,103 @@
+import hashlib
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from django.conf import settings
+
+from ai_engine.models import AnalysisResult
+from ai_engine.prompt_templates import MATCH_PROMPT, prompt_version
+
+from . import prompt_compaction
+
+
+def match_key(resume_text: str, job_text: str) -> Tuple[str, str, str, str]:
+    return (
+        hashlib.sha256(resume_text.encode('utf-8')).hexdigest(),
+        hashlib.sha256(job_text.encode('utf-8')).hexdigest(),
+        settings.OPENAI_MODEL,
+        # The model sees compacted text, so a change to the compaction retires results like a prompt edit.
+        prompt_version(MATCH_PROMPT + prompt_compaction.signature()),
+    )
+
+
+def find_cached(user, resume, job) -> Optional[AnalysisResult]:
+    resume_hash, job_hash, model, version = match_key(resume.extracted_text, job.description)
+    return (
+        AnalysisResult.objects.filter(
+            user=user,
+            resume_text_hash=resume_hash,
+            job_text_hash=job_hash,
+            model=model,
+            prompt_version=version,
+        )
+        .order_by('-created_at')
+        .first()
+    )
+
+
+def find_cached_many(user, resume, jobs: Iterable) -> Dict[int, AnalysisResult]:
+    """find_cached for many jobs in one query: job id -> newest result for that resume/job content."""
+    keys = {job.id: match_key(resume.extracted_text, job.description) for job in jobs}
+    if not keys:
+        return {}
+    resume_hash, _, model, version = next(iter(keys.values()))
+    newest: Dict[str, AnalysisResult] = {}
+    for result in AnalysisResult.objects.filter(
+        user=user,
+        resume_text_hash=resume_hash,
+        job_text_hash__in={key[1] for key in keys.values()},
+        model=model,
+        prompt_version=version,
+    ).order_by('created_at'):
+        newest[result.job_text_hash] = result
+    return {job_id: newest[key[1]] for job_id, key in keys.items() if key[1] in newest}
+
+
+def build_result(user, resume, job, data: Dict[str, Any]) -> AnalysisResult:
+    """Unsaved AnalysisResult for a fresh match; failed matches get no key so they are never reused."""
+    resume_hash, job_hash, model, version = ('', '', '', '')
+    if not data.get('failed'):
+        resume_hash, job_hash, model, version = match_key(resume.extracted_text, job.description)
+    return AnalysisResult(
+        user=user,
+        resume=resume,
+        job=job,
+        match_score=data.get('match_score', 0),
+        matched_keywords=data.get('matched_keywords', []),
+        missing_keywords=data.get('missing_keywords', []),
+        improvement_suggestions=data.get('improvement_suggestions', []),
+        tailored_resume_bullets=data.get('tailored_resume_bullets', []),
+        cover_letter_snippet=data.get('cover_letter_snippet', ''),
+        resume_text_hash=resume_hash,
+        job_text_hash=job_hash,
+        model=model,
+        prompt_version=version,
+    )
+
+
+def reuse_result(cached: AnalysisResult, resume, job) -> Optional[AnalysisResult]:
+    """
+    Same content under different resume/job rows (e.g. a re-uploaded resume) gets its own
+    history row copied from the cached one; the same pair needs no new row at all.
+    """
+    if (cached.resume_id, cached.job_id) == (resume.id, job.id):
+        return None
+    return AnalysisResult(
+        user_id=cached.user_id,
+        resume=resume,
+        job=job,
+        **{
+            field: getattr(cached, field)
+            for field in (
+                'match_score',
+                'matched_keywords',
+                'missing_keywords',
+                'improvement_suggestions',
+                'tailored_resume_bullets',
+                'cover_letter_snippet',
+                'resume_text_hash',
+                'job_text_hash',
+                'model',
+                'prompt_version',
+            )
+        },
+    )
@@ -1,6 +1,88 @@
+import logging
+import os
+import threading
+from typing import Optional
+
+import httpx
 from django.conf import settings
 from openai import OpenAI
 
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_client: Optional[OpenAI] = None
+_client_pid: Optional[int] = None
+_stats = {'requests': 0, 'retries': 0}
+
+
+def timeout_for(purpose: str) -> httpx.Timeout:
+    read = {
+        'embedding': settings.OPENAI_EMBEDDING_TIMEOUT,
+        'stream': settings.OPENAI_STREAM_TIMEOUT,
+    }.get(purpose, settings.OPENAI_CHAT_TIMEOUT)
+    return httpx.Timeout(read, connect=settings.OPENAI_CONNECT_TIMEOUT)
+
+
+def _pool_state(http_client: httpx.Client) -> str:
+    pool = getattr(getattr(http_client, '_transport', None), '_pool', None)
+    connections = list(getattr(pool, 'connections', []))
+    idle = sum(1 for conn in connections if conn.is_idle())
+    return f'connections={len(connections)} idle={idle}'
+
+
+def _on_request(request: httpx.Request) -> None:
+    # The SDK retries with jittered exponential backoff and numbers each attempt in this header.
+    retry = int(request.headers.get('x-stainless-retry-count', '0') or 0)
+    with _lock:
+        _stats['requests'] += 1
+        if retry:
+            _stats['retries'] += 1
+        requests, retries = _stats['requests'], _stats['retries']
+    if retry:
+        logger.warning('OpenAI retry %s for %s %s (total retries=%s)', retry, request.method, request.url.path, retries)
+    if _client is not None and requests % settings.OPENAI_POOL_LOG_EVERY == 0:
+        logger.info('OpenAI pool pid=%s requests=%s retries=%s %s', os.getpid(), requests, retries, _pool_state(_client._client))
+
+
+def _build_client() -> OpenAI:
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=settings.OPENAI_MAX_CONNECTIONS,
+            max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+            keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+        ),
+        timeout=timeout_for('chat'),
+        event_hooks={'request': [_on_request]},
+    )
+    return OpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL or None,
+        max_retries=settings.OPENAI_MAX_RETRIES,
+        http_client=http_client,
+    )
+
+
+def _forget_client() -> None:
+    # A forked child must not reuse the parent's sockets; it builds its own pool on first use.
+    global _client, _client_pid
+    _client = None
+    _client_pid = None
+
+
+os.register_at_fork(after_in_child=_forget_client)
+
 
-def get_openai_client() -> OpenAI:
-    return OpenAI(api_key=settings.OPENAI_API_KEY)
+def get_openai_client(purpose: str = 'chat') -> OpenAI:
+    """
+    Process-wide client sharing one keep-alive connection pool. purpose selects the read
+    timeout: 'chat', 'embedding' or 'stream' (the gap allowed between streamed chunks).
+    """
+    global _client, _client_pid
+    pid = os.getpid()
+    if _client is None or _client_pid != pid:
+        with _lock:
+            if _client is None or _client_pid != pid:
+                _client = _build_client()
+                _client_pid = pid
+    # with_options returns a lightweight copy that shares the underlying httpx pool.
+    return _client.with_options(timeout=timeout_for(purpose))
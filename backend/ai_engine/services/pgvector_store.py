@@ -0,0 +1,234 @@
+import json
+import logging
+import math
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from core.timing import timed
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+# pgvector rejects a larger hnsw.ef_search.
+MAX_EF_SEARCH = 1000
+# Embedding width of the table once it exists; looked up once per process.
+_dimensions: Optional[int] = None
+_checked = False
+
+
+def forget() -> None:
+    global _dimensions, _checked
+    _dimensions = None
+    _checked = False
+
+
+def table_name() -> str:
+    """``PGVECTOR_TABLE``, suffixed with ``EMBEDDING_DIMENSIONS`` when embeddings are shortened."""
+    # The embedding column has a fixed width; a different width starts a table of its own.
+    dimensions = settings.EMBEDDING_DIMENSIONS
+    return f'{settings.PGVECTOR_TABLE}_d{dimensions}' if dimensions else settings.PGVECTOR_TABLE
+
+
+def _table() -> str:
+    return connection.ops.quote_name(table_name())
+
+
+def _vector(values: List[float]) -> str:
+    return '[' + ','.join(repr(float(value)) for value in values) + ']'
+
+
+def _parse_vector(text: str) -> List[float]:
+    return [float(value) for value in text.strip('[]').split(',')] if text != '[]' else []
+
+
+def _metadata(value: Any) -> Dict[str, Any]:
+    # Django registers jsonb to load as text so JSONField can decode it; raw cursors see the string.
+    return json.loads(value) if isinstance(value, str) else value
+
+
+def _table_dimensions() -> Optional[int]:
+    global _dimensions, _checked
+    if _dimensions is None:
+        with connection.cursor() as cursor:
+            # atttypmod of a vector(n) column is n; no row means the table doesn't exist yet.
+            cursor.execute(
+                "SELECT atttypmod FROM pg_attribute WHERE attrelid = to_regclass(%s) AND attname = 'embedding'",
+                [table_name()],
+            )
+            row = cursor.fetchone()
+        _dimensions = row[0] if row else None
+        _checked = True
+    return _dimensions
+
+
+def _ensure_schema(dimensions: int) -> None:
+    """Creates the extension, table and indexes on first write, sized to the embedding model."""
+    global _dimensions
+    if _table_dimensions() is None:
+        with _lock, transaction.atomic(), connection.cursor() as cursor:
+            table = _table()
+            # Serializes workers racing to create the schema; IF NOT EXISTS alone can still collide.
+            cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [table_name()])
+            cursor.execute('CREATE EXTENSION IF NOT EXISTS vector')
+            cursor.execute(
+                f'CREATE TABLE IF NOT EXISTS {table} ('
+                'id text PRIMARY KEY, '
+                'user_id bigint NOT NULL, '
+                'document text NOT NULL, '
+                'metadata jsonb NOT NULL, '
+                f'embedding vector({int(dimensions)}) NOT NULL)'
+            )
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {connection.ops.quote_name(table_name() + "_user_id")} '
+                f'ON {table} (user_id)'
+            )
+            cursor.execute(
+                f'CREATE INDEX IF NOT EXISTS {connection.ops.quote_name(table_name() + "_hnsw")} '
+                f'ON {table} USING hnsw (embedding vector_cosine_ops) '
+                f'WITH (m = {int(settings.PGVECTOR_HNSW_M)}, ef_construction = {int(settings.PGVECTOR_HNSW_EF_CONSTRUCTION)})'
+            )
+        _dimensions = None
+        logger.info('Created pgvector table %s with %s dimensions', table_name(), dimensions)
+    if _table_dimensions() != dimensions:
+        raise ValueError(
+            f'{table_name()} stores {_table_dimensions()}-dimensional vectors but got {dimensions}; '
+            'drop the table and run manage.py reindex_vector_store after changing the embedding model.'
+        )
+
+
+def _where(user_id: int, where: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+    # Supports the filters callers pass to Chroma: {'key': value} and {'key': {'$in': [...]}}.
+    clauses, params = ['user_id = %s'], [user_id]
+    for key, value in (where or {}).items():
+        if isinstance(value, dict) and '$in' in value:
+            clauses.append('metadata -> %s = ANY(%s::jsonb[])')
+            params += [key, [json.dumps(item) for item in value['$in']]]
+        else:
+            clauses.append('metadata -> %s = %s::jsonb')
+            params += [key, json.dumps(value)]
+    return ' AND '.join(clauses), params
+
+
+def warm_up() -> None:
+    _table_dimensions()
+
+
+def is_loaded() -> bool:
+    return _checked
+
+
+def upsert(ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]], embeddings: List[List[float]]) -> None:
+    if not ids:
+        return
+    _ensure_schema(len(embeddings[0]))
+    rows = list(zip(ids, metadatas, documents, embeddings))
+    with transaction.atomic(), connection.cursor() as cursor:
+        for start in range(0, len(rows), 500):
+            batch = rows[start:start + 500]
+            cursor.execute(
+                f'INSERT INTO {_table()} (id, user_id, document, metadata, embedding) VALUES '
+                + ', '.join(['(%s, %s, %s, %s::jsonb, %s::vector)'] * len(batch))
+                + ' ON CONFLICT (id) DO UPDATE SET user_id = EXCLUDED.user_id, document = EXCLUDED.document, '
+                'metadata = EXCLUDED.metadata, embedding = EXCLUDED.embedding',
+                [
+                    param
+                    for doc_id, metadata, document, vector in batch
+                    for param in (doc_id, metadata['user_id'], document, json.dumps(metadata), _vector(vector))
+                ],
+            )
+
+
+def get(
+    user_id: int,
+    where: Optional[Dict[str, Any]] = None,
+    include_embeddings: bool = False,
+    include_documents: bool = False,
+) -> Dict[str, List[Any]]:
+    if _table_dimensions() is None:
+        return {'ids': [], 'metadatas': [], 'embeddings': [], 'documents': []}
+    clause, params = _where(user_id, where)
+    columns = 'id, metadata, ' + ('embedding::text' if include_embeddings else 'NULL') + ', '
+    columns += 'document' if include_documents else 'NULL'
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT {columns} FROM {_table()} WHERE {clause} ORDER BY id', params)
+        rows = cursor.fetchall()
+    return {
+        'ids': [row[0] for row in rows],
+        'metadatas': [_metadata(row[1]) for row in rows],
+        'embeddings': [_parse_vector(row[2]) for row in rows] if include_embeddings else [],
+        'documents': [row[3] for row in rows] if include_documents else [],
+    }
+
+
+def delete(user_id: int, ids: List[str]) -> None:
+    if _table_dimensions() is None:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {_table()} WHERE user_id = %s AND id = ANY(%s)', [user_id, list(ids)])
+
+
+def _ef_search(cursor, user_id: int, top_k: int) -> Optional[int]:
+    """The ``hnsw.ef_search`` to query ``user_id`` with, or None to rank their rows exactly.
+
+    HNSW applies the user_id filter to the candidates it visits, so a user holding a small share of
+    the table needs a wider search to get ``top_k`` rows back. Users with at most
+    ``PGVECTOR_EXACT_MAX_ROWS`` rows, or too few for any ef_search to reach, are ranked exactly.
+    """
+    cursor.execute('SELECT greatest(reltuples, 0) FROM pg_class WHERE oid = to_regclass(%s)', [table_name()])
+    total = cursor.fetchone()[0]
+    # Aim for twice top_k of the user's rows among the candidates; stop counting once that is possible.
+    enough = max(settings.PGVECTOR_EXACT_MAX_ROWS + 1, math.ceil(2 * top_k * total / MAX_EF_SEARCH))
+    cursor.execute(
+        f'SELECT count(*) FROM (SELECT 1 FROM {_table()} WHERE user_id = %s LIMIT %s) AS owned', [user_id, enough]
+    )
+    rows = cursor.fetchone()[0]
+    if rows < enough:
+        return None
+    return min(MAX_EF_SEARCH, max(settings.PGVECTOR_EF_SEARCH, math.ceil(2 * top_k * total / rows)))
+
+
+def query(user_id: int, vector: List[float], top_k: int) -> List[Dict[str, Any]]:
+    if _table_dimensions() is None:
+        return []
+    literal = _vector(vector)
+    with timed('pgvector_query'), transaction.atomic(), connection.cursor() as cursor:
+        ef_search = _ef_search(cursor, user_id, top_k)
+        if ef_search is None:
+            # HNSW is only reachable through an index scan; without one the planner filters
+            # on the user_id index and ranks that user's rows exactly.
+            cursor.execute('SET LOCAL enable_indexscan = off')
+        else:
+            cursor.execute(f'SET LOCAL hnsw.ef_search = {int(ef_search)}')
+        # Cosine distance doubled equals Chroma's squared L2 on unit vectors, which relevance scoring expects.
+        cursor.execute(
+            f'SELECT id, document, metadata, 2 * (embedding <=> %s::vector) FROM {_table()} '
+            'WHERE user_id = %s ORDER BY embedding <=> %s::vector LIMIT %s',
+            [literal, user_id, literal, top_k],
+        )
+        rows = cursor.fetchall()
+    return [{'id': row[0], 'text': row[1], 'metadata': _metadata(row[2]), 'distance': row[3]} for row in rows]
+
+
+def iter_documents(batch_size: int = 500, include_embeddings: bool = False) -> Iterator[Dict[str, List[Any]]]:
+    if _table_dimensions() is None:
+        return
+    columns = 'id, document, metadata, embedding::text' if include_embeddings else 'id, document, metadata'
+    last_id = ''
+    while True:
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT {columns} FROM {_table()} WHERE id > %s ORDER BY id LIMIT %s', [last_id, batch_size]
+            )
+            rows = cursor.fetchall()
+        if not rows:
+            return
+        yield {
+            'ids': [row[0] for row in rows],
+            'documents': [row[1] for row in rows],
+            'metadatas': [_metadata(row[2]) for row in rows],
+            'embeddings': [_parse_vector(row[3]) for row in rows] if include_embeddings else [],
+        }
+        last_id = rows[-1][0]
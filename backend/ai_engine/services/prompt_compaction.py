@@ -0,0 +1,192 @@
+import logging
+import re
+from typing import Dict, List, Set, Tuple
+
+from django.conf import settings
+
+from core import metrics
+from core.timing import timed
+
+from .chunking import _BULLET, _PAGE_FOOTER, _sections, _split
+from .lexical import tokenize
+from .tokens import count_tokens
+
+logger = logging.getLogger(__name__)
+
+# Bumped when the compaction rules change, retiring match results cached from the old prompts.
+VERSION = '2'
+
+# Job-posting sections that say nothing about the work or the candidate, matched against the whole
+# heading: "Privacy Engineering Requirements" is the job, "Privacy notice" is not.
+_BOILERPLATE_HEADING = re.compile(
+    r'(?:compensation (?:and|&) )?benefits(?: (?:and|&) perks)?|perks(?: (?:and|&) benefits)?|what we offer|'
+    r'total rewards|equal (?:employment )?opportunit(?:y|ies)(?: employer)?|eeo(?: statement)?|'
+    r'diversity(?:,? equity)?(?:,? (?:and|&) inclusion)?|accommodations?|privacy(?: notice| policy| statement)?|'
+    r'(?:about|life at) (?!(?:the |this |our |your )?(?:role|job|position|team|you)\b).+|who we are|'
+    r'our (?:mission|values|culture|story)|why (?:join|work)\b.*|how to apply',
+    re.IGNORECASE,
+)
+# Boilerplate paragraphs that usually close a posting without a heading of their own.
+_BOILERPLATE_BLOCK = re.compile(
+    r'equal (?:employment )?opportunity employer|without regard to|regardless of (?:race|gender|age)|'
+    r'reasonable accommodations?|e-verify|protected veteran|applicants? with disabilit|^(?:about us|who we are)\b',
+    re.IGNORECASE,
+)
+# Headings of the sections a match is judged on, ranked ahead of the rest when over budget.
+_CORE_HEADING = re.compile(
+    r'\b(?:requirements?|qualifications?|responsibilit\w*|skills|experience|what you.ll|you will|'
+    r'you have|must have|nice to have|preferred|role|stack|summary|projects?)\b',
+    re.IGNORECASE,
+)
+_TERMINAL = ('.', '!', '?', ';', ',', ':')
+
+
+def _is_boilerplate_heading(heading: str) -> bool:
+    heading = heading.strip().rstrip(':').strip()
+    return bool(_BOILERPLATE_HEADING.fullmatch(heading)) and not _CORE_HEADING.search(heading)
+
+
+def _is_label(line: str, max_words: int = 8) -> bool:
+    return (
+        len(line) <= 60 and len(line.split()) <= max_words and line[:1].isalpha() and not line.endswith(_TERMINAL)
+    )
+
+
+def _looks_like_heading(block: str) -> bool:
+    # "What you'll do" or "Benefits": too plain for chunking's heading rule. "Engineer, Acme" is a job line.
+    return _is_label(block, max_words=6) and ',' not in block
+
+
+def _set_apart(text: str) -> str:
+    """
+    Puts blank lines around short label lines that follow a finished sentence, such as "About us" or
+    "Software Engineer, Acme (2019-2021)", which would otherwise be joined to the paragraph they head.
+    """
+    lines: List[str] = []
+    previous = ''
+    for raw in text.splitlines():
+        line = ' '.join(raw.split())
+        if len(line) <= 80 and _PAGE_FOOTER.search(line):
+            lines.append(raw)
+            continue
+        if line and not _BULLET.match(raw) and _is_label(line) and (not previous or previous.endswith(('.', '!', '?'))):
+            lines.extend(['', raw, ''])
+        else:
+            lines.append(raw)
+        previous = line
+    return '\n'.join(lines)
+
+
+def _parts(text: str) -> List[Tuple[str, List[str]]]:
+    parts: List[Tuple[str, List[str]]] = []
+    for heading, blocks in _sections(_set_apart(text)):
+        parts.append((heading, []))
+        for block in blocks:
+            if _looks_like_heading(block):
+                parts.append((block, []))
+            else:
+                parts[-1][1].append(block)
+    merged: List[Tuple[str, List[str]]] = []
+    for heading, blocks in parts:
+        if blocks:
+            merged.append((heading, blocks))
+        elif heading and merged:
+            # A short line with nothing under it, such as a one-line skills list, stays as text.
+            merged[-1][1].append(heading)
+        elif heading:
+            merged.append(('', [heading]))
+    return merged
+
+
+def _render(parts: List[Tuple[str, List[str]]]) -> str:
+    return '\n\n'.join('\n'.join([heading, *blocks] if heading else blocks) for heading, blocks in parts)
+
+
+def _relevance(index: int, heading: str, blocks: List[str], reference: Set[str]) -> float:
+    terms = set(tokenize(' '.join([heading, *blocks])))
+    overlap = len(terms & reference) / len(terms) if terms else 0.0
+    # The untitled lead of a posting or resume names the role or the candidate.
+    return overlap + (1.0 if _CORE_HEADING.search(heading) else 0.0) + (0.5 if index == 0 and not heading else 0.0)
+
+
+def compact(text: str, budget: int, reference: str = '', strip_boilerplate: bool = False) -> str:
+    """
+    ``text`` with whitespace normalized and repeated lines dropped (plus boilerplate sections and
+    paragraphs when ``strip_boilerplate``), cut to ``budget`` tokens of the chat model. Over budget,
+    whole sections are kept in order of relevance - core headings first, then by the share of their
+    terms found in ``reference`` - and the output keeps the original section order.
+    """
+    model = settings.OPENAI_MODEL
+    parts = _parts(text)
+    if strip_boilerplate:
+        parts = [
+            (heading, [block for block in blocks if not _BOILERPLATE_BLOCK.search(block)])
+            for heading, blocks in parts
+            if not _is_boilerplate_heading(heading)
+        ]
+        parts = [(heading, blocks) for heading, blocks in parts if blocks]
+    rendered = _render(parts)
+    if count_tokens(rendered, model) <= budget:
+        return rendered
+
+    reference_terms = set(tokenize(reference))
+    order = sorted(
+        range(len(parts)), key=lambda i: (-_relevance(i, parts[i][0], parts[i][1], reference_terms), i)
+    )
+    kept: Dict[int, Tuple[str, List[str]]] = {}
+    remaining = budget
+    for i in order:
+        heading, blocks = parts[i]
+        # Sections are separated by a blank line; each heading and block takes a line.
+        used = count_tokens(heading, model) + 2 if heading else 2
+        if used >= remaining:
+            continue
+        chosen: List[str] = []
+        for block in blocks:
+            tokens = count_tokens(block, model) + 1
+            if used + tokens > remaining:
+                if remaining - used < 8:
+                    continue
+                # Part of an oversized block rather than none of it, at sentence or word ends.
+                pieces = _split(block, remaining - used)
+                tokens = count_tokens(pieces[0], model) + 1
+                if len(pieces) > 1 and used + tokens <= remaining:
+                    chosen.append(pieces[0])
+                    used += tokens
+                continue
+            chosen.append(block)
+            used += tokens
+        if chosen:
+            kept[i] = (heading, chosen)
+            remaining -= used
+    return _render([kept[i] for i in sorted(kept)])
+
+
+def signature() -> str:
+    """Identifies the compaction applied, for cache keys of results generated from compacted prompts."""
+    if not settings.PROMPT_COMPACTION_ENABLED:
+        return ''
+    return f'compact-{VERSION}:{settings.PROMPT_RESUME_MAX_TOKENS}:{settings.PROMPT_JOB_MAX_TOKENS}'
+
+
+def compact_pair(resume_text: str, job_text: str, purpose: str, max_chars: int) -> Tuple[str, str]:
+    """
+    The resume and job text to send for ``purpose``, each ranked against the other when over its
+    budget, with prompt tokens recorded before and after. With ``PROMPT_COMPACTION_ENABLED`` off,
+    both are cut to ``max_chars`` as before.
+    """
+    if not settings.PROMPT_COMPACTION_ENABLED:
+        return resume_text[:max_chars], job_text[:max_chars]
+    with timed('compact'):
+        # Text with no parseable content (a scan, a symbol dump) is sent as before rather than not at all.
+        resume = compact(resume_text, settings.PROMPT_RESUME_MAX_TOKENS, reference=job_text) or resume_text[:max_chars]
+        job = (
+            compact(job_text, settings.PROMPT_JOB_MAX_TOKENS, reference=resume_text, strip_boilerplate=True)
+            or job_text[:max_chars]
+        )
+        model = settings.OPENAI_MODEL
+        before = count_tokens(resume_text, model) + count_tokens(job_text, model)
+        after = count_tokens(resume, model) + count_tokens(job, model)
+    metrics.record_prompt_compaction(purpose, before, after)
+    logger.debug('Compacted %s prompt from %s to %s tokens', purpose, before, after)
+    return resume, job
@@ -0,0 +1,74 @@
+from typing import Any, Dict, List, Optional
+
+from django.conf import settings
+
+from ai_engine.schemas import CRAGScoreResponse
+
+from .lexical import BM25_K1, bm25_rank, idf, tokenize
+
+LEXICAL_WEIGHT = 0.5
+# Cosine similarities of text-embedding-3 vectors rarely leave this band; it is stretched to 0..1.
+SIMILARITY_FLOOR = 0.15
+SIMILARITY_CEILING = 0.55
+# Words that show up in most copilot questions without saying anything about the topic.
+QUESTION_NOISE = frozenset(
+    'anywhere describe does expect experience highlight job list listed match mentioned missing posting resume role tell'.split()
+)
+
+
+def _clamp(value: float) -> float:
+    return max(0.0, min(1.0, value))
+
+
+def _lexical_signal(question: str, texts: List[str]) -> Optional[float]:
+    query_terms = set(tokenize(question)) - QUESTION_NOISE
+    if not query_terms:
+        return None
+
+    doc_terms = [set(tokenize(text)) for text in texts]
+    covered = {term for term in query_terms if any(term in terms for terms in doc_terms)}
+    coverage = len(covered) / len(query_terms)
+
+    # Best BM25 score relative to a document that saturates every query term.
+    ceiling = sum(idf(len(texts), sum(1 for terms in doc_terms if term in terms)) * (BM25_K1 + 1) for term in query_terms)
+    best = max(bm25_rank(' '.join(query_terms), texts), default=0.0)
+    return 0.5 * coverage + 0.5 * _clamp(best / ceiling if ceiling else 0.0)
+
+
+def _dense_signal(contexts: List[Dict[str, Any]]) -> Optional[float]:
+    distances = sorted(c['distance'] for c in contexts if c.get('distance') is not None)[:3]
+    if not distances:
+        return None
+    # Chroma's default space is squared L2; on unit-length embeddings that is 2 - 2 * cosine.
+    similarity = sum(1 - d / 2 for d in distances) / len(distances)
+    return _clamp((similarity - SIMILARITY_FLOOR) / (SIMILARITY_CEILING - SIMILARITY_FLOOR))
+
+
+def score_context_locally(question: str, contexts: List[Dict[str, Any]]) -> CRAGScoreResponse:
+    if not contexts:
+        return CRAGScoreResponse(relevance_score=1, reasoning='No context retrieved.')
+
+    top = contexts[:5]
+    lexical = _lexical_signal(question, [c.get('text') or '' for c in top])
+    dense = _dense_signal(top)
+    if lexical is None and dense is None:
+        combined = 0.5
+    elif dense is None:
+        combined = lexical
+    elif lexical is None:
+        combined = dense
+    else:
+        combined = LEXICAL_WEIGHT * lexical + (1 - LEXICAL_WEIGHT) * dense
+
+    return CRAGScoreResponse(
+        relevance_score=1 + round(9 * combined),
+        reasoning=(
+            'Local score from '
+            f'lexical={"n/a" if lexical is None else f"{lexical:.2f}"} '
+            f'dense={"n/a" if dense is None else f"{dense:.2f}"}.'
+        ),
+    )
+
+
+def is_ambiguous(score: CRAGScoreResponse) -> bool:
+    return settings.CRAG_LOCAL_AMBIGUOUS_MIN <= score.relevance_score <= settings.CRAG_LOCAL_AMBIGUOUS_MAX
@@ -0,0 +1,42 @@
+import logging
+import math
+import re
+from functools import lru_cache
+from typing import Optional
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+_PIECE = re.compile(r'\w+|[^\w\s]')
+
+
+@lru_cache(maxsize=8)
+def _encoding(model: str):
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding('cl100k_base')
+    except Exception:
+        # tiktoken downloads its BPE files on first use; offline hosts fall back to the estimate.
+        logger.warning('Tokenizer for %s unavailable, estimating token counts.', model)
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    # BPE averages about four characters per token on English text; words and punctuation
+    # marks are each at least one token, which dominates for short or symbol-heavy text.
+    return max(len(_PIECE.findall(text)), math.ceil(len(text) / 4))
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """Tokens ``text`` costs with ``model`` (default: the embedding model)."""
+    encoding = _encoding(model or settings.OPENAI_EMBEDDING_MODEL)
+    if encoding is None:
+        return estimate_tokens(text)
+    return len(encoding.encode(text, disallowed_special=()))
@@ -1,42 +1,216 @@
-from typing import Any, Dict, List
+import logging
+from importlib import import_module
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-import chromadb
+import numpy as np
 from django.conf import settings
 
+from core import metrics
+from core.timing import timed
+
+from . import answer_cache, embedding_cache, exact_index, lexical_index
 from .openai_client import get_openai_client
 
-_client = chromadb.PersistentClient(path=settings.CHROMA_PERSIST_DIR)
-_collection = _client.get_or_create_collection('career_copilot')
+logger = logging.getLogger(__name__)
+
+BACKENDS = {
+    'chroma': 'ai_engine.services.chroma_store',
+    'pgvector': 'ai_engine.services.pgvector_store',
+}
+
+
+def _backend():
+    """
+    The module storing vectors, chosen by ``VECTOR_BACKEND``. Each backend provides forget, warm_up,
+    is_loaded, upsert, get, delete, query and iter_documents with the signatures in chroma_store.
+    """
+    return import_module(BACKENDS[settings.VECTOR_BACKEND])
+
+
+def _forget_collection() -> None:
+    _backend().forget()
+
+
+def warm_up() -> None:
+    _backend().warm_up()
+
+
+def is_loaded() -> bool:
+    return _backend().is_loaded()
 
 
 def _embed(texts: List[str]) -> List[List[float]]:
-    client = get_openai_client()
-    result = client.embeddings.create(model=settings.OPENAI_EMBEDDING_MODEL, input=texts)
-    return [row.embedding for row in result.data]
+    with timed('embed'):
+        key = embedding_cache.embedding_key()
+        hashes = [embedding_cache.text_hash(text) for text in texts]
+        vectors = embedding_cache.get_many(key, hashes)
+
+        pending: Dict[str, str] = {}
+        for digest, text in zip(hashes, texts):
+            if digest not in vectors:
+                pending.setdefault(digest, text)
+
+        if pending:
+            client = get_openai_client('embedding')
+            # text-embedding-3 models shorten their output to ``dimensions`` when it is given.
+            options = {'dimensions': settings.EMBEDDING_DIMENSIONS} if settings.EMBEDDING_DIMENSIONS else {}
+            result = client.embeddings.create(model=settings.OPENAI_EMBEDDING_MODEL, input=list(pending.values()), **options)
+            metrics.record_tokens('embedding', result.usage)
+            fresh = {digest: row.embedding for digest, row in zip(pending, result.data)}
+            embedding_cache.set_many(key, fresh)
+            vectors.update(fresh)
+
+        hits = sum(1 for digest in hashes if digest not in pending)
+        embedding_cache.record(hits=hits, misses=len(pending))
+        logger.info('Embedding cache hits=%s misses=%s', hits, len(pending))
+        return [vectors[digest] for digest in hashes]
 
 
 def upsert_documents(ids: List[str], documents: List[str], metadatas: List[Dict[str, Any]]) -> None:
-    vectors = _embed(documents)
-    _collection.upsert(ids=ids, documents=documents, metadatas=metadatas, embeddings=vectors)
-
-
-def query_documents(user_id: int, query: str, top_k: int = 8) -> List[Dict[str, Any]]:
-    vector = _embed([query])[0]
-    result = _collection.query(
-        query_embeddings=[vector],
-        n_results=top_k,
-        where={'user_id': user_id},
-    )
-    ids = result.get('ids', [[]])[0]
-    docs = result.get('documents', [[]])[0]
-    metas = result.get('metadatas', [[]])[0]
-    distances = result.get('distances', [[]])[0]
-    return [
-        {
-            'id': ids[i],
-            'text': docs[i],
-            'metadata': metas[i],
-            'distance': distances[i] if i < len(distances) else None,
-        }
-        for i in range(len(ids))
-    ]
+    _backend().upsert(ids, documents, metadatas, _embed(documents))
+    lexical_index.index_documents(ids, documents, metadatas)
+    user_ids = {metadata['user_id'] for metadata in metadatas}
+    exact_index.invalidate(user_ids)
+    answer_cache.invalidate_users(user_ids)
+
+
+def document_ids(user_id: int, where: Optional[Dict[str, Any]] = None) -> List[str]:
+    return _backend().get(user_id, where)['ids']
+
+
+def delete_documents(user_id: int, ids: Optional[List[str]] = None, where: Optional[Dict[str, Any]] = None) -> None:
+    if ids is None:
+        ids = document_ids(user_id, where)
+    if not ids:
+        return
+    _backend().delete(user_id, ids)
+    lexical_index.delete_documents(ids)
+    exact_index.invalidate([user_id])
+    answer_cache.invalidate_users([user_id])
+
+
+def sync_documents(
+    user_id: int,
+    where: Dict[str, Any],
+    ids: List[str],
+    documents: List[str],
+    metadatas: List[Dict[str, Any]],
+) -> Dict[str, int]:
+    """
+    Makes the user's documents matching ``where`` exactly ``ids``. Chunks whose stored
+    ``content_hash`` matches are left alone, moved chunks reuse their stored vector, and
+    only text the store has never seen is embedded. Ids no longer present are deleted.
+    """
+    key = embedding_cache.embedding_key()
+    # The model and width are part of the hash so switching either re-embeds everything.
+    hashes = [embedding_cache.text_hash(f'{key}\n{document}') for document in documents]
+    metadatas = [{**metadata, 'content_hash': digest} for metadata, digest in zip(metadatas, hashes)]
+
+    backend = _backend()
+    stored = backend.get(user_id, where, include_embeddings=True)
+    stored_hashes = {doc_id: (meta or {}).get('content_hash') for doc_id, meta in zip(stored['ids'], stored['metadatas'])}
+    stored_vectors = {
+        stored_hashes[doc_id]: vector
+        for doc_id, vector in zip(stored['ids'], stored['embeddings'])
+        if stored_hashes[doc_id]
+    }
+
+    changed = [i for i, doc_id in enumerate(ids) if stored_hashes.get(doc_id) != hashes[i]]
+    fresh = [i for i in changed if hashes[i] not in stored_vectors]
+    vectors = {hashes[i]: stored_vectors[hashes[i]] for i in changed if hashes[i] in stored_vectors}
+    if fresh:
+        vectors.update(zip((hashes[i] for i in fresh), _embed([documents[i] for i in fresh])))
+
+    if changed:
+        changed_ids = [ids[i] for i in changed]
+        changed_documents = [documents[i] for i in changed]
+        changed_metadatas = [metadatas[i] for i in changed]
+        backend.upsert(changed_ids, changed_documents, changed_metadatas, [vectors[hashes[i]] for i in changed])
+        lexical_index.index_documents(changed_ids, changed_documents, changed_metadatas)
+
+    stale = sorted(set(stored_hashes) - set(ids))
+    if stale:
+        backend.delete(user_id, stale)
+        lexical_index.delete_documents(stale)
+    if changed or stale:
+        exact_index.invalidate([user_id])
+        answer_cache.invalidate_users([user_id])
+
+    summary = {
+        'unchanged': len(ids) - len(changed),
+        'reused': len(changed) - len(fresh),
+        'embedded': len(fresh),
+        'deleted': len(stale),
+    }
+    logger.info('Synced documents user_id=%s %s', user_id, ' '.join(f'{k}={v}' for k, v in summary.items()))
+    return summary
+
+
+def iter_documents(batch_size: int = 500) -> Iterator[Tuple[List[str], List[str], List[Dict[str, Any]]]]:
+    for page in _backend().iter_documents(batch_size=batch_size):
+        yield page['ids'], page['documents'], page['metadatas']
+
+
+def _vector_search(user_id: int, query: str, top_k: int) -> List[Dict[str, Any]]:
+    return search_by_vector(user_id, _embed([query])[0], top_k)
+
+
+def _loader(user_id: int):
+    return lambda full: _backend().get(user_id, include_embeddings=full, include_documents=full)
+
+
+def search_by_vector(user_id: int, vector: List[float], top_k: int) -> List[Dict[str, Any]]:
+    if settings.EXACT_SEARCH_ENABLED:
+        hits = exact_index.search(user_id, vector, top_k, _loader(user_id))
+        if hits is not None:
+            return hits
+    return _backend().query(user_id, vector, top_k)
+
+
+def user_vectors(user_id: int) -> Tuple[np.ndarray, List[Dict[str, Any]]]:
+    """
+    Every stored chunk vector of the user as unit rows of a float32 matrix, with each row's
+    metadata. Served from the exact-search matrix when there is one.
+    """
+    if settings.EXACT_SEARCH_ENABLED:
+        found = exact_index.matrix(user_id, _loader(user_id))
+        if found is not None:
+            return found
+    stored = _backend().get(user_id, include_embeddings=True)
+    if not stored['ids']:
+        # An empty array cannot be reshaped with an inferred width.
+        return np.zeros((0, 0), dtype=np.float32), []
+    matrix = np.asarray(stored['embeddings'], dtype=np.float32).reshape(len(stored['ids']), -1)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms), stored['metadatas']
+
+
+def _reciprocal_rank_fusion(rankings: List[List[Dict[str, Any]]], top_k: int) -> List[Dict[str, Any]]:
+    fused: Dict[str, Dict[str, Any]] = {}
+    scores: Dict[str, float] = {}
+    for ranking in rankings:
+        for rank, hit in enumerate(ranking, start=1):
+            scores[hit['id']] = scores.get(hit['id'], 0.0) + 1 / (settings.RRF_K + rank)
+            merged = fused.setdefault(hit['id'], {'id': hit['id'], 'text': hit['text'], 'metadata': hit['metadata'], 'distance': None})
+            if hit.get('distance') is not None:
+                merged['distance'] = hit['distance']
+    ordered = sorted(fused.values(), key=lambda hit: scores[hit['id']], reverse=True)
+    return ordered[:top_k]
+
+
+def query_documents(user_id: int, query: str, top_k: int = 8, mode: Optional[str] = None) -> List[Dict[str, Any]]:
+    mode = mode or settings.RETRIEVAL_MODE
+    if mode != 'hybrid':
+        return _vector_search(user_id, query, top_k)
+
+    # Each ranking is fetched deeper than top_k so fusion can promote hits the other one missed.
+    depth = top_k * 2
+    dense = _vector_search(user_id, query, depth)
+    try:
+        with timed('lexical_query'):
+            lexical = lexical_index.search(user_id, query, depth)
+    except Exception:
+        logger.exception('Lexical search failed, falling back to vector results.')
+        metrics.record_fallback('lexical_search')
+        return dense[:top_k]
+    return _reciprocal_rank_fusion([dense, lexical], top_k)
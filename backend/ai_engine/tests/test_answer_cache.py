@@ -0,0 +1,80 @@
+from unittest import mock
+
+from django.conf import settings
+from django.core.cache.backends.db import DatabaseCache
+from django.test import TestCase, override_settings
+
+from ai_engine.services import answer_cache
+
+CONTEXTS = [{'id': 'resume-1-0', 'text': 'Python and Django.'}, {'id': 'job-2-0', 'text': 'Backend role.'}]
+
+
+def _key(user_id=1, mode='chat', question='What stack do I know?', contexts=CONTEXTS, model='gpt-4o-mini', version='v1'):
+    return answer_cache.make_key(user_id, mode, question, contexts, model, version)
+
+
+@override_settings(ANSWER_CACHE_ENABLED=True, ANSWER_CACHE_TTL=60)
+class AnswerCacheTests(TestCase):
+    def setUp(self):
+        self.addCleanup(answer_cache._cache().clear)
+
+    def test_key_is_stable_across_question_formatting(self):
+        self.assertEqual(_key(), _key(question='  what STACK do i know '))
+        self.assertEqual(_key(), _key(question='What stack do I know?!'))
+
+    def test_key_changes_with_every_input(self):
+        base = _key()
+        variants = [
+            _key(user_id=2),
+            _key(mode='analysis'),
+            _key(question='What stack does the job use?'),
+            _key(contexts=[{**CONTEXTS[0], 'text': 'Python, Django and Go.'}, CONTEXTS[1]]),
+            _key(contexts=[{**CONTEXTS[0], 'id': 'resume-1-1'}, CONTEXTS[1]]),
+            _key(contexts=list(reversed(CONTEXTS))),
+            _key(model='gpt-4o'),
+            _key(version='v2'),
+        ]
+        self.assertNotIn(base, variants)
+        self.assertEqual(len(set(variants)), len(variants))
+
+    def test_invalidate_changes_only_that_users_keys(self):
+        mine, theirs = _key(user_id=1), _key(user_id=2)
+
+        answer_cache.invalidate_users([1])
+        after_first = _key(user_id=1)
+        answer_cache.invalidate_users([1])
+
+        self.assertNotEqual(after_first, mine)
+        self.assertNotIn(_key(user_id=1), (mine, after_first))
+        self.assertEqual(_key(user_id=2), theirs)
+
+    def test_invalidation_is_visible_to_other_processes(self):
+        answer_cache.invalidate_users([1])
+
+        # Another gunicorn worker reads the same table through its own cache instance.
+        other = DatabaseCache(settings.CACHES['answers']['LOCATION'], {})
+        self.assertEqual(other.get(answer_cache._generation_key(1)), 1)
+
+    def test_store_then_lookup(self):
+        key = _key()
+        self.assertIsNone(answer_cache.lookup(key, 'chat'))
+
+        answer_cache.store(key, {'answer': 'Python.'})
+
+        self.assertEqual(answer_cache.lookup(key, 'chat'), {'answer': 'Python.'})
+
+    def test_disabled_cache_neither_stores_nor_serves(self):
+        key = _key()
+        answer_cache.store(key, {'answer': 'Python.'})
+
+        with override_settings(ANSWER_CACHE_ENABLED=False):
+            self.assertIsNone(answer_cache.lookup(key, 'chat'))
+            answer_cache.store(_key(mode='analysis'), {'answer': 'Go.'})
+        self.assertIsNone(answer_cache.lookup(_key(mode='analysis'), 'analysis'))
+
+    def test_unavailable_cache_degrades_to_misses(self):
+        with mock.patch.object(answer_cache, '_cache', side_effect=RuntimeError('no such table: answer_cache')):
+            with self.assertLogs('ai_engine.services.answer_cache', 'ERROR'):
+                key = _key()
+                self.assertIsNone(answer_cache.lookup(key, 'chat'))
+                answer_cache.store(key, {'answer': 'Python.'})
@@ -0,0 +1,93 @@
+from django.test import SimpleTestCase, override_settings
+
+from ai_engine.services.chunking import _sections, _split, chunk_document
+from ai_engine.services.tokens import count_tokens
+
+EXPERIENCE = '\n'.join(
+    f'- Led project {i}: migrated the billing service to PostgreSQL and cut p95 latency by {i}0%.' for i in range(1, 9)
+)
+BULLET = '- Led the migration of the billing service to PostgreSQL and cut p95 latency by forty percent.'
+
+
+@override_settings(EMBEDDING_DIMENSIONS=0, OPENAI_EMBEDDING_MODEL='text-embedding-3-small')
+class ChunkDocumentTests(SimpleTestCase):
+    def full(self) -> int:
+        # Exactly one EXPERIENCE chunk's worth, so nothing else fits beside it.
+        return count_tokens('EXPERIENCE') + 1 + count_tokens(BULLET) + 1
+
+    def test_short_tail_section_joins_the_previous_chunk(self):
+        chunks = chunk_document(f'EXPERIENCE\n{BULLET}\n\nLANGUAGES\nFrench\n', max_tokens=self.full(), min_tokens=8)
+
+        self.assertEqual(chunks, [f'EXPERIENCE\n{BULLET}\nLANGUAGES\nFrench'])
+
+    def test_short_lead_joins_the_next_chunk(self):
+        chunks = chunk_document(f'Jane Doe\n\nEXPERIENCE\n{BULLET}\n', max_tokens=self.full(), min_tokens=8)
+
+        self.assertEqual(chunks, [f'Jane Doe\nEXPERIENCE\n{BULLET}'])
+
+    def test_short_section_between_full_chunks_is_kept(self):
+        projects = BULLET.replace('billing', 'search')
+        text = f'EXPERIENCE\n{BULLET}\n\nLANGUAGES\nFrench\n\nEXPERIENCE\n{projects}\n'
+
+        chunks = chunk_document(text, max_tokens=self.full(), min_tokens=8)
+
+        self.assertEqual(chunks, [f'EXPERIENCE\n{BULLET}\nLANGUAGES\nFrench', f'EXPERIENCE\n{projects}'])
+
+    def test_every_chunk_starts_with_title_and_heading(self):
+        chunks = chunk_document(f'EXPERIENCE\n{EXPERIENCE}\n', title='Engineer at Acme', max_tokens=60)
+
+        self.assertGreater(len(chunks), 1)
+        for chunk in chunks:
+            self.assertTrue(chunk.startswith('Engineer at Acme\nEXPERIENCE\n'), chunk)
+
+    def test_chunks_stay_within_budget_and_keep_bullets_whole(self):
+        chunks = chunk_document(f'EXPERIENCE\n{EXPERIENCE}\n', max_tokens=60)
+
+        for chunk in chunks:
+            self.assertLessEqual(count_tokens(chunk), 60)
+        bullets = [line for chunk in chunks for line in chunk.splitlines() if line.startswith('- ')]
+        self.assertEqual(bullets, EXPERIENCE.splitlines())
+
+    def test_short_sections_share_a_chunk(self):
+        chunks = chunk_document('SKILLS\nPython, Go\n\nEDUCATION\nBSc Computer Science, 2015\n', max_tokens=60)
+
+        self.assertEqual(chunks, ['SKILLS\nPython, Go\nEDUCATION\nBSc Computer Science, 2015'])
+
+    def test_drops_page_footers_and_repeated_blocks(self):
+        text = 'SUMMARY\nBackend engineer.\nJane Doe | Page 1 of 2\n\n2\n\nSUMMARY\nBackend engineer.\n'
+
+        chunks = chunk_document(text, max_tokens=60)
+
+        self.assertEqual(chunks, ['SUMMARY\nBackend engineer.'])
+
+    def test_empty_text_has_no_chunks(self):
+        self.assertEqual(chunk_document('  \n\n---\n'), [])
+
+
+class SectionsTests(SimpleTestCase):
+    def test_joins_wrapped_lines_and_splits_bullets(self):
+        text = 'Requirements:\nFive years of\nPython in production.\n- Django\n- PostgreSQL\n'
+
+        self.assertEqual(
+            _sections(text), [('Requirements', ['Five years of Python in production.', '- Django', '- PostgreSQL'])]
+        )
+
+
+@override_settings(EMBEDDING_DIMENSIONS=0, OPENAI_EMBEDDING_MODEL='text-embedding-3-small')
+class SplitTests(SimpleTestCase):
+    def test_splits_at_sentence_ends(self):
+        block = 'First sentence is here. Second sentence is here. Third sentence is here.'
+
+        pieces = _split(block, 8)
+
+        self.assertEqual(pieces, ['First sentence is here.', 'Second sentence is here.', 'Third sentence is here.'])
+
+    def test_splits_one_long_sentence_at_words(self):
+        block = ' '.join(f'word{i}' for i in range(40))
+
+        pieces = _split(block, 10)
+
+        self.assertGreater(len(pieces), 1)
+        self.assertEqual(' '.join(pieces), block)
+        for piece in pieces:
+            self.assertLessEqual(count_tokens(piece), 10)
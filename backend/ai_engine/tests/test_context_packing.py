@@ -0,0 +1,101 @@
+from django.test import SimpleTestCase, override_settings
+
+from ai_engine.services import context_packing
+from ai_engine.services.context_packing import pack
+from ai_engine.services.tokens import count_tokens
+
+
+def _resume(idx, text, resume_id=1):
+    metadata = {'source': 'resume', 'resume_id': resume_id, 'idx': idx}
+    return {'id': f'resume-{resume_id}-{idx}', 'text': text, 'metadata': metadata}
+
+
+def _job(idx, text, job_id=2):
+    metadata = {'source': 'job', 'job_id': job_id, 'idx': idx}
+    return {'id': f'job-{job_id}-{idx}', 'text': text, 'metadata': metadata}
+
+
+@override_settings(OPENAI_MODEL='gpt-4o-mini')
+class PackTests(SimpleTestCase):
+    def test_merges_adjacent_chunks_without_repeated_headings(self):
+        contexts = [
+            _job(1, 'Engineer at Acme\nREQUIREMENTS\n- Django and PostgreSQL.'),
+            _job(0, 'Engineer at Acme\nREQUIREMENTS\n- Five years of Python.'),
+        ]
+
+        packed = pack(contexts, 500)
+
+        self.assertEqual(
+            packed,
+            [{'source': 'job', 'text': 'Engineer at Acme\nREQUIREMENTS\n- Five years of Python.\n- Django and PostgreSQL.'}],
+        )
+
+    def test_joins_character_windows_on_their_overlap(self):
+        text = 'Led the migration of the billing service to PostgreSQL and cut p95 latency by forty percent overall.'
+        contexts = [_resume(0, text[:70]), _resume(1, text[40:])]
+
+        self.assertEqual(pack(contexts, 500), [{'source': 'resume', 'text': text}])
+
+    def test_keeps_other_documents_and_gaps_apart(self):
+        contexts = [
+            _resume(0, 'SKILLS\n- Python.'),
+            _resume(2, 'EDUCATION\n- BSc Computer Science.'),
+            _resume(1, 'SKILLS\n- Go.', resume_id=9),
+        ]
+
+        packed = pack(contexts, 500)
+
+        self.assertEqual(
+            [p['text'] for p in packed], ['SKILLS\n- Python.', 'EDUCATION\n- BSc Computer Science.', 'SKILLS\n- Go.']
+        )
+
+    def test_passages_follow_their_best_ranked_chunk(self):
+        contexts = [
+            _job(5, 'Engineer at Acme\nBENEFITS\n- Free lunch.'),
+            _resume(0, 'SKILLS\n- Python.'),
+            _job(4, 'Engineer at Acme\nREQUIREMENTS\n- Python.'),
+        ]
+
+        packed = pack(contexts, 500)
+
+        self.assertEqual([p['source'] for p in packed], ['job', 'resume'])
+        self.assertIn('Free lunch', packed[0]['text'])
+
+    def test_drops_duplicate_passages(self):
+        contexts = [_resume(0, 'SKILLS\n- Python.'), _resume(0, 'SKILLS\n- Python.', resume_id=2)]
+
+        self.assertEqual(len(pack(contexts, 500)), 1)
+
+    def test_stays_within_budget_and_cuts_the_last_passage(self):
+        long_text = ' '.join(f'Sentence number {i} about distributed systems.' for i in range(60))
+        contexts = [_resume(0, 'SKILLS\n- Python.'), _job(0, long_text)]
+
+        packed = pack(contexts, 80)
+
+        self.assertEqual(packed[0]['text'], 'SKILLS\n- Python.')
+        self.assertTrue(long_text.startswith(packed[1]['text']))
+        self.assertLessEqual(sum(count_tokens(p['text'], 'gpt-4o-mini') for p in packed), 80)
+
+    def test_skips_a_passage_when_too_little_budget_is_left(self):
+        contexts = [_resume(0, ' '.join(['word'] * 60)), _job(0, ' '.join(['other'] * 60))]
+
+        packed = pack(contexts, count_tokens(contexts[0]['text'], 'gpt-4o-mini') + 5)
+
+        self.assertEqual(len(packed), 1)
+
+
+@override_settings(OPENAI_MODEL='gpt-4o-mini', CONTEXT_MAX_TOKENS=500)
+class PromptContextsTests(SimpleTestCase):
+    def test_disabled_sends_the_first_legacy_contexts_as_retrieved(self):
+        contexts = [_resume(i, f'Line {i}.') for i in range(20)]
+
+        with override_settings(CONTEXT_PACKING_ENABLED=False):
+            sent = context_packing.prompt_contexts(contexts, 'chat')
+
+        self.assertEqual(sent, contexts[: context_packing.LEGACY_CONTEXTS])
+
+    def test_signature_names_the_budget(self):
+        with override_settings(CONTEXT_PACKING_ENABLED=True):
+            self.assertEqual(context_packing.signature(), f'pack-{context_packing.VERSION}:500')
+        with override_settings(CONTEXT_PACKING_ENABLED=False):
+            self.assertEqual(context_packing.signature(), '')
@@ -0,0 +1,154 @@
+import os
+import tempfile
+from typing import Any, Dict, List
+from unittest import mock
+
+import numpy as np
+from django.test import SimpleTestCase, override_settings
+
+from ai_engine.services import exact_index
+
+USER_ID = 7
+
+
+class FakeStore:
+    """A user's vectors as the backend returns them, counting full loads."""
+
+    def __init__(self, vectors: Dict[str, List[float]]):
+        self.vectors = dict(vectors)
+        self.full_loads = 0
+        self.on_full_load = None
+
+    def load(self, full: bool) -> Dict[str, List[Any]]:
+        ids = sorted(self.vectors)
+        stored = {'ids': ids, 'metadatas': [{'user_id': USER_ID, 'chunk': doc_id} for doc_id in ids]}
+        if not full:
+            return stored
+        self.full_loads += 1
+        if self.on_full_load:
+            self.on_full_load()
+        return {**stored, 'embeddings': [self.vectors[doc_id] for doc_id in ids], 'documents': ids}
+
+
+class ExactIndexTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        settings_override = override_settings(
+            EXACT_SEARCH_ENABLED=True,
+            EXACT_SEARCH_DIR=directory.name,
+            EXACT_SEARCH_MAX_CHUNKS=10,
+            EXACT_SEARCH_CACHE_USERS=4,
+            VECTOR_QUANTIZATION='none',
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        exact_index._entries.clear()
+        self.addCleanup(exact_index._entries.clear)
+        self.store = FakeStore({'a': [1.0, 0.0], 'b': [0.0, 2.0], 'c': [1.0, 1.0]})
+
+    def search(self, vector: List[float], top_k: int = 2):
+        return exact_index.search(USER_ID, vector, top_k, self.store.load)
+
+    def test_build_publishes_unit_rows_and_ranks_by_cosine(self):
+        hits = self.search([0.0, 1.0])
+
+        self.assertEqual([hit['id'] for hit in hits], ['b', 'c'])
+        self.assertAlmostEqual(hits[0]['distance'], 0.0, places=6)
+        matrix, metadatas = exact_index.matrix(USER_ID, self.store.load)
+        np.testing.assert_allclose(np.linalg.norm(matrix, axis=1), 1.0, rtol=1e-6)
+        self.assertEqual([metadata['chunk'] for metadata in metadatas], ['a', 'b', 'c'])
+
+    def test_published_matrix_is_reused(self):
+        self.search([0.0, 1.0])
+        exact_index._entries.clear()
+        self.search([1.0, 0.0])
+
+        self.assertEqual(self.store.full_loads, 1)
+
+    def test_invalidate_drops_files_and_cached_entry(self):
+        self.search([0.0, 1.0])
+        self.store.vectors['d'] = [0.0, -1.0]
+        exact_index.invalidate([USER_ID])
+
+        records_path, epoch_path = exact_index._paths(USER_ID)
+        self.assertEqual(exact_index._matrix_files(USER_ID), [])
+        self.assertFalse(records_path.exists())
+        self.assertTrue(epoch_path.exists())
+        self.assertNotIn(USER_ID, exact_index._entries)
+        self.assertEqual(self.search([0.0, -1.0], top_k=1)[0]['id'], 'd')
+        self.assertEqual(self.store.full_loads, 2)
+
+    def test_write_during_build_discards_the_stale_snapshot(self):
+        # A write lands after the build read the store but before it published.
+        self.store.on_full_load = lambda: exact_index.invalidate([USER_ID])
+
+        self.assertIsNone(self.search([0.0, 1.0]))
+        records_path, _ = exact_index._paths(USER_ID)
+        self.assertFalse(records_path.exists())
+        self.assertEqual(exact_index._matrix_files(USER_ID), [])
+        self.assertEqual(list(records_path.parent.glob('*.json.*')), [])
+
+        self.store.on_full_load = None
+        self.assertEqual([hit['id'] for hit in self.search([0.0, 1.0])], ['b', 'c'])
+
+    def test_write_between_epoch_check_and_publish_takes_the_snapshot_back(self):
+        records_path, _ = exact_index._paths(USER_ID)
+        replace = os.replace
+
+        def write_then_replace(source, target):
+            if target == records_path:
+                exact_index.invalidate([USER_ID])
+            replace(source, target)
+
+        with mock.patch.object(exact_index.os, 'replace', side_effect=write_then_replace):
+            self.assertIsNone(self.search([0.0, 1.0]))
+
+        self.assertFalse(records_path.exists())
+        self.assertEqual(exact_index._matrix_files(USER_ID), [])
+
+    def test_readers_open_the_matrix_their_records_name(self):
+        self.search([0.0, 1.0])
+        first = exact_index._entries[USER_ID]
+        self.store.vectors.update({'d': [0.0, -1.0], 'e': [-1.0, 0.0]})
+        # A concurrent build publishes a larger snapshot without an invalidate in between.
+        exact_index._build(USER_ID, self.store.load)
+        exact_index._entries.clear()
+        second = exact_index._read(USER_ID)
+
+        self.assertEqual(len(first[1]), len(first[3]['ids']))
+        self.assertEqual(len(second[1]), len(second[3]['ids']))
+        self.assertEqual(len(second[3]['ids']), 5)
+        self.assertNotEqual(first[3]['matrix'], second[3]['matrix'])
+
+    def test_build_for_oversized_user_records_only_the_count(self):
+        with override_settings(EXACT_SEARCH_MAX_CHUNKS=2):
+            self.assertIsNone(self.search([0.0, 1.0]))
+            self.assertIsNone(exact_index.matrix(USER_ID, self.store.load))
+        self.assertEqual(self.store.full_loads, 0)
+
+    def test_layout_change_rebuilds(self):
+        self.search([0.0, 1.0])
+        with override_settings(VECTOR_QUANTIZATION='int8', VECTOR_RERANK_FACTOR=2):
+            hits = self.search([0.0, 1.0])
+            records = exact_index._read(USER_ID)[3]
+
+        self.assertEqual([hit['id'] for hit in hits], ['b', 'c'])
+        self.assertEqual(self.store.full_loads, 2)
+        self.assertTrue(records['quantized'].endswith('.int8.npy'))
+        self.assertTrue(exact_index._paths(USER_ID)[0].with_name(records['quantized']).exists())
+
+    def test_empty_user(self):
+        self.store.vectors.clear()
+
+        self.assertEqual(self.search([0.0, 1.0]), [])
+        matrix, metadatas = exact_index.matrix(USER_ID, self.store.load)
+        self.assertEqual(matrix.shape, (0, 0))
+        self.assertEqual(metadatas, [])
+
+    def test_invalidate_is_a_no_op_when_disabled(self):
+        self.search([0.0, 1.0])
+        with override_settings(EXACT_SEARCH_ENABLED=False), mock.patch.object(exact_index, '_paths') as paths:
+            exact_index.invalidate([USER_ID])
+        paths.assert_not_called()
+        self.assertIn(USER_ID, exact_index._entries)
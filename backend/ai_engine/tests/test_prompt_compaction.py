@@ -0,0 +1,92 @@
+from django.test import SimpleTestCase, override_settings
+
+from ai_engine.services.prompt_compaction import compact
+from ai_engine.services.tokens import count_tokens
+
+PRIVACY_POSTING = """Privacy Engineer
+
+About the role
+You will own how personal data moves through our platform.
+
+PRIVACY ENGINEERING REQUIREMENTS
+- Built GDPR deletion pipelines across services.
+- Applied differential privacy to analytics.
+
+DIVERSITY AND INCLUSION TOOLING
+- Shipped consent and accessibility tooling used by every product team.
+
+About Acme
+Acme has been a leader in widgets since 1999.
+
+Benefits:
+- Unlimited PTO.
+- Free lunch.
+
+Privacy notice
+We process applicant data as described in our policy.
+
+Acme is an equal opportunity employer and hires without regard to race or gender.
+"""
+
+
+@override_settings(OPENAI_MODEL='gpt-4o-mini')
+class CompactTests(SimpleTestCase):
+    def test_strips_boilerplate_sections_and_paragraphs(self):
+        text = compact(PRIVACY_POSTING, 1000, strip_boilerplate=True)
+
+        self.assertNotIn('Unlimited PTO', text)
+        self.assertNotIn('leader in widgets', text)
+        self.assertNotIn('applicant data', text)
+        self.assertNotIn('equal opportunity', text)
+
+    def test_keeps_sections_whose_heading_only_contains_a_boilerplate_word(self):
+        text = compact(PRIVACY_POSTING, 1000, strip_boilerplate=True)
+
+        self.assertIn('GDPR deletion pipelines', text)
+        self.assertIn('differential privacy', text)
+        self.assertIn('consent and accessibility tooling', text)
+        self.assertIn('own how personal data moves', text)
+
+    def test_keeps_boilerplate_shaped_heading_that_names_core_content(self):
+        posting = 'Engineer\n\nBenefits and perks\n- Free lunch.\n\nAbout you\n- Five years of Go.\n\nAbout our stack\n- Go, Kafka.\n'
+
+        text = compact(posting, 1000, strip_boilerplate=True)
+
+        self.assertIn('Five years of Go', text)
+        self.assertIn('Go, Kafka', text)
+        self.assertNotIn('Free lunch', text)
+
+    def test_leaves_resumes_unstripped(self):
+        resume = 'Jane Doe\n\nAbout me\nBackend engineer.\n\nBenefits\nVolunteer benefits coordinator.\n'
+
+        text = compact(resume, 1000)
+
+        self.assertIn('Volunteer benefits coordinator', text)
+        self.assertIn('Backend engineer', text)
+
+    def test_drops_repeated_lines_and_normalizes_whitespace(self):
+        text = compact('Requirements:\n-   Python   and  Django.\n\nRequirements:\n-   Python   and  Django.\n', 1000)
+
+        self.assertEqual(text.count('Python and Django.'), 1)
+
+    def test_over_budget_keeps_core_sections_first_in_original_order(self):
+        filler = ' '.join(f'word{i}' for i in range(120))
+        posting = f'Backend Engineer\n\nOur story\n{filler}.\n\nRequirements\n- Python and PostgreSQL.\n\nTeam events\n{filler}.\n'
+
+        text = compact(posting, 40)
+
+        self.assertLessEqual(count_tokens(text, 'gpt-4o-mini'), 40)
+        self.assertIn('Python and PostgreSQL', text)
+        self.assertLess(text.index('Backend Engineer'), text.index('Python and PostgreSQL'))
+
+    def test_prefers_sections_sharing_terms_with_the_reference(self):
+        posting = (
+            'Engineer\n\nRequirements\n- Python.\n\n'
+            'Tools\nKubernetes Terraform Helm clusters operated daily.\n\n'
+            'Office\nDowntown office with a rooftop garden and bikes.\n'
+        )
+
+        text = compact(posting, 24, reference='Operated Kubernetes and Terraform clusters.')
+
+        self.assertIn('Kubernetes', text)
+        self.assertNotIn('rooftop', text)
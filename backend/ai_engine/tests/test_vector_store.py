@@ -0,0 +1,139 @@
+from typing import Any, Dict, List, Optional
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from ai_engine.services import vector_store
+
+USER_ID = 7
+WHERE = {'resume_id': 3}
+
+
+class FakeBackend:
+    """The slice of the backend interface sync_documents uses, held in a dict."""
+
+    def __init__(self):
+        self.rows: Dict[str, Dict[str, Any]] = {}
+        self.upserted: List[str] = []
+        self.deleted: List[str] = []
+
+    def get(
+        self,
+        user_id: int,
+        where: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+        include_documents: bool = False,
+    ) -> Dict[str, List[Any]]:
+        ids = [
+            doc_id
+            for doc_id, row in self.rows.items()
+            if row['metadata']['user_id'] == user_id
+            and all(row['metadata'].get(key) == value for key, value in (where or {}).items())
+        ]
+        return {
+            'ids': ids,
+            'metadatas': [self.rows[doc_id]['metadata'] for doc_id in ids],
+            'embeddings': [self.rows[doc_id]['embedding'] for doc_id in ids] if include_embeddings else [],
+            'documents': [self.rows[doc_id]['document'] for doc_id in ids] if include_documents else [],
+        }
+
+    def upsert(self, ids, documents, metadatas, embeddings) -> None:
+        self.upserted.extend(ids)
+        for doc_id, document, metadata, embedding in zip(ids, documents, metadatas, embeddings):
+            self.rows[doc_id] = {'document': document, 'metadata': metadata, 'embedding': embedding}
+
+    def delete(self, user_id: int, ids: List[str]) -> None:
+        self.deleted.extend(ids)
+        for doc_id in ids:
+            self.rows.pop(doc_id, None)
+
+
+def _vector(text: str) -> List[float]:
+    return [float(len(text)), float(sum(map(ord, text)))]
+
+
+def _chunks(documents: List[str]):
+    ids = [f'resume-3-{i}' for i in range(len(documents))]
+    metadatas = [{'user_id': USER_ID, 'source': 'resume', 'resume_id': 3, 'idx': i} for i in range(len(documents))]
+    return ids, documents, metadatas
+
+
+@override_settings(OPENAI_EMBEDDING_MODEL='text-embedding-3-small', EMBEDDING_DIMENSIONS=0)
+class SyncDocumentsTests(SimpleTestCase):
+    def setUp(self):
+        self.backend = FakeBackend()
+        self.embed = mock.Mock(side_effect=lambda texts: [_vector(text) for text in texts])
+        for target, value in (
+            ('_backend', lambda: self.backend),
+            ('_embed', self.embed),
+            ('lexical_index', mock.Mock()),
+            ('answer_cache', mock.Mock()),
+            ('exact_index', mock.Mock()),
+        ):
+            patcher = mock.patch.object(vector_store, target, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.sync(['Summary', 'Experience at Acme', 'Skills: Python'])
+        self.backend.upserted.clear()
+        self.embed.reset_mock()
+        vector_store.exact_index.reset_mock()
+
+    def sync(self, documents: List[str]) -> Dict[str, int]:
+        return vector_store.sync_documents(USER_ID, WHERE, *_chunks(documents))
+
+    def assertStored(self, documents: List[str]):
+        ids, _, _ = _chunks(documents)
+        stored = self.backend.get(USER_ID, WHERE, include_embeddings=True, include_documents=True)
+        self.assertEqual(sorted(stored['ids']), sorted(ids))
+        for doc_id, document in zip(ids, documents):
+            self.assertEqual(self.backend.rows[doc_id]['document'], document)
+            self.assertEqual(self.backend.rows[doc_id]['embedding'], _vector(document))
+
+    def test_unchanged_documents_are_not_written(self):
+        summary = self.sync(['Summary', 'Experience at Acme', 'Skills: Python'])
+
+        self.assertEqual(summary, {'unchanged': 3, 'reused': 0, 'embedded': 0, 'deleted': 0})
+        self.embed.assert_not_called()
+        self.assertEqual(self.backend.upserted, [])
+        vector_store.exact_index.invalidate.assert_not_called()
+
+    def test_moved_chunks_reuse_their_stored_vectors(self):
+        documents = ['Experience at Acme', 'Summary', 'Skills: Python']
+        summary = self.sync(documents)
+
+        self.assertEqual(summary, {'unchanged': 1, 'reused': 2, 'embedded': 0, 'deleted': 0})
+        self.embed.assert_not_called()
+        self.assertEqual(sorted(self.backend.upserted), ['resume-3-0', 'resume-3-1'])
+        self.assertStored(documents)
+        vector_store.exact_index.invalidate.assert_called_once_with([USER_ID])
+
+    def test_edited_chunk_is_the_only_one_embedded(self):
+        documents = ['Summary', 'Experience at Acme and Globex', 'Skills: Python']
+        summary = self.sync(documents)
+
+        self.assertEqual(summary, {'unchanged': 2, 'reused': 0, 'embedded': 1, 'deleted': 0})
+        self.embed.assert_called_once_with(['Experience at Acme and Globex'])
+        self.assertEqual(self.backend.upserted, ['resume-3-1'])
+        self.assertStored(documents)
+
+    def test_trimmed_tail_is_deleted(self):
+        summary = self.sync(['Summary', 'Experience at Acme'])
+
+        self.assertEqual(summary, {'unchanged': 2, 'reused': 0, 'embedded': 0, 'deleted': 1})
+        self.assertEqual(self.backend.deleted, ['resume-3-2'])
+        self.assertStored(['Summary', 'Experience at Acme'])
+        vector_store.lexical_index.delete_documents.assert_called_once_with(['resume-3-2'])
+        vector_store.exact_index.invalidate.assert_called_once_with([USER_ID])
+
+    def test_other_documents_of_the_user_are_left_alone(self):
+        self.backend.upsert(['job-9-0'], ['Job'], [{'user_id': USER_ID, 'source': 'job', 'job_id': 9}], [[1.0, 1.0]])
+        self.sync([])
+
+        self.assertIn('job-9-0', self.backend.rows)
+        self.assertEqual(sorted(self.backend.deleted), ['resume-3-0', 'resume-3-1', 'resume-3-2'])
+
+    def test_new_embedding_model_re_embeds_everything(self):
+        with override_settings(OPENAI_EMBEDDING_MODEL='text-embedding-3-large'):
+            summary = self.sync(['Summary', 'Experience at Acme', 'Skills: Python'])
+
+        self.assertEqual(summary, {'unchanged': 0, 'reused': 0, 'embedded': 3, 'deleted': 0})
@@ -1,15 +1,34 @@
 from rest_framework import permissions, response, status, viewsets, mixins
 from rest_framework.decorators import action
 
+from core import metrics
+from core.timing import timed
 from jobs.models import JobDescription
 from resumes.models import Resume
 
 from .models import AnalysisResult
-from .serializers import AnalyzeRequestSerializer, MatchRequestSerializer, TailorRequestSerializer, AnalysisResultSerializer
+from .serializers import (
+    AnalysisResultSerializer,
+    AnalyzeRequestSerializer,
+    BatchMatchRequestSerializer,
+    MatchRequestSerializer,
+    RankJobsRequestSerializer,
+    TailorRequestSerializer,
+)
+from .services import job_ranking, match_batch, match_store
 from .services.crag import CRAGService
 from .throttles import CopilotThrottle
 
 
+def _resume_not_ready(resume: Resume):
+    """409 while a resume is queued, being extracted or failed: it has no text to send the model yet."""
+    if resume.status == Resume.Status.INDEXED:
+        return None
+    return response.Response(
+        {'detail': 'Resume is not processed yet.', 'status': resume.status}, status=status.HTTP_409_CONFLICT
+    )
+
+
 class CopilotViewSet(viewsets.ViewSet):
     permission_classes = [permissions.IsAuthenticated]
     throttle_classes = [CopilotThrottle]
@@ -24,7 +43,7 @@ class CopilotViewSet(viewsets.ViewSet):
 
         crag = CRAGService(max_retries=2)
         contexts = crag.retry_logic(user_id=request.user.id, question=query, top_k=top_k)
-        data = crag.generate_answer(question=query, contexts=contexts, mode='analysis')
+        data = crag.generate_answer(question=query, contexts=contexts, mode='analysis', user_id=request.user.id)
         return response.Response(data, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=['post'])
@@ -44,7 +63,10 @@ class CopilotViewSet(viewsets.ViewSet):
             job = JobDescription.objects.filter(id=job_id, user=request.user).first()
             if not resume or not job:
                 return response.Response({'detail': 'Resume or job not found.'}, status=status.HTTP_404_NOT_FOUND)
-            
+            not_ready = _resume_not_ready(resume)
+            if not_ready is not None:
+                return not_ready
+
             data = crag.tailor_resume_job(resume_text=resume.extracted_text, job_text=job.description)
             return response.Response(data, status=status.HTTP_200_OK)
 
@@ -53,7 +75,7 @@ class CopilotViewSet(viewsets.ViewSet):
              return response.Response({'detail': 'Query is required if resume_id/job_id are missing.'}, status=status.HTTP_400_BAD_REQUEST)
 
         contexts = crag.retry_logic(user_id=request.user.id, question=query, top_k=top_k)
-        data = crag.generate_answer(question=query, contexts=contexts, mode='tailor')
+        data = crag.generate_answer(question=query, contexts=contexts, mode='tailor', user_id=request.user.id)
         return response.Response(data, status=status.HTTP_200_OK)
 
     @action(detail=False, methods=['post'])
@@ -65,22 +87,85 @@ class CopilotViewSet(viewsets.ViewSet):
         job = JobDescription.objects.filter(id=serializer.validated_data['job_id'], user=request.user).first()
         if not resume or not job:
             return response.Response({'detail': 'Resume or job not found.'}, status=status.HTTP_404_NOT_FOUND)
+        not_ready = _resume_not_ready(resume)
+        if not_ready is not None:
+            return not_ready
+
+        if not serializer.validated_data['force']:
+            cached = match_store.find_cached(request.user, resume, job)
+            metrics.record_cache('match', hits=int(cached is not None), misses=int(cached is None))
+            if cached is not None:
+                copy = match_store.reuse_result(cached, resume, job)
+                if copy is not None:
+                    with timed('db_write'):
+                        copy.save()
+                return response.Response({**cached.to_match_payload(), 'cached': True}, status=status.HTTP_200_OK)
 
         crag = CRAGService(max_retries=2)
         data = crag.match_resume_job(resume_text=resume.extracted_text, job_text=job.description)
 
         # Persist Analysis Result
-        AnalysisResult.objects.create(
-            user=request.user,
-            resume=resume,
-            job=job,
-            match_score=data.get('match_score', 0),
-            matched_keywords=data.get('matched_keywords', []),
-            missing_keywords=data.get('missing_keywords', []),
-            improvement_suggestions=data.get('improvement_suggestions', []),
+        with timed('db_write'):
+            match_store.build_result(request.user, resume, job, data).save()
+
+        data.pop('failed', None)
+        return response.Response({**data, 'cached': False}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], url_path='match/batch')
+    def batch_match(self, request):
+        serializer = BatchMatchRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        resume = Resume.objects.filter(id=serializer.validated_data['resume_id'], user=request.user).first()
+        if not resume:
+            return response.Response({'detail': 'Resume not found.'}, status=status.HTTP_404_NOT_FOUND)
+        not_ready = _resume_not_ready(resume)
+        if not_ready is not None:
+            return not_ready
+
+        job_ids = serializer.validated_data['job_ids']
+        jobs = JobDescription.objects.filter(user=request.user, id__in=job_ids).in_bulk()
+        results, errors = match_batch.match_jobs(
+            request.user, resume, [jobs[job_id] for job_id in job_ids if job_id in jobs], serializer.validated_data['force']
+        )
+        errors.update({job_id: 'not_found' for job_id in job_ids if job_id not in jobs})
+
+        return response.Response(
+            {
+                'resume_id': resume.id,
+                'results': results,
+                'errors': [{'job_id': job_id, 'error': errors[job_id]} for job_id in job_ids if job_id in errors],
+            },
+            status=status.HTTP_200_OK,
         )
 
-        return response.Response(data, status=status.HTTP_200_OK)
+    # Pure vector math with no LLM call, so the LLM throttle does not apply.
+    @action(detail=False, methods=['post'], url_path='rank-jobs', throttle_classes=[])
+    def rank_jobs(self, request):
+        serializer = RankJobsRequestSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+
+        resume = Resume.objects.filter(id=serializer.validated_data['resume_id'], user=request.user).first()
+        if not resume:
+            return response.Response({'detail': 'Resume not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        jobs = JobDescription.objects.filter(user=request.user).only('id', 'role', 'company').in_bulk()
+        ranked = job_ranking.rank_jobs(request.user.id, resume.id, jobs)
+        if ranked is None:
+            return response.Response({'detail': 'Resume is not indexed yet.'}, status=status.HTTP_409_CONFLICT)
+
+        scores, unindexed = ranked
+        return response.Response(
+            {
+                'resume_id': resume.id,
+                'results': [
+                    {'job_id': job_id, 'role': jobs[job_id].role, 'company': jobs[job_id].company, 'similarity': round(score, 4)}
+                    for job_id, score in scores[: serializer.validated_data['limit']]
+                ],
+                'unindexed': unindexed,
+            },
+            status=status.HTTP_200_OK,
+        )
 
 
 class AnalysisResultViewSet(mixins.DestroyModelMixin, viewsets.ReadOnlyModelViewSet):
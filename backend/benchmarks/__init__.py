@@ -0,0 +1 @@
+"""Offline benchmark helpers and fixtures used by the ``bench_*`` management commands."""
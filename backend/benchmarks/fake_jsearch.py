@@ -0,0 +1,78 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator
+from urllib.parse import parse_qs, urlparse
+
+
+class FakeJSearchServer(ThreadingHTTPServer):
+    """Local stand-in for the JSearch search endpoint with a fixed per-request latency."""
+
+    daemon_threads = True
+
+    def __init__(self, latency_ms: float = 250, jobs_per_page: int = 10):
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.latency_ms = latency_ms
+        self.jobs_per_page = jobs_per_page
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f'http://127.0.0.1:{self.server_port}/jsearch/search'
+
+    def count(self, field: str) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + 1)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def setup(self):
+        super().setup()
+        self.server.count('connections')
+
+    def do_GET(self):
+        self.server.count('requests')
+        params = {key: values[0] for key, values in parse_qs(urlparse(self.path).query).items()}
+        query = params.get('query', '')
+        page = int(params.get('page', 1))
+        time.sleep(self.server.latency_ms / 1000)
+
+        data = [
+            {
+                'job_id': f'{query}-{page}-{i}',
+                'job_title': f'{query.split(" in ")[0].title()} {i}',
+                'employer_name': f'Company {page}-{i}',
+                'job_city': query.split(' in ')[-1].title(),
+                'job_description': f'Role {i} on page {page} for {query}. ' * 20,
+                'job_apply_link': f'https://jobs.example.com/{page}/{i}',
+                'job_publisher': 'FakeJSearch',
+            }
+            for i in range(self.server.jobs_per_page)
+        ]
+        body = json.dumps({'status': 'OK', 'data': data}).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def running_fake_jsearch(latency_ms: float = 250, jobs_per_page: int = 10) -> Iterator[FakeJSearchServer]:
+    server = FakeJSearchServer(latency_ms=latency_ms, jobs_per_page=jobs_per_page)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,193 @@
+import base64
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Iterator, List
+
+# One JSON object that satisfies every prompt the copilot sends (scoring, analysis, chat,
+# tailor, match); each caller reads the keys it needs.
+COMPLETION = {
+    'relevance_score': 8,
+    'reasoning': 'The context covers the skills named in the question.',
+    'answer': 'Your Python, Django and PostgreSQL experience lines up with the backend roles you saved.',
+    'missing_keywords': ['Kubernetes', 'Terraform'],
+    'improvement_suggestions': ['Quantify the impact of the API migration.'],
+    'rewritten_bullets': ['Cut p95 API latency 40% by moving report generation to a task queue.'],
+    'match_score': 74,
+    'matched_keywords': ['Python', 'Django', 'PostgreSQL'],
+    'tailored_resume_bullets': ['Built Django REST services handling 2M requests per day.'],
+    'cover_letter_snippet': 'I have spent four years building the kind of APIs your team runs.',
+    'tailored_bullets': ['Built Django REST services handling 2M requests per day.'],
+    'cover_letter': 'I have spent four years building the kind of APIs your team runs.',
+}
+STREAM_TEXT = COMPLETION['answer']
+
+_WORD = re.compile(r'[a-z0-9+#.]+')
+
+
+def _tokens(text: str) -> List[str]:
+    return re.findall(r'\S+\s*', text)
+
+
+def fake_embedding(text: str, dimensions: int) -> List[float]:
+    """Hashed bag of words, L2-normalized: texts sharing words land close together."""
+    vector = [0.0] * dimensions
+    for word in _WORD.findall(text.lower()):
+        digest = hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest()
+        slot = int.from_bytes(digest[:4], 'little') % dimensions
+        vector[slot] += 1.0 if digest[4] & 1 else -1.0
+    norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+    return [v / norm for v in vector]
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    """
+    OpenAI-compatible stub for /v1/embeddings and /v1/chat/completions (plain and streamed).
+    Chat latency is chat_latency_ms until the first token plus one token every 1/tokens_per_second;
+    with prefill_tokens_per_second set, reading the prompt adds its tokens at that rate before the first token.
+    """
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        embedding_latency_ms: float = 40,
+        chat_latency_ms: float = 300,
+        tokens_per_second: float = 80,
+        dimensions: int = 1536,
+        prefill_tokens_per_second: float = 0,
+    ):
+        super().__init__(('127.0.0.1', 0), _Handler)
+        self.embedding_latency_ms = embedding_latency_ms
+        self.chat_latency_ms = chat_latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.prefill_tokens_per_second = prefill_tokens_per_second
+        self.dimensions = dimensions
+        self.calls = {'embeddings': 0, 'chat': 0, 'chat_stream': 0}
+        self._lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f'http://127.0.0.1:{self.server_port}/v1'
+
+    def count(self, kind: str) -> None:
+        with self._lock:
+            self.calls[kind] += 1
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+        if self.path.endswith('/embeddings'):
+            self._embeddings(body)
+        elif self.path.endswith('/chat/completions'):
+            if body.get('stream'):
+                self._chat_stream(body)
+            else:
+                self._chat(body)
+        else:
+            self._json(404, {'error': {'message': f'Unknown path {self.path}'}})
+
+    def _embeddings(self, body):
+        self.server.count('embeddings')
+        inputs = body['input'] if isinstance(body['input'], list) else [body['input']]
+        time.sleep(self.server.embedding_latency_ms / 1000)
+        data = []
+        for index, text in enumerate(inputs):
+            vector = fake_embedding(text, body.get('dimensions') or self.server.dimensions)
+            if body.get('encoding_format') == 'base64':
+                vector = base64.b64encode(array('f', vector).tobytes()).decode('ascii')
+            data.append({'object': 'embedding', 'index': index, 'embedding': vector})
+        prompt_tokens = sum(len(_tokens(text)) for text in inputs)
+        self._json(200, {
+            'object': 'list',
+            'data': data,
+            'model': body.get('model', ''),
+            'usage': {'prompt_tokens': prompt_tokens, 'total_tokens': prompt_tokens},
+        })
+
+    def _prefill_seconds(self, prompt_tokens: int) -> float:
+        rate = self.server.prefill_tokens_per_second
+        return prompt_tokens / rate if rate else 0.0
+
+    def _chat(self, body):
+        self.server.count('chat')
+        content = json.dumps(COMPLETION)
+        completion_tokens = len(_tokens(content))
+        prompt_tokens = sum(len(_tokens(m.get('content') or '')) for m in body.get('messages', []))
+        time.sleep(
+            self.server.chat_latency_ms / 1000
+            + self._prefill_seconds(prompt_tokens)
+            + completion_tokens / self.server.tokens_per_second
+        )
+        self._json(200, {
+            'id': 'chatcmpl-fake',
+            'object': 'chat.completion',
+            'created': int(time.time()),
+            'model': body.get('model', ''),
+            'choices': [{'index': 0, 'message': {'role': 'assistant', 'content': content}, 'finish_reason': 'stop'}],
+            'usage': {
+                'prompt_tokens': prompt_tokens,
+                'completion_tokens': completion_tokens,
+                'total_tokens': prompt_tokens + completion_tokens,
+            },
+        })
+
+    def _chat_stream(self, body):
+        self.server.count('chat_stream')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/event-stream')
+        self.send_header('Connection', 'close')
+        self.end_headers()
+        self.close_connection = True
+
+        prompt_tokens = sum(len(_tokens(m.get('content') or '')) for m in body.get('messages', []))
+        time.sleep(self.server.chat_latency_ms / 1000 + self._prefill_seconds(prompt_tokens))
+        for token in _tokens(STREAM_TEXT):
+            self._chunk({'content': token}, None, body)
+            time.sleep(1 / self.server.tokens_per_second)
+        self._chunk({}, 'stop', body)
+        self.wfile.write(b'data: [DONE]\n\n')
+        self.wfile.flush()
+
+    def _chunk(self, delta, finish_reason, body):
+        chunk = {
+            'id': 'chatcmpl-fake',
+            'object': 'chat.completion.chunk',
+            'created': int(time.time()),
+            'model': body.get('model', ''),
+            'choices': [{'index': 0, 'delta': delta, 'finish_reason': finish_reason}],
+        }
+        self.wfile.write(f'data: {json.dumps(chunk)}\n\n'.encode('utf-8'))
+        self.wfile.flush()
+
+    def _json(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@contextmanager
+def running_fake_openai(**options) -> Iterator[FakeOpenAIServer]:
+    server = FakeOpenAIServer(**options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
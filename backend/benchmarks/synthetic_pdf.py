@@ -0,0 +1,49 @@
+import random
+from typing import List
+
+WORDS = (
+    'python django postgres redis celery docker kubernetes terraform aws api latency throughput '
+    'designed built migrated reduced improved owned launched scaled automated monitored services '
+    'pipeline dashboard customers revenue reliability incident review platform team engineers'
+).split()
+
+
+def _escape(text: str) -> str:
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def page_text(rng: random.Random, lines: int = 45, words_per_line: int = 12) -> List[str]:
+    return [' '.join(rng.choice(WORDS) for _ in range(words_per_line)) for _ in range(lines)]
+
+
+def make_pdf(pages: int, seed: int = 0) -> bytes:
+    """Minimal uncompressed PDF with ``pages`` pages of Helvetica text, for extraction benchmarks."""
+    rng = random.Random(seed)
+    out = [b'%PDF-1.4\n']
+    offsets: List[int] = []
+
+    def add(body: bytes) -> None:
+        offsets.append(sum(len(part) for part in out))
+        out.append(f'{len(offsets)} 0 obj\n'.encode() + body + b'\nendobj\n')
+
+    # Objects: 1 catalog, 2 page tree, 3 font, then a (page, content stream) pair per page.
+    page_ids = [4 + 2 * i for i in range(pages)]
+    add(b'<< /Type /Catalog /Pages 2 0 R >>')
+    add(f'<< /Type /Pages /Kids [{" ".join(f"{p} 0 R" for p in page_ids)}] /Count {pages} >>'.encode())
+    add(b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>')
+    for page_id in page_ids:
+        add(
+            f'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] '
+            f'/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>'.encode()
+        )
+        lines = ''.join(f'({_escape(line)}) Tj 0 -14 Td ' for line in page_text(rng))
+        stream = f'BT /F1 10 Tf 40 760 Td {lines}ET'.encode()
+        add(f'<< /Length {len(stream)} >>\nstream\n'.encode() + stream + b'\nendstream')
+
+    xref = sum(len(part) for part in out)
+    out.append(
+        f'xref\n0 {len(offsets) + 1}\n0000000000 65535 f \n'.encode()
+        + b''.join(f'{offset:010d} 00000 n \n'.encode() for offset in offsets)
+    )
+    out.append(f'trailer\n<< /Size {len(offsets) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode())
+    return b''.join(out)
@@ -0,0 +1,31 @@
+import numpy as np
+
+
+def clustered_vectors(
+    users: int, docs_per_user: int, dimensions: int, topics: int, seed: int, decay: float = 0.0
+) -> np.ndarray:
+    """
+    Unit vectors shaped (users, docs_per_user, dimensions). Every user writes about a few of the
+    same shared topics (think "Kubernetes", "React"), so a global index is crowded with near
+    neighbours that belong to other users. A positive ``decay`` scales dimension i by
+    (i + 1) ** -decay, concentrating the signal in the leading dimensions the way shortenable
+    (text-embedding-3) embeddings do, so truncating them behaves like a shortened embedding.
+    """
+    rng = np.random.default_rng(seed)
+    centroids = rng.normal(size=(topics, dimensions))
+    user_topics = rng.integers(0, topics, size=(users, docs_per_user))
+    vectors = centroids[user_topics] + rng.normal(scale=0.6, size=(users, docs_per_user, dimensions))
+    if decay:
+        vectors *= np.arange(1, dimensions + 1) ** -decay
+    return (vectors / np.linalg.norm(vectors, axis=-1, keepdims=True)).astype(np.float32)
+
+
+def noisy_queries(corpus: np.ndarray, count: int, seed: int):
+    """(user ids, query vectors): each query is a slightly perturbed copy of one of that user's vectors."""
+    rng = np.random.default_rng(seed)
+    users, docs_per_user, _ = corpus.shape
+    query_users = rng.choice(users, size=min(count, users), replace=False)
+    queries = corpus[query_users, rng.integers(0, docs_per_user, size=len(query_users))]
+    queries = queries + rng.normal(scale=0.05, size=queries.shape)
+    # Unit length, so L2 (Chroma) and cosine (pgvector) rank neighbours identically.
+    return query_users, (queries / np.linalg.norm(queries, axis=-1, keepdims=True)).astype(np.float32)
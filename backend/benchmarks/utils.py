@@ -0,0 +1,73 @@
+import json
+import subprocess
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Sequence
+
+FIXTURES_DIR = Path(__file__).resolve().parent / 'fixtures'
+
+
+def load_fixture(name: str) -> Any:
+    with open(FIXTURES_DIR / name, encoding='utf-8') as fh:
+        return json.load(fh)
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def summarize(values_ms: Sequence[float]) -> Dict[str, float]:
+    return {
+        'count': len(values_ms),
+        'mean': round(sum(values_ms) / len(values_ms), 3) if values_ms else 0.0,
+        'p50': round(percentile(values_ms, 50), 3),
+        'p95': round(percentile(values_ms, 95), 3),
+        'p99': round(percentile(values_ms, 99), 3),
+    }
+
+
+def elapsed_ms(started: float) -> float:
+    return (time.perf_counter() - started) * 1000
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return 'unknown'
+
+
+def write_results(path: str, benchmark: str, results: Dict[str, Any]) -> None:
+    payload = {
+        'benchmark': benchmark,
+        'commit': _git_commit(),
+        'recorded_at': datetime.now(timezone.utc).isoformat(),
+        'results': results,
+    }
+    with open(path, 'w', encoding='utf-8') as fh:
+        json.dump(payload, fh, indent=2)
+
+
+def api_client(user):
+    """In-process DRF client authenticated as ``user``; requests are sent as HTTPS to localhost."""
+    from rest_framework.test import APIClient
+
+    client = APIClient(SERVER_NAME='localhost', HTTP_HOST='localhost', **{'wsgi.url_scheme': 'https'})
+    client.force_authenticate(user=user)
+    return client
+
+
+def get_bench_user(email: str):
+    from django.contrib.auth import get_user_model
+
+    user, _ = get_user_model().objects.get_or_create(email=email, defaults={'username': email})
+    return user
@@ -1,4 +1,8 @@
+import logging
 import multiprocessing
+import os
+import resource
+import time
 
 bind = '0.0.0.0:8000'
 workers = multiprocessing.cpu_count() * 2 + 1
@@ -7,3 +11,33 @@ threads = 4
 timeout = 60
 accesslog = '-'
 errorlog = '-'
+
+
+def child_exit(server, worker):
+    # Drops the exited worker's live-gauge files from PROMETHEUS_MULTIPROC_DIR; its counters stay aggregated.
+    from core import metrics
+
+    metrics.mark_process_dead(worker.pid)
+
+
+def post_worker_init(worker):
+    # Runs in each forked worker once Django is loaded, before it accepts requests.
+    from django.conf import settings
+
+    if not settings.VECTOR_STORE_WARMUP:
+        return
+
+    from ai_engine.services import vector_store
+
+    started = time.perf_counter()
+    try:
+        vector_store.warm_up()
+    except Exception:
+        logging.getLogger(__name__).exception('Vector store warm-up failed in worker pid=%s', os.getpid())
+        return
+    worker.log.info(
+        'Worker pid=%s warmed vector store in %.0fms (maxrss=%s KiB)',
+        os.getpid(),
+        (time.perf_counter() - started) * 1000,
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    )
@@ -98,6 +98,27 @@ MEDIA_ROOT = BASE_DIR / 'media'
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('DJANGO_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('DJANGO_CACHE_LOCATION', 'career-copilot'),
+    },
+    # Generated answers and each user's invalidation generation. Shared through the database so the
+    # worker's re-indexing invalidates answers in every gunicorn process; Redis also works
+    'answers': {
+        'BACKEND': os.getenv('ANSWER_CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.getenv('ANSWER_CACHE_LOCATION', 'answer_cache'),
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('ANSWER_CACHE_MAX_ENTRIES', '2000'))},
+    },
+    # JSearch result pages, shared by every gunicorn worker and replica through the database
+    # (`manage.py createcachetable` creates the table); any shared backend, such as Redis, also works
+    'jsearch': {
+        'BACKEND': os.getenv('JSEARCH_CACHE_BACKEND', 'django.core.cache.backends.db.DatabaseCache'),
+        'LOCATION': os.getenv('JSEARCH_CACHE_LOCATION', 'jsearch_cache'),
+        'OPTIONS': {'MAX_ENTRIES': int(os.getenv('JSEARCH_CACHE_MAX_ENTRIES', '5000'))},
+    },
+}
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
@@ -127,6 +148,8 @@ CSRF_TRUSTED_ORIGINS = [u.strip() for u in os.getenv('CSRF_TRUSTED_ORIGINS', 'ht
 
 if not DEBUG:
     SECURE_SSL_REDIRECT = True
+    # Prometheus scrapes backend:8000 over plain HTTP inside the compose network, bypassing nginx
+    SECURE_REDIRECT_EXEMPT = [r'^metrics$']
     SESSION_COOKIE_SECURE = True
     CSRF_COOKIE_SECURE = True
     SECURE_BROWSER_XSS_FILTER = True
@@ -141,7 +164,119 @@ if not DEBUG:
 OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', '')
 OPENAI_MODEL = os.getenv('OPENAI_MODEL', 'gpt-4o-mini')
 OPENAI_EMBEDDING_MODEL = os.getenv('OPENAI_EMBEDDING_MODEL', 'text-embedding-3-small')
+# Shortened embedding width (text-embedding-3 models), 0 for the model's full width. Vectors of a
+# new width go to their own collection/table; fill it with reindex_vector_store
+EMBEDDING_DIMENSIONS = int(os.getenv('EMBEDDING_DIMENSIONS', '0'))
+OPENAI_BASE_URL = os.getenv('OPENAI_BASE_URL', '')
+OPENAI_MAX_RETRIES = int(os.getenv('OPENAI_MAX_RETRIES', '2'))
+OPENAI_CONNECT_TIMEOUT = float(os.getenv('OPENAI_CONNECT_TIMEOUT', '5'))
+OPENAI_CHAT_TIMEOUT = float(os.getenv('OPENAI_CHAT_TIMEOUT', '45'))
+OPENAI_EMBEDDING_TIMEOUT = float(os.getenv('OPENAI_EMBEDDING_TIMEOUT', '15'))
+OPENAI_STREAM_TIMEOUT = float(os.getenv('OPENAI_STREAM_TIMEOUT', '30'))
+OPENAI_MAX_CONNECTIONS = int(os.getenv('OPENAI_MAX_CONNECTIONS', '20'))
+OPENAI_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('OPENAI_MAX_KEEPALIVE_CONNECTIONS', '10'))
+OPENAI_KEEPALIVE_EXPIRY = float(os.getenv('OPENAI_KEEPALIVE_EXPIRY', '60'))
+OPENAI_POOL_LOG_EVERY = int(os.getenv('OPENAI_POOL_LOG_EVERY', '100'))
+# Vector backend: 'chroma' (embedded store in CHROMA_PERSIST_DIR) or 'pgvector' (a table in the Postgres
+# database, created with an HNSW index on first write); copy vectors across with copy_vector_store
+VECTOR_BACKEND = os.getenv('VECTOR_BACKEND', 'chroma')
+PGVECTOR_TABLE = os.getenv('PGVECTOR_TABLE', 'ai_engine_vector_document')
+PGVECTOR_HNSW_M = int(os.getenv('PGVECTOR_HNSW_M', '16'))
+PGVECTOR_HNSW_EF_CONSTRUCTION = int(os.getenv('PGVECTOR_HNSW_EF_CONSTRUCTION', '64'))
+# Minimum hnsw.ef_search; queries widen it for users holding a small share of the table
+PGVECTOR_EF_SEARCH = int(os.getenv('PGVECTOR_EF_SEARCH', '40'))
+# Users with at most this many rows are ranked exactly via the user_id index instead of through HNSW
+PGVECTOR_EXACT_MAX_ROWS = int(os.getenv('PGVECTOR_EXACT_MAX_ROWS', '1000'))
 CHROMA_PERSIST_DIR = os.getenv('CHROMA_PERSIST_DIR', str(BASE_DIR / 'chroma_data'))
+# Exact search: users with at most EXACT_SEARCH_MAX_CHUNKS chunks are searched by a NumPy scan over
+# a memory-mapped matrix instead of the ANN index. EXACT_SEARCH_DIR must be shared by the web and
+# worker processes, since workers invalidate it when they index.
+EXACT_SEARCH_ENABLED = os.getenv('EXACT_SEARCH_ENABLED', 'True').lower() in ('true', '1', 'yes')
+EXACT_SEARCH_DIR = os.getenv('EXACT_SEARCH_DIR', os.path.join(CHROMA_PERSIST_DIR, 'exact'))
+EXACT_SEARCH_MAX_CHUNKS = int(os.getenv('EXACT_SEARCH_MAX_CHUNKS', '5000'))
+EXACT_SEARCH_CACHE_USERS = int(os.getenv('EXACT_SEARCH_CACHE_USERS', '256'))
+# Exact search scans a quantized copy ('int8' or 'binary' sign bits; 'none' scans float32) for
+# top_k * VECTOR_RERANK_FACTOR candidates, then ranks those by their full-precision rows
+VECTOR_QUANTIZATION = os.getenv('VECTOR_QUANTIZATION', 'none')
+VECTOR_RERANK_FACTOR = int(os.getenv('VECTOR_RERANK_FACTOR', '25'))
+# Open the vector store in each gunicorn worker at startup instead of on the first request
+VECTOR_STORE_WARMUP = os.getenv('VECTOR_STORE_WARMUP', 'False').lower() in ('true', '1', 'yes')
+# Vector partitioning: 'none' (one shared collection), 'bucket' (VECTOR_BUCKETS collections
+# by user id) or 'user' (a collection per user); move existing vectors with partition_vector_store
+VECTOR_PARTITIONING = os.getenv('VECTOR_PARTITIONING', 'none')
+VECTOR_BUCKETS = int(os.getenv('VECTOR_BUCKETS', '64'))
+EMBEDDING_CACHE_ENABLED = os.getenv('EMBEDDING_CACHE_ENABLED', 'True').lower() in ('true', '1', 'yes')
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv('EMBEDDING_CACHE_MAX_ENTRIES', '50000'))
+
+# Chunking: chunk size in embedding-model tokens; sections under the minimum join a neighbour
+CHUNK_MAX_TOKENS = int(os.getenv('CHUNK_MAX_TOKENS', '200'))
+CHUNK_MIN_TOKENS = int(os.getenv('CHUNK_MIN_TOKENS', '8'))
+
+# Retrieval: 'vector' (dense only) or 'hybrid' (BM25 + vector merged with reciprocal-rank fusion)
+RETRIEVAL_MODE = os.getenv('RETRIEVAL_MODE', 'hybrid')
+RRF_K = int(os.getenv('RRF_K', '60'))
+
+# CRAG relevance scoring: 'llm', 'local' (BM25 + vector distance) or 'hybrid' (local, LLM only when ambiguous)
+CRAG_SCORER = os.getenv('CRAG_SCORER', 'hybrid')
+CRAG_LOCAL_AMBIGUOUS_MIN = int(os.getenv('CRAG_LOCAL_AMBIGUOUS_MIN', '4'))
+CRAG_LOCAL_AMBIGUOUS_MAX = int(os.getenv('CRAG_LOCAL_AMBIGUOUS_MAX', '6'))
+
+ANSWER_CACHE_ENABLED = os.getenv('ANSWER_CACHE_ENABLED', 'True').lower() in ('true', '1', 'yes')
+ANSWER_CACHE_ALIAS = 'answers'
+ANSWER_CACHE_TTL = int(os.getenv('ANSWER_CACHE_TTL', '3600'))
+
+# Batch match: one resume against up to MATCH_BATCH_MAX_JOBS jobs, at most MATCH_BATCH_CONCURRENCY LLM
+# calls in flight per user (per worker process); jobs unanswered after MATCH_BATCH_DEADLINE_SECONDS
+# are reported as timed out, keeping the request inside the gunicorn timeout
+MATCH_BATCH_MAX_JOBS = int(os.getenv('MATCH_BATCH_MAX_JOBS', '20'))
+MATCH_BATCH_CONCURRENCY = int(os.getenv('MATCH_BATCH_CONCURRENCY', '4'))
+MATCH_BATCH_DEADLINE_SECONDS = float(os.getenv('MATCH_BATCH_DEADLINE_SECONDS', '45'))
+
+# Prompt compaction for match and tailor: whitespace and repeated lines are normalized, job-posting
+# boilerplate (benefits, EEO statements) is dropped, and each side is cut to its budget in chat-model
+# tokens by keeping its most relevant sections; off, both are truncated by characters as before
+PROMPT_COMPACTION_ENABLED = os.getenv('PROMPT_COMPACTION_ENABLED', 'True').lower() in ('true', '1', 'yes')
+PROMPT_RESUME_MAX_TOKENS = int(os.getenv('PROMPT_RESUME_MAX_TOKENS', '2500'))
+PROMPT_JOB_MAX_TOKENS = int(os.getenv('PROMPT_JOB_MAX_TOKENS', '1500'))
+# Context packing for analyze, tailor and chat answers: adjacent retrieved chunks of one resume or job
+# are merged without their repeated headings, and passages fill CONTEXT_MAX_TOKENS chat-model tokens
+# in relevance order; off, the first 12 retrieved chunks are sent with their ids and metadata
+CONTEXT_PACKING_ENABLED = os.getenv('CONTEXT_PACKING_ENABLED', 'True').lower() in ('true', '1', 'yes')
+CONTEXT_MAX_TOKENS = int(os.getenv('CONTEXT_MAX_TOKENS', '2400'))
+
+# Resume text extraction (PDF pages are extracted in a process pool)
+RESUME_EXTRACTION_WORKERS = int(os.getenv('RESUME_EXTRACTION_WORKERS', '2'))
+RESUME_EXTRACTION_TIMEOUT_SECONDS = int(os.getenv('RESUME_EXTRACTION_TIMEOUT_SECONDS', '30'))
+RESUME_EXTRACTION_MAX_MEMORY_MB = int(os.getenv('RESUME_EXTRACTION_MAX_MEMORY_MB', '1024'))
+RESUME_MAX_FILE_MB = int(os.getenv('RESUME_MAX_FILE_MB', '10'))
+RESUME_MAX_UNCOMPRESSED_MB = int(os.getenv('RESUME_MAX_UNCOMPRESSED_MB', '50'))
+RESUME_MAX_PAGES = int(os.getenv('RESUME_MAX_PAGES', '40'))
+
+# JSearch job search client
+JSEARCH_URL = os.getenv('JSEARCH_URL', 'https://api.openwebninja.com/jsearch/search')
+JSEARCH_CONNECT_TIMEOUT = float(os.getenv('JSEARCH_CONNECT_TIMEOUT', '5'))
+JSEARCH_READ_TIMEOUT = float(os.getenv('JSEARCH_READ_TIMEOUT', '30'))
+JSEARCH_POOL_SIZE = int(os.getenv('JSEARCH_POOL_SIZE', '10'))
+JSEARCH_CACHE_ALIAS = 'jsearch'
+JSEARCH_CACHE_TTL = int(os.getenv('JSEARCH_CACHE_TTL', '900'))
+# Deepest result page auto-import reaches, counting every page of a multi-page request
+JSEARCH_MAX_PAGE = int(os.getenv('JSEARCH_MAX_PAGE', '5'))
+JSEARCH_MAX_CONCURRENCY = int(os.getenv('JSEARCH_MAX_CONCURRENCY', '3'))
+JSEARCH_MAX_PAGES_PER_REQUEST = int(os.getenv('JSEARCH_MAX_PAGES_PER_REQUEST', '3'))
+
+# Embed auto-imported jobs inside the request instead of handing them to the task worker
+JOB_IMPORT_EMBED_SYNC = os.getenv('JOB_IMPORT_EMBED_SYNC', 'False').lower() in ('true', '1', 'yes')
+
+# Background task queue (python manage.py run_worker)
+TASK_WORKER_CONCURRENCY = int(os.getenv('TASK_WORKER_CONCURRENCY', '2'))
+TASK_POLL_INTERVAL_SECONDS = float(os.getenv('TASK_POLL_INTERVAL_SECONDS', '1'))
+TASK_MAX_ATTEMPTS = int(os.getenv('TASK_MAX_ATTEMPTS', '3'))
+TASK_RETRY_BACKOFF_SECONDS = float(os.getenv('TASK_RETRY_BACKOFF_SECONDS', '5'))
+TASK_LOCK_TIMEOUT_SECONDS = int(os.getenv('TASK_LOCK_TIMEOUT_SECONDS', '600'))
+TASK_WORKER_METRICS_PORT = int(os.getenv('TASK_WORKER_METRICS_PORT', '0'))
+
+# Prometheus metrics at /metrics; set PROMETHEUS_MULTIPROC_DIR to aggregate across gunicorn workers
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', 'True').lower() in ('true', '1', 'yes')
 
 LOGGING = {
     'version': 1,
@@ -10,6 +10,7 @@ from accounts.token_views import LoginTokenObtainPairView
 from applications.views import ApplicationViewSet
 from ai_engine.views import CopilotViewSet, AnalysisResultViewSet
 from chat.views import ChatSessionViewSet
+from core.views import ReadinessView, metrics_view
 from jobs.views import JobDescriptionViewSet, AutoImportJobsView
 from resumes.views import ResumeViewSet
 
@@ -27,6 +28,8 @@ urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/token/', LoginTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('api/health/ready/', ReadinessView.as_view(), name='readiness'),
+    path('metrics', metrics_view, name='metrics'),
     path('api/jobs/auto-import/', AutoImportJobsView.as_view(), name='auto-import-jobs'),
     path('api/', include(router.urls)),
 ]
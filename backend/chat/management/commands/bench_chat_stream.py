@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from benchmarks.utils import api_client, elapsed_ms, get_bench_user, summarize, write_results
+from chat.models import ChatSession
+
+
+class Command(BaseCommand):
+    help = 'Compare time-to-first-token of the blocking chat ask endpoint and its SSE streaming variant'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--email', default='bench@example.com', help='User whose resume and jobs are queried')
+        parser.add_argument('--question', default='Which of my skills best match the jobs I saved?')
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--output', help='Write results as JSON to this path')
+
+    def handle(self, *args, **options):
+        user = get_bench_user(options['email'])
+        session = ChatSession.objects.create(user=user, title='Benchmark')
+        client = api_client(user)
+        timings = {'ask': {'ttft_ms': [], 'total_ms': []}, 'ask_stream': {'ttft_ms': [], 'total_ms': []}}
+
+        # Every run must reach the model, otherwise the comparison measures the answer cache.
+        with override_settings(ANSWER_CACHE_ENABLED=False):
+            for run in range(options['runs']):
+                question = f"{options['question']} (run {run})"
+
+                started = time.perf_counter()
+                client.post(f'/api/chat/{session.id}/ask/', {'message': question}, format='json')
+                total = elapsed_ms(started)
+                timings['ask']['ttft_ms'].append(total)
+                timings['ask']['total_ms'].append(total)
+
+                started = time.perf_counter()
+                reply = client.post(
+                    f'/api/chat/{session.id}/ask/stream/',
+                    {'message': question},
+                    format='json',
+                    HTTP_ACCEPT='text/event-stream',
+                )
+                first_token = None
+                for chunk in reply.streaming_content:
+                    if first_token is None and b'event: token' in chunk:
+                        first_token = elapsed_ms(started)
+                total = elapsed_ms(started)
+                timings['ask_stream']['ttft_ms'].append(first_token if first_token is not None else total)
+                timings['ask_stream']['total_ms'].append(total)
+
+        session.delete()
+        results = {name: {metric: summarize(values) for metric, values in data.items()} for name, data in timings.items()}
+        for name, data in results.items():
+            self.stdout.write(
+                f"{name:>10}: ttft p50={data['ttft_ms']['p50']:.0f}ms p95={data['ttft_ms']['p95']:.0f}ms "
+                f"total p50={data['total_ms']['p50']:.0f}ms"
+            )
+        if options['output']:
+            write_results(options['output'], 'chat_stream', results)
@@ -1,9 +1,21 @@
+import json
+import logging
+import time
+from typing import Any, Dict, Iterator
+
 from rest_framework import serializers
 
 from ai_engine.services.crag import CRAGService
+from core.timing import timed
 
 from .models import ChatMessage, ChatSession
 
+logger = logging.getLogger(__name__)
+
+
+def _sse(event: str, data: Dict[str, Any]) -> str:
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
 
 class ChatMessageSerializer(serializers.ModelSerializer):
     class Meta:
@@ -29,12 +41,63 @@ class ChatAskSerializer(serializers.Serializer):
         session: ChatSession = self.context['session']
         question = self.validated_data['message']
 
-        ChatMessage.objects.create(session=session, role=ChatMessage.Role.USER, content=question)
+        started = time.perf_counter()
+        with timed('db_write'):
+            ChatMessage.objects.create(session=session, role=ChatMessage.Role.USER, content=question)
 
         crag = CRAGService(max_retries=2)
         contexts = crag.retry_logic(user_id=request.user.id, question=question)
-        answer_payload = crag.generate_answer(question=question, contexts=contexts, mode='chat')
+        answer_payload = crag.generate_answer(question=question, contexts=contexts, mode='chat', user_id=request.user.id)
         answer_text = answer_payload.get('answer') or str(answer_payload)
 
-        ChatMessage.objects.create(session=session, role=ChatMessage.Role.ASSISTANT, content=answer_text)
-        return {'answer': answer_text, 'context_hits': len(contexts)}
+        with timed('db_write'):
+            ChatMessage.objects.create(session=session, role=ChatMessage.Role.ASSISTANT, content=answer_text)
+        logger.info('Chat ask session_id=%s total_ms=%.0f', session.id, (time.perf_counter() - started) * 1000)
+        return {'answer': answer_text, 'context_hits': len(contexts), 'cached': answer_payload.get('cached', False)}
+
+    def stream(self) -> Iterator[str]:
+        """Same flow as save(), emitted as Server-Sent Events: meta, token..., done."""
+        request = self.context['request']
+        session: ChatSession = self.context['session']
+        question = self.validated_data['message']
+
+        ChatMessage.objects.create(session=session, role=ChatMessage.Role.USER, content=question)
+
+        def events() -> Iterator[str]:
+            started = time.perf_counter()
+            # Opening comment gets headers and the first byte through proxies before retrieval starts.
+            yield ': stream opened\n\n'
+
+            crag = CRAGService(max_retries=2)
+            contexts = crag.retry_logic(user_id=request.user.id, question=question)
+            yield _sse('meta', {'context_hits': len(contexts)})
+
+            ttft_ms = None
+            for event in crag.stream_answer(question=question, contexts=contexts, user_id=request.user.id):
+                if 'delta' in event:
+                    if ttft_ms is None:
+                        ttft_ms = (time.perf_counter() - started) * 1000
+                    yield _sse('token', {'delta': event['delta']})
+                    continue
+
+                message = ChatMessage.objects.create(
+                    session=session, role=ChatMessage.Role.ASSISTANT, content=event['answer']
+                )
+                total_ms = (time.perf_counter() - started) * 1000
+                logger.info(
+                    'Chat stream session_id=%s ttft_ms=%.0f total_ms=%.0f cached=%s',
+                    session.id, ttft_ms or total_ms, total_ms, event['cached'],
+                )
+                yield _sse(
+                    'done',
+                    {
+                        'message_id': message.id,
+                        'answer': event['answer'],
+                        'context_hits': len(contexts),
+                        'cached': event['cached'],
+                        'ttft_ms': round(ttft_ms or total_ms),
+                        'total_ms': round(total_ms),
+                    },
+                )
+
+        return events()
@@ -1,9 +1,12 @@
+from django.http import StreamingHttpResponse
 from rest_framework import permissions, response, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.renderers import JSONRenderer
 
 from core.permissions import IsOwner
 
 from .models import ChatSession
+from .renderers import EventStreamRenderer
 from .serializers import ChatAskSerializer, ChatSessionSerializer
 
 
@@ -24,3 +27,14 @@ class ChatSessionViewSet(viewsets.ModelViewSet):
         serializer.is_valid(raise_exception=True)
         payload = serializer.save()
         return response.Response(payload, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'], url_path='ask/stream', renderer_classes=[JSONRenderer, EventStreamRenderer])
+    def ask_stream(self, request, pk=None):
+        session = self.get_object()
+        serializer = ChatAskSerializer(data=request.data, context={'request': request, 'session': session})
+        serializer.is_valid(raise_exception=True)
+        stream = StreamingHttpResponse(serializer.stream(), content_type='text/event-stream')
+        stream['Cache-Control'] = 'no-cache'
+        # Tells nginx not to buffer this response so tokens reach the client as they are produced.
+        stream['X-Accel-Buffering'] = 'no'
+        return stream
@@ -0,0 +1,57 @@
+import logging
+import signal
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils.module_loading import autodiscover_modules
+
+from core import metrics, task_queue
+
+logger = logging.getLogger(__name__)
+
+
+class Command(BaseCommand):
+    help = 'Run the database-backed background task worker'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=settings.TASK_WORKER_CONCURRENCY)
+        parser.add_argument('--poll-interval', type=float, default=settings.TASK_POLL_INTERVAL_SECONDS)
+        parser.add_argument('--once', action='store_true', help='Drain the runnable tasks and exit')
+        parser.add_argument(
+            '--metrics-port',
+            type=int,
+            default=settings.TASK_WORKER_METRICS_PORT,
+            help='Serve Prometheus metrics on this port (0 disables)',
+        )
+
+    def handle(self, *args, **options):
+        autodiscover_modules('tasks')
+        concurrency = max(1, options['concurrency'])
+        self._stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+        if options['metrics_port']:
+            metrics.serve(options['metrics_port'])
+        self.stdout.write(f'Task worker started with concurrency={concurrency}')
+
+        in_flight = set()
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='task-worker') as pool:
+            while not self._stopping:
+                in_flight = {f for f in in_flight if not f.done()}
+                free = concurrency - len(in_flight)
+                claimed = task_queue.claim(free) if free else []
+                for task_obj in claimed:
+                    logger.info('Running task %s #%s attempt=%s', task_obj.name, task_obj.id, task_obj.attempts)
+                    in_flight.add(pool.submit(task_queue.run, task_obj))
+
+                if options['once'] and not claimed and not in_flight:
+                    break
+                if not claimed:
+                    time.sleep(options['poll_interval'])
+        self.stdout.write('Task worker stopped')
+
+    def _stop(self, signum, frame):
+        logger.info('Task worker received signal %s, finishing in-flight tasks', signum)
+        self._stopping = True
@@ -0,0 +1,96 @@
+import os
+from typing import Any, Optional, Tuple
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram, generate_latest
+from prometheus_client import multiprocess, start_http_server
+
+# With PROMETHEUS_MULTIPROC_DIR set (gunicorn), every worker writes its samples to files in
+# that directory and a scrape of any worker aggregates all of them.
+
+STAGE_SECONDS = Histogram(
+    'copilot_stage_duration_seconds',
+    'Time spent in one stage of request handling',
+    ['stage'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+CRAG_ATTEMPTS = Histogram(
+    'copilot_crag_attempts',
+    'CRAG retrieve/score attempts per request',
+    buckets=(1, 2, 3, 4, 5),
+)
+LLM_TOKENS = Counter(
+    'copilot_llm_tokens_total',
+    'Tokens sent to (in) and generated by (out) OpenAI models',
+    ['purpose', 'direction'],
+)
+PROMPT_TOKENS = Counter(
+    'copilot_prompt_tokens_total',
+    'Tokens of resume and job text in prompts before (raw) and after (sent) compaction or context packing',
+    ['purpose', 'stage'],
+)
+CACHE_LOOKUPS = Counter(
+    'copilot_cache_lookups_total',
+    'Cache lookups by cache and outcome',
+    ['cache', 'result'],
+)
+FALLBACKS = Counter(
+    'copilot_fallbacks_total',
+    'Requests answered with a hard-coded failure payload or degraded path',
+    ['operation'],
+)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    STAGE_SECONDS.labels(stage=stage).observe(seconds)
+
+
+def observe_crag_attempts(attempts: int) -> None:
+    CRAG_ATTEMPTS.observe(attempts)
+
+
+def record_tokens(purpose: str, usage: Any) -> None:
+    """Adds an OpenAI ``usage`` object (chat or embeddings) to the token counters."""
+    if usage is None:
+        return
+    prompt_tokens = getattr(usage, 'prompt_tokens', 0) or 0
+    completion_tokens = getattr(usage, 'completion_tokens', 0) or 0
+    if prompt_tokens:
+        LLM_TOKENS.labels(purpose=purpose, direction='in').inc(prompt_tokens)
+    if completion_tokens:
+        LLM_TOKENS.labels(purpose=purpose, direction='out').inc(completion_tokens)
+
+
+def record_prompt_compaction(purpose: str, before: int, after: int) -> None:
+    PROMPT_TOKENS.labels(purpose=purpose, stage='raw').inc(before)
+    PROMPT_TOKENS.labels(purpose=purpose, stage='sent').inc(after)
+
+
+def record_cache(cache: str, hits: int = 0, misses: int = 0) -> None:
+    if hits:
+        CACHE_LOOKUPS.labels(cache=cache, result='hit').inc(hits)
+    if misses:
+        CACHE_LOOKUPS.labels(cache=cache, result='miss').inc(misses)
+
+
+def record_fallback(operation: str) -> None:
+    FALLBACKS.labels(operation=operation).inc()
+
+
+def render(registry: Optional[CollectorRegistry] = None) -> Tuple[bytes, str]:
+    if registry is None:
+        if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+        else:
+            registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+
+def serve(port: int) -> None:
+    """Exposes this process's metrics on their own port, for processes that serve no HTTP (the task worker)."""
+    start_http_server(port)
+
+
+def mark_process_dead(pid: int) -> None:
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
@@ -0,0 +1,127 @@
+import logging
+import random
+import traceback
+from datetime import timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+_registry: Dict[str, Dict[str, Any]] = {}
+
+
+def task(name: str, on_failure: Optional[Callable[..., None]] = None) -> Callable:
+    """
+    Registers a function as a queue task. Handlers live in each app's tasks.py and are called
+    with the enqueued payload as keyword arguments; on_failure gets the same arguments once the
+    last attempt has failed.
+    """
+
+    def decorator(fn: Callable) -> Callable:
+        _registry[name] = {'fn': fn, 'on_failure': on_failure}
+        return fn
+
+    return decorator
+
+
+def enqueue(name: str, max_attempts: Optional[int] = None, **payload: Any) -> Task:
+    return Task.objects.create(
+        name=name,
+        payload=payload,
+        max_attempts=max_attempts or settings.TASK_MAX_ATTEMPTS,
+    )
+
+
+def backoff_delay(attempts: int) -> float:
+    base = settings.TASK_RETRY_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0)
+    return base + random.uniform(0, base / 2)
+
+
+def claim(limit: int) -> List[Task]:
+    """
+    Locks up to ``limit`` due tasks for this worker. A task whose lock timed out on its last attempt
+    (its worker was killed, say out of memory) is marked failed instead of being run again.
+    """
+    now = timezone.now()
+    stale = now - timedelta(seconds=settings.TASK_LOCK_TIMEOUT_SECONDS)
+    with transaction.atomic():
+        tasks = list(
+            Task.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=Task.Status.QUEUED, run_after__lte=now)
+                # Tasks whose worker died mid-run are picked up again after the lock times out.
+                | Q(status=Task.Status.RUNNING, locked_at__lt=stale)
+            )
+            .order_by('run_after')[:limit]
+        )
+        exhausted = [t for t in tasks if t.status == Task.Status.RUNNING and t.attempts >= t.max_attempts]
+        if exhausted:
+            Task.objects.filter(id__in=[t.id for t in exhausted]).update(
+                status=Task.Status.FAILED,
+                locked_at=None,
+                last_error='The worker stopped during the last attempt and the lock timed out.',
+                updated_at=now,
+            )
+            tasks = [t for t in tasks if t not in exhausted]
+        if tasks:
+            Task.objects.filter(id__in=[t.id for t in tasks]).update(
+                status=Task.Status.RUNNING,
+                locked_at=now,
+                attempts=F('attempts') + 1,
+                updated_at=now,
+            )
+            for t in tasks:
+                t.attempts += 1
+    for t in exhausted:
+        logger.error('Task %s #%s abandoned after %s attempts', t.name, t.id, t.attempts)
+        _on_failure(t)
+    return tasks
+
+
+def run(task_obj: Task) -> None:
+    close_old_connections()
+    try:
+        handler = _registry.get(task_obj.name)
+        if handler is None:
+            _finish(task_obj, Task.Status.FAILED, f'No handler registered for {task_obj.name}')
+            return
+        try:
+            handler['fn'](**task_obj.payload)
+        except Exception:
+            logger.exception('Task %s #%s failed (attempt %s/%s)', task_obj.name, task_obj.id, task_obj.attempts, task_obj.max_attempts)
+            error = traceback.format_exc()
+            if task_obj.attempts < task_obj.max_attempts:
+                Task.objects.filter(id=task_obj.id).update(
+                    status=Task.Status.QUEUED,
+                    locked_at=None,
+                    last_error=error,
+                    run_after=timezone.now() + timedelta(seconds=backoff_delay(task_obj.attempts)),
+                    updated_at=timezone.now(),
+                )
+                return
+            _finish(task_obj, Task.Status.FAILED, error)
+            _on_failure(task_obj)
+            return
+        _finish(task_obj, Task.Status.DONE)
+    finally:
+        close_old_connections()
+
+
+def _on_failure(task_obj: Task) -> None:
+    handler = _registry.get(task_obj.name)
+    if handler is None or handler['on_failure'] is None:
+        return
+    try:
+        handler['on_failure'](**task_obj.payload)
+    except Exception:
+        logger.exception('Failure handler for task %s #%s failed', task_obj.name, task_obj.id)
+
+
+def _finish(task_obj: Task, status: str, error: str = '') -> None:
+    Task.objects.filter(id=task_obj.id).update(status=status, locked_at=None, last_error=error, updated_at=timezone.now())
@@ -0,0 +1,120 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from core import task_queue
+from core.models import Task
+
+NAME = 'tests.task_queue'
+
+
+@override_settings(TASK_RETRY_BACKOFF_SECONDS=5)
+class BackoffDelayTests(SimpleTestCase):
+    def test_doubles_per_attempt_with_up_to_half_again_of_jitter(self):
+        for attempts, base in ((1, 5), (2, 10), (3, 20), (4, 40)):
+            delays = [task_queue.backoff_delay(attempts) for _ in range(50)]
+            self.assertTrue(all(base <= delay <= base * 1.5 for delay in delays), (attempts, delays))
+
+    def test_first_attempt_never_waits_less_than_the_base(self):
+        self.assertGreaterEqual(task_queue.backoff_delay(0), 5)
+
+
+@override_settings(TASK_LOCK_TIMEOUT_SECONDS=600, TASK_MAX_ATTEMPTS=3, TASK_RETRY_BACKOFF_SECONDS=5)
+class QueueTests(TestCase):
+    def setUp(self):
+        self.fn = mock.Mock()
+        self.on_failure = mock.Mock()
+        task_queue.task(NAME, on_failure=self.on_failure)(self.fn)
+        self.addCleanup(task_queue._registry.pop, NAME)
+
+    def running(self, attempts, locked_minutes_ago):
+        return Task.objects.create(
+            name=NAME,
+            payload={'item': attempts},
+            status=Task.Status.RUNNING,
+            attempts=attempts,
+            locked_at=timezone.now() - timedelta(minutes=locked_minutes_ago),
+        )
+
+    def test_claims_due_tasks_and_counts_the_attempt(self):
+        due = task_queue.enqueue(NAME, item=1)
+        later = task_queue.enqueue(NAME, item=2)
+        Task.objects.filter(id=later.id).update(run_after=timezone.now() + timedelta(minutes=5))
+
+        claimed = task_queue.claim(10)
+
+        self.assertEqual([t.id for t in claimed], [due.id])
+        due.refresh_from_db()
+        self.assertEqual((due.status, due.attempts), (Task.Status.RUNNING, 1))
+        self.assertIsNotNone(due.locked_at)
+
+    def test_claims_at_most_limit(self):
+        for item in range(3):
+            task_queue.enqueue(NAME, item=item)
+
+        self.assertEqual(len(task_queue.claim(2)), 2)
+        self.assertEqual(len(task_queue.claim(2)), 1)
+
+    def test_leaves_fresh_locks_alone(self):
+        self.running(attempts=1, locked_minutes_ago=1)
+
+        self.assertEqual(task_queue.claim(10), [])
+
+    def test_reclaims_stale_lock_with_attempts_left(self):
+        stale = self.running(attempts=1, locked_minutes_ago=20)
+
+        claimed = task_queue.claim(10)
+
+        self.assertEqual([t.id for t in claimed], [stale.id])
+        self.assertEqual(claimed[0].attempts, 2)
+        self.on_failure.assert_not_called()
+
+    def test_stale_lock_on_last_attempt_fails_the_task(self):
+        stale = self.running(attempts=3, locked_minutes_ago=20)
+
+        with self.assertLogs('core.task_queue', 'ERROR'):
+            self.assertEqual(task_queue.claim(10), [])
+
+        stale.refresh_from_db()
+        self.assertEqual((stale.status, stale.attempts), (Task.Status.FAILED, 3))
+        self.assertIsNone(stale.locked_at)
+        self.assertIn('lock timed out', stale.last_error)
+        self.on_failure.assert_called_once_with(item=3)
+        self.assertEqual(task_queue.claim(10), [])
+
+    def test_run_marks_success_done(self):
+        task_queue.enqueue(NAME, item=1)
+        claimed = task_queue.claim(1)[0]
+
+        task_queue.run(claimed)
+
+        self.fn.assert_called_once_with(item=1)
+        claimed.refresh_from_db()
+        self.assertEqual(claimed.status, Task.Status.DONE)
+
+    def test_run_requeues_failure_with_backoff(self):
+        self.fn.side_effect = RuntimeError('boom')
+        task_queue.enqueue(NAME, item=1)
+        claimed = task_queue.claim(1)[0]
+
+        with self.assertLogs('core.task_queue', 'ERROR'):
+            task_queue.run(claimed)
+
+        claimed.refresh_from_db()
+        self.assertEqual(claimed.status, Task.Status.QUEUED)
+        self.assertGreater(claimed.run_after, timezone.now() + timedelta(seconds=4))
+        self.assertIn('boom', claimed.last_error)
+        self.on_failure.assert_not_called()
+
+    def test_run_fails_last_attempt_and_calls_on_failure(self):
+        self.fn.side_effect = RuntimeError('boom')
+        task = task_queue.enqueue(NAME, max_attempts=1, item=1)
+
+        with self.assertLogs('core.task_queue', 'ERROR'):
+            task_queue.run(task_queue.claim(1)[0])
+
+        task.refresh_from_db()
+        self.assertEqual(task.status, Task.Status.FAILED)
+        self.on_failure.assert_called_once_with(item=1)
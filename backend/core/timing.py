@@ -0,0 +1,41 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+_stages: ContextVar[Optional[Dict[str, List[float]]]] = ContextVar('stage_timings', default=None)
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """
+    Times one stage of request handling (embed, chroma_query, score, generate, db_write, ...).
+    Durations go to the stage histogram on /metrics, to the surrounding collect_stages() block,
+    if any, and to the DEBUG log.
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = (time.perf_counter() - started) * 1000
+        metrics.observe_stage(stage, elapsed / 1000)
+        stages = _stages.get()
+        if stages is not None:
+            stages.setdefault(stage, []).append(elapsed)
+        logger.debug('stage=%s ms=%.1f', stage, elapsed)
+
+
+@contextmanager
+def collect_stages() -> Iterator[Dict[str, List[float]]]:
+    """Collects every timed() stage run in this context; values are lists of milliseconds."""
+    stages: Dict[str, List[float]] = {}
+    token = _stages.set(stages)
+    try:
+        yield stages
+    finally:
+        _stages.reset(token)
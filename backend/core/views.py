@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from rest_framework import permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from ai_engine.services import vector_store
+
+from . import metrics
+
+
+class ReadinessView(APIView):
+    """Per-worker readiness: with warm-up enabled, not ready until this worker has opened the vector store."""
+
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request):
+        loaded = vector_store.is_loaded()
+        ready = loaded or not settings.VECTOR_STORE_WARMUP
+        return Response(
+            {
+                'ready': ready,
+                'vector_store': 'loaded' if loaded else 'not_loaded',
+                'warmup': settings.VECTOR_STORE_WARMUP,
+            },
+            status=status.HTTP_200_OK if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+        )
+
+
+def metrics_view(request):
+    """Prometheus scrape target; served by gunicorn directly and not proxied by nginx."""
+    if not settings.METRICS_ENABLED:
+        raise Http404
+    content, content_type = metrics.render()
+    return HttpResponse(content, content_type=content_type)
@@ -1,11 +1,18 @@
 #!/bin/sh
 set -e
 
+if [ -n "$PROMETHEUS_MULTIPROC_DIR" ]; then
+  # Metric files from a previous run would be summed into this one.
+  rm -rf "$PROMETHEUS_MULTIPROC_DIR"
+  mkdir -p "$PROMETHEUS_MULTIPROC_DIR"
+fi
+
 echo "Running migrations..."
 python manage.py migrate --noinput
+python manage.py createcachetable
 
 echo "Collecting static files..."
 python manage.py collectstatic --noinput
 
 echo "Starting Gunicorn..."
-exec gunicorn career_copilot.wsgi:application --bind 0.0.0.0:8000
+exec gunicorn career_copilot.wsgi:application --config python:career_copilot.gunicorn_conf
@@ -0,0 +1,61 @@
+import os
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from benchmarks.fake_jsearch import running_fake_jsearch
+from benchmarks.utils import elapsed_ms, summarize, write_results
+from jobs.services import jsearch
+
+
+class Command(BaseCommand):
+    help = 'Measure JSearch fetch latency (cold, cached, sequential vs concurrent pages) against a local fake server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--latency-ms', type=float, default=250, help='Simulated JSearch response time')
+        parser.add_argument('--pages', type=int, default=3)
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--output', help='Write results as JSON to this path')
+
+    def handle(self, *args, **options):
+        pages = options['pages']
+        timings = {'cold_page': [], 'cached_page': [], 'sequential_pages': [], 'concurrent_pages': []}
+
+        os.environ.setdefault('JSEARCH_API_KEY', 'bench')
+        with running_fake_jsearch(latency_ms=options['latency_ms']) as server, override_settings(JSEARCH_URL=server.url):
+            for run in range(options['runs']):
+                # A fresh role per phase misses the shared cache without clearing entries other searches rely on.
+                role, location = f'Backend Engineer {run} {uuid.uuid4().hex[:8]}', 'Austin'
+
+                started = time.perf_counter()
+                jsearch.fetch_jobs(role, location)
+                timings['cold_page'].append(elapsed_ms(started))
+
+                # Different spacing and case must hit the same cache entry.
+                started = time.perf_counter()
+                jsearch.fetch_jobs(f'  {role.lower()} ', location.upper())
+                timings['cached_page'].append(elapsed_ms(started))
+
+                role = f'Backend Engineer {run} {uuid.uuid4().hex[:8]}'
+                started = time.perf_counter()
+                for page in range(1, pages + 1):
+                    jsearch.fetch_jobs(role, location, page=page)
+                timings['sequential_pages'].append(elapsed_ms(started))
+
+                role = f'Backend Engineer {run} {uuid.uuid4().hex[:8]}'
+                started = time.perf_counter()
+                jsearch.fetch_jobs(role, location, page=1, pages=pages)
+                timings['concurrent_pages'].append(elapsed_ms(started))
+
+            upstream = {'requests': server.requests, 'connections': server.connections}
+
+        results = {name: summarize(values) for name, values in timings.items()}
+        results['upstream'] = upstream
+        results['params'] = {'latency_ms': options['latency_ms'], 'pages': pages, 'runs': options['runs']}
+        for name in timings:
+            self.stdout.write(f"{name:>16}: p50={results[name]['p50']:.1f}ms p95={results[name]['p95']:.1f}ms")
+        self.stdout.write(f"upstream requests={upstream['requests']} connections={upstream['connections']}")
+        if options['output']:
+            write_results(options['output'], 'jsearch', results)
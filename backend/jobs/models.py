@@ -9,11 +9,20 @@ class JobDescription(models.Model):
     location = models.CharField(max_length=255, blank=True, default='')
     apply_url = models.URLField(max_length=1024, blank=True, default='')
     source = models.CharField(max_length=100, blank=True, default='')
+    # Stable id of an imported posting; blank for jobs entered by hand.
+    external_id = models.CharField(max_length=255, blank=True, default='')
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         ordering = ['-created_at']
         indexes = [models.Index(fields=['user', '-created_at']), models.Index(fields=['company'])]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'external_id'],
+                condition=~models.Q(external_id=''),
+                name='uniq_job_external_id_per_user',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.company} - {self.role}'
@@ -0,0 +1,52 @@
+from typing import Any, Dict, List
+
+from django.db import transaction
+from django.db.models import Q
+
+from ..models import JobDescription
+
+
+def import_jobs(user, fetched: List[Dict[str, Any]]) -> List[JobDescription]:
+    """
+    Writes one page of fetched jobs with set-based statements: one lookup for postings the user
+    already has, one INSERT ... ON CONFLICT DO NOTHING, one read-back of the new rows' ids.
+    Jobs imported before external ids existed are still matched on (role, company).
+    """
+    if not fetched:
+        return []
+
+    with transaction.atomic():
+        existing = JobDescription.objects.filter(user=user).filter(
+            Q(external_id__in=[job['external_id'] for job in fetched])
+            | Q(external_id='', role__in={job['role'] for job in fetched}, company__in={job['company'] for job in fetched})
+        ).values_list('external_id', 'role', 'company')
+        seen_ids = set()
+        seen_pairs = set()
+        for external_id, role, company in existing:
+            seen_ids.add(external_id)
+            seen_pairs.add((role, company))
+
+        rows = []
+        for job in fetched:
+            if job['external_id'] in seen_ids or (job['role'], job['company']) in seen_pairs:
+                continue
+            seen_ids.add(job['external_id'])
+            seen_pairs.add((job['role'], job['company']))
+            rows.append(
+                JobDescription(
+                    user=user,
+                    external_id=job['external_id'],
+                    role=job['role'],
+                    company=job['company'],
+                    description=job['description'],
+                    location=job['location'],
+                    apply_url=job['apply_url'],
+                    source=job['source'],
+                )
+            )
+        if not rows:
+            return []
+
+        # A concurrent import of the same page can still race us; the unique constraint decides.
+        JobDescription.objects.bulk_create(rows, ignore_conflicts=True)
+        return list(JobDescription.objects.filter(user=user, external_id__in=[row.external_id for row in rows]))
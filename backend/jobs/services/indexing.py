@@ -0,0 +1,29 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List
+
+from ai_engine.services.chunking import chunk_document
+from ai_engine.services.vector_store import sync_documents
+
+from ..models import JobDescription
+
+
+def index_jobs(jobs: Iterable[JobDescription]) -> int:
+    jobs = list(jobs)
+    if not jobs:
+        return 0
+
+    by_user: Dict[int, List[JobDescription]] = defaultdict(list)
+    for job in jobs:
+        by_user[job.user_id].append(job)
+
+    # One diff per user: unchanged chunks are skipped, and anything else indexed for these
+    # jobs (dropped tail chunks, pre-chunking `job-{id}` entries) is deleted.
+    for user_id, user_jobs in by_user.items():
+        ids, documents, metadatas = [], [], []
+        for job in user_jobs:
+            for i, chunk in enumerate(chunk_document(job.description, title=f'{job.role} at {job.company}')):
+                ids.append(f'job-{job.id}-{i}')
+                documents.append(chunk)
+                metadatas.append({'user_id': user_id, 'source': 'job', 'job_id': job.id, 'idx': i})
+        sync_documents(user_id, {'job_id': {'$in': [job.id for job in user_jobs]}}, ids, documents, metadatas)
+    return len(jobs)
@@ -1,36 +1,101 @@
+import hashlib
+import json
+import logging
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-JSEARCH_URL = "https://api.openwebninja.com/jsearch/search"
+from core import metrics
+from core.timing import timed
 
+logger = logging.getLogger(__name__)
 
-def fetch_jobs(role, location, experience_level=None, page=1):
-    api_key = os.environ.get("JSEARCH_API_KEY")
-    if not api_key:
-        raise ValueError("JSEARCH_API_KEY environment variable is not set")
+_lock = threading.Lock()
+_session = None
+_session_pid = None
 
-    headers = {
-        "x-api-key": api_key,
-    }
 
-    params = {
-        "query": f"{role} in {location}",
-        "page": page,
-        "num_pages": 1,
-    }
-    
-    if experience_level:
-        # e.g. no_experience, under_3_years_experience
-        params["job_requirements"] = experience_level
+def _get_session():
+    """One keep-alive session per process, rebuilt after fork so workers never share sockets."""
+    global _session, _session_pid
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _lock:
+            if _session is None or _session_pid != pid:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=settings.JSEARCH_POOL_SIZE,
+                    max_retries=Retry(
+                        total=2,
+                        backoff_factor=0.5,
+                        status_forcelist=(429, 502, 503, 504),
+                        allowed_methods=("GET",),
+                    ),
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+                _session_pid = pid
+    return _session
+
+
+def _normalize(value):
+    return " ".join((value or "").split()).lower()
+
+
+def _cache():
+    return caches[settings.JSEARCH_CACHE_ALIAS]
+
+
+def _cache_get(key):
+    # A missing cache table or a database hiccup costs an upstream call, not the import.
+    try:
+        return _cache().get(key)
+    except Exception:
+        logger.exception("JSearch cache lookup failed.")
+        return None
+
+
+def _cache_set(key, jobs):
+    try:
+        _cache().set(key, jobs, timeout=settings.JSEARCH_CACHE_TTL)
+    except Exception:
+        logger.exception("JSearch cache write failed.")
+
+
+def _cache_key(params):
+    return "jsearch:" + hashlib.sha256(json.dumps(params, sort_keys=True).encode("utf-8")).hexdigest()
 
-    r = requests.get(JSEARCH_URL, headers=headers, params=params, timeout=60)
-    r.raise_for_status()
 
-    data = r.json().get("data", [])
+def _fetch_page(api_key, params):
+    key = _cache_key(params)
+    cached = _cache_get(key)
+    metrics.record_cache("jsearch", hits=int(cached is not None), misses=int(cached is None))
+    if cached is not None:
+        logger.info("JSearch cache hit page=%s", params["page"])
+        return cached
+
+    with timed("jsearch_fetch"):
+        r = _get_session().get(
+            settings.JSEARCH_URL,
+            headers={"x-api-key": api_key},
+            params=params,
+            timeout=(settings.JSEARCH_CONNECT_TIMEOUT, settings.JSEARCH_READ_TIMEOUT),
+        )
+        r.raise_for_status()
 
     jobs = []
-    for j in data:
+    for j in r.json().get("data", []):
         jobs.append({
+            "external_id": _external_id(j)[:255],
             "role": j.get("job_title", ""),
             "company": j.get("employer_name", ""),
             "location": j.get("job_city", "") or j.get("job_state", "") or "",
@@ -39,4 +104,50 @@ def fetch_jobs(role, location, experience_level=None, page=1):
             "source": j.get("job_publisher", ""),
         })
 
+    _cache_set(key, jobs)
     return jobs
+
+
+def _fetch_page_in_thread(api_key, params):
+    try:
+        return _fetch_page(api_key, params)
+    finally:
+        # The database cache opened a connection for this pool thread; nothing else will close it.
+        connection.close()
+
+
+def fetch_jobs(role, location, experience_level=None, page=1, pages=1):
+    """
+    Fetches `pages` consecutive result pages starting at `page`. Pages are cached by their
+    normalized query parameters, so identical searches from different users share results,
+    and uncached pages are fetched concurrently up to JSEARCH_MAX_CONCURRENCY at a time.
+    """
+    api_key = os.environ.get("JSEARCH_API_KEY")
+    if not api_key:
+        raise ValueError("JSEARCH_API_KEY environment variable is not set")
+
+    base_params = {
+        "query": f"{_normalize(role)} in {_normalize(location)}",
+        "num_pages": 1,
+    }
+
+    if experience_level:
+        # e.g. no_experience, under_3_years_experience
+        base_params["job_requirements"] = experience_level
+
+    page_params = [{**base_params, "page": p} for p in range(page, page + max(pages, 1))]
+    if len(page_params) == 1:
+        return _fetch_page(api_key, page_params[0])
+
+    with ThreadPoolExecutor(max_workers=min(len(page_params), settings.JSEARCH_MAX_CONCURRENCY)) as pool:
+        results = list(pool.map(lambda params: _fetch_page_in_thread(api_key, params), page_params))
+    return [job for page_jobs in results for job in page_jobs]
+
+
+def _external_id(job):
+    if job.get("job_id"):
+        return f"jsearch:{job['job_id']}"
+    fingerprint = "|".join(
+        job.get(key) or "" for key in ("job_title", "employer_name", "job_city", "job_apply_link")
+    )
+    return "jsearch-sha1:" + hashlib.sha1(fingerprint.encode("utf-8")).hexdigest()
@@ -0,0 +1,11 @@
+from typing import List
+
+from core.task_queue import task
+
+from .models import JobDescription
+from .services.indexing import index_jobs
+
+
+@task('jobs.index_jobs')
+def index_jobs_task(job_ids: List[int]) -> None:
+    index_jobs(JobDescription.objects.filter(id__in=job_ids))
@@ -0,0 +1,87 @@
+import os
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from jobs.services import jsearch
+from jobs.views import AutoImportJobsView
+
+CACHES = {
+    "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "default"},
+    "jsearch": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "jsearch-tests"},
+}
+
+
+def _response(params):
+    response = mock.Mock()
+    response.json.return_value = {
+        "data": [{"job_id": f"{params['page']}-{i}", "job_title": "Engineer", "employer_name": "Acme"} for i in range(2)]
+    }
+    return response
+
+
+@override_settings(CACHES=CACHES, JSEARCH_CACHE_ALIAS="jsearch", JSEARCH_CACHE_TTL=60, JSEARCH_MAX_CONCURRENCY=3)
+@mock.patch.dict(os.environ, {"JSEARCH_API_KEY": "test"})
+class FetchJobsTests(SimpleTestCase):
+    def setUp(self):
+        self.session = mock.Mock()
+        self.session.get.side_effect = lambda url, headers, params, timeout: _response(params)
+        patcher = mock.patch.object(jsearch, "_get_session", return_value=self.session)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(jsearch._cache().clear)
+
+    def test_identical_searches_share_cached_pages(self):
+        first = jsearch.fetch_jobs("Backend Engineer", "Austin")
+        second = jsearch.fetch_jobs("  backend   engineer ", "AUSTIN")
+
+        self.assertEqual(first, second)
+        self.assertEqual(self.session.get.call_count, 1)
+
+    def test_pages_come_back_in_order(self):
+        jobs = jsearch.fetch_jobs("Backend Engineer", "Austin", page=2, pages=3)
+
+        self.assertEqual(
+            [job["external_id"] for job in jobs],
+            ["jsearch:2-0", "jsearch:2-1", "jsearch:3-0", "jsearch:3-1", "jsearch:4-0", "jsearch:4-1"],
+        )
+
+    def test_pool_threads_close_their_database_connection(self):
+        with mock.patch.object(jsearch, "connection") as connection:
+            jsearch.fetch_jobs("Backend Engineer", "Austin", pages=3)
+
+        self.assertEqual(connection.close.call_count, 3)
+
+    def test_unavailable_cache_falls_through_to_upstream(self):
+        with mock.patch.object(jsearch, "_cache", side_effect=RuntimeError("no such table: jsearch_cache")):
+            with self.assertLogs("jobs.services.jsearch", "ERROR"):
+                jobs = jsearch.fetch_jobs("Backend Engineer", "Austin")
+
+        self.assertEqual(len(jobs), 2)
+
+
+@mock.patch.object(AutoImportJobsView, "throttle_classes", [])
+@override_settings(JSEARCH_MAX_PAGE=5, JSEARCH_MAX_PAGES_PER_REQUEST=3)
+class AutoImportPagingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(get_user_model().objects.create_user(email="jobs@example.com", username="jobs"))
+
+    def fetched(self, **data):
+        with mock.patch("jobs.views.fetch_jobs", return_value=[]) as fetch_jobs:
+            response = self.client.post("/api/jobs/auto-import/", {"role": "Engineer", "location": "Austin", **data})
+        self.assertEqual(response.status_code, 200)
+        _, _, _, page = fetch_jobs.call_args.args
+        return page, fetch_jobs.call_args.kwargs["pages"]
+
+    def test_last_fetched_page_stays_within_the_cap(self):
+        self.assertEqual(self.fetched(page=5, pages=3), (5, 1))
+        self.assertEqual(self.fetched(page=4, pages=3), (4, 2))
+        self.assertEqual(self.fetched(page=1, pages=3), (1, 3))
+
+    def test_out_of_range_values_are_clamped(self):
+        self.assertEqual(self.fetched(page=9, pages=9), (5, 1))
+        self.assertEqual(self.fetched(page=0, pages=0), (1, 1))
+        self.assertEqual(self.fetched(page="x", pages="y"), (1, 1))
@@ -1,19 +1,28 @@
 import logging
+import time
 
+from django.conf import settings
 from rest_framework import permissions, viewsets
 from rest_framework.throttling import UserRateThrottle
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
 
+from ai_engine.services.vector_store import delete_documents
 from core.permissions import IsOwner
+from core.task_queue import enqueue
 
 from .models import JobDescription
 from .serializers import JobDescriptionSerializer
+from .services.importer import import_jobs
+from .services.indexing import index_jobs
 from .services.jsearch import fetch_jobs
 
 logger = logging.getLogger(__name__)
 
+# Fields that end up in a job's indexed chunks.
+INDEXED_FIELDS = {"role", "company", "description"}
+
 
 class JobDescriptionViewSet(viewsets.ModelViewSet):
     serializer_class = JobDescriptionSerializer
@@ -25,6 +34,19 @@ class JobDescriptionViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+    def perform_update(self, serializer):
+        job = serializer.save()
+        if INDEXED_FIELDS & serializer.validated_data.keys():
+            enqueue("jobs.index_jobs", job_ids=[job.id])
+
+    def perform_destroy(self, instance):
+        user_id, job_id = instance.user_id, instance.id
+        instance.delete()
+        try:
+            delete_documents(user_id, where={'job_id': job_id})
+        except Exception:
+            logger.exception('Job de-index failed for job_id=%s user_id=%s', job_id, user_id)
+
 
 class AutoImportThrottle(UserRateThrottle):
     rate = '5/min'
@@ -44,8 +66,14 @@ class AutoImportJobsView(APIView):
         except ValueError:
             page = 1
             
-        if page > 5:
-            page = 5
+        page = max(1, min(page, settings.JSEARCH_MAX_PAGE))
+
+        try:
+            pages = int(request.data.get("pages", 1))
+        except ValueError:
+            pages = 1
+        # The last page fetched, not just the first, stays within JSEARCH_MAX_PAGE.
+        pages = max(1, min(pages, settings.JSEARCH_MAX_PAGES_PER_REQUEST, settings.JSEARCH_MAX_PAGE - page + 1))
 
         if not role or not location:
             return Response(
@@ -54,7 +82,7 @@ class AutoImportJobsView(APIView):
             )
 
         try:
-            jobs = fetch_jobs(role, location, experience_level, page)
+            jobs = fetch_jobs(role, location, experience_level, page, pages=pages)
         except ValueError as e:
             logger.error("JSearch config error: %s", e)
             return Response(
@@ -68,26 +96,34 @@ class AutoImportJobsView(APIView):
                 status=status.HTTP_502_BAD_GATEWAY,
             )
 
-        created = 0
-        for job in jobs:
-            _, was_created = JobDescription.objects.get_or_create(
-                user=request.user,
-                role=job["role"],
-                company=job["company"],
-                defaults={
-                    "description": job["description"],
-                    "location": job["location"],
-                    "apply_url": job["apply_url"],
-                    "source": job["source"],
-                },
-            )
-            if was_created:
-                created += 1
-
-        has_more = len(jobs) >= 20
+        started = time.perf_counter()
+        created_jobs = import_jobs(request.user, jobs)
+        db_write_ms = (time.perf_counter() - started) * 1000
+
+        started = time.perf_counter()
+        embedding = "skipped"
+        if created_jobs and settings.JOB_IMPORT_EMBED_SYNC:
+            try:
+                index_jobs(created_jobs)
+                embedding = "indexed"
+            except Exception:
+                logger.exception("Embedding imported jobs failed for user_id=%s", request.user.id)
+                embedding = "failed"
+        elif created_jobs:
+            enqueue("jobs.index_jobs", job_ids=[job.id for job in created_jobs])
+            embedding = "queued"
+        embedding_ms = (time.perf_counter() - started) * 1000
+
+        has_more = len(jobs) >= 20 * pages and page + pages - 1 < settings.JSEARCH_MAX_PAGE
         return Response({
-            "imported": created, 
+            "imported": len(created_jobs),
             "total_found": len(jobs),
             "page": page,
-            "has_more": has_more
+            "pages": pages,
+            "has_more": has_more,
+            "embedding": embedding,
+            "timings": {
+                "db_write_ms": round(db_write_ms, 1),
+                "embedding_ms": round(embedding_ms, 1),
+            },
         })
@@ -0,0 +1,33 @@
+"""
+Text extraction that runs inside the extraction process pool. Kept free of Django imports so
+pool workers start quickly and hold only pypdf in memory.
+"""
+import io
+import resource
+from typing import List
+
+from pypdf import PdfReader
+
+
+class ExtractionError(ValueError):
+    """The file is corrupt or exceeds an extraction limit (size, pages, time, memory); it will not be retried."""
+
+
+class ExtractionInterrupted(RuntimeError):
+    """Another file's timeout shut down the shared pool mid-extraction; the task queue retries it."""
+
+
+def limit_memory(max_bytes: int) -> None:
+    # Pool initializer: a PDF that expands past this address-space cap fails with MemoryError
+    # in the worker instead of growing the host process.
+    if max_bytes > 0:
+        resource.setrlimit(resource.RLIMIT_AS, (max_bytes, max_bytes))
+
+
+def count_pdf_pages(data: bytes) -> int:
+    return len(PdfReader(io.BytesIO(data)).pages)
+
+
+def extract_pdf_pages(data: bytes, start: int, end: int) -> List[str]:
+    reader = PdfReader(io.BytesIO(data))
+    return [reader.pages[i].extract_text() or '' for i in range(start, end)]
@@ -0,0 +1,87 @@
+import io
+import resource
+import time
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+from pypdf import PdfReader
+
+from benchmarks.synthetic_pdf import make_pdf
+from benchmarks.utils import elapsed_ms, summarize, write_results
+from resumes import services
+
+
+def _extract_inline(data: bytes) -> str:
+    # The previous implementation: every page parsed serially in the calling process.
+    reader = PdfReader(io.BytesIO(data))
+    return '\n'.join([p.extract_text() or '' for p in reader.pages])
+
+
+def _peak_rss_kib() -> int:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+class Command(BaseCommand):
+    help = 'Throughput and peak RSS of PDF text extraction: in-process serial vs the extraction process pool'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', default='2,10,40', help='Comma-separated page counts of the synthetic PDFs')
+        parser.add_argument('--files', type=int, default=5, help='Files extracted per page count')
+        parser.add_argument('--workers', default='1,2,4', help='Comma-separated pool sizes')
+        parser.add_argument('--output', help='Write results as JSON to this path')
+
+    def handle(self, *args, **options):
+        page_counts = [int(p) for p in options['pages'].split(',')]
+        pool_sizes = [int(w) for w in options['workers'].split(',')]
+        documents = {pages: [make_pdf(pages, seed=i) for i in range(options['files'])] for pages in page_counts}
+        results = {}
+
+        # ru_maxrss only ever grows, so the pool runs go first: the parent's peak after them is
+        # the pool's cost, and the inline run can only raise it further.
+        for workers in pool_sizes:
+            services._discard_pool()
+            with override_settings(RESUME_EXTRACTION_WORKERS=workers, RESUME_MAX_PAGES=max(page_counts)):
+                # Start the pool outside the timed runs; workers live for the life of the process.
+                services.extract_text_from_file(ContentFile(make_pdf(1), name='warmup.pdf'))
+                results[f'pool_{workers}'] = self._run(
+                    documents, lambda data: services.extract_text_from_file(ContentFile(data, name='bench.pdf'))
+                )
+                results[f'pool_{workers}']['worker_peak_rss_kib'] = max(services.worker_peak_rss_kib(), default=0)
+            services._discard_pool()
+
+        results['inline'] = self._run(documents, _extract_inline)
+
+        for mode, data in results.items():
+            self.stdout.write(
+                f"{mode:>8}: "
+                + ' '.join(
+                    f"{pages}p={row['pages_per_second']:.0f}pg/s(p50 {row['file_ms']['p50']:.0f}ms)"
+                    for pages, row in data['by_pages'].items()
+                )
+                + f" parent_rss={data['parent_peak_rss_kib'] // 1024}MiB"
+                + (f" worker_rss={data['worker_peak_rss_kib'] // 1024}MiB" if 'worker_peak_rss_kib' in data else '')
+            )
+        if options['output']:
+            write_results(
+                options['output'],
+                'resume_extraction',
+                {'params': {'pages': page_counts, 'files': options['files'], 'workers': pool_sizes}, 'modes': results},
+            )
+
+    def _run(self, documents, extract):
+        by_pages = {}
+        for pages, files in documents.items():
+            timings = []
+            started_all = time.perf_counter()
+            for data in files:
+                started = time.perf_counter()
+                extract(data)
+                timings.append(elapsed_ms(started))
+            seconds = elapsed_ms(started_all) / 1000
+            by_pages[str(pages)] = {
+                'file_ms': summarize(timings),
+                'pages_per_second': round(pages * len(files) / seconds, 1) if seconds else 0.0,
+                'bytes_per_file': len(files[0]),
+            }
+        return {'by_pages': by_pages, 'parent_peak_rss_kib': _peak_rss_kib()}
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.5 on 2026-10-18 04:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('resumes', '0002_rename_resumes_res_user_id_923ebe_idx_resumes_res_user_id_6019d7_idx'),
+    ]
+
+    operations = [
+        # Resumes uploaded before the task queue were extracted and indexed inline.
+        migrations.AddField(
+            model_name='resume',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('EXTRACTING', 'Extracting'), ('INDEXED', 'Indexed'), ('FAILED', 'Failed')], default='INDEXED', max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='resume',
+            name='status',
+            field=models.CharField(choices=[('PENDING', 'Pending'), ('EXTRACTING', 'Extracting'), ('INDEXED', 'Indexed'), ('FAILED', 'Failed')], default='PENDING', max_length=20),
+        ),
+    ]
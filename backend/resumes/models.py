@@ -2,10 +2,17 @@ from django.db import models
 
 
 class Resume(models.Model):
+    class Status(models.TextChoices):
+        PENDING = 'PENDING', 'Pending'
+        EXTRACTING = 'EXTRACTING', 'Extracting'
+        INDEXED = 'INDEXED', 'Indexed'
+        FAILED = 'FAILED', 'Failed'
+
     user = models.ForeignKey('accounts.User', on_delete=models.CASCADE, related_name='resumes', db_index=True)
     title = models.CharField(max_length=255)
     file = models.FileField(upload_to='resumes/')
     extracted_text = models.TextField(blank=True)
+    status = models.CharField(max_length=20, choices=Status.choices, default=Status.PENDING)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -1,11 +1,10 @@
-import logging
-
+from django.conf import settings
 from rest_framework import serializers
 
-from .models import Resume
-from .services import extract_text_from_file, index_resume
+from core.task_queue import enqueue
 
-logger = logging.getLogger(__name__)
+from .models import Resume
+from .services import SUPPORTED_EXTENSIONS
 
 
 class ResumeSerializer(serializers.ModelSerializer):
@@ -13,8 +12,15 @@ class ResumeSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Resume
-        fields = ('id', 'user', 'title', 'file', 'extracted_text', 'created_at', 'updated_at')
-        read_only_fields = ('id', 'user', 'extracted_text', 'created_at', 'updated_at')
+        fields = ('id', 'user', 'title', 'file', 'extracted_text', 'status', 'created_at', 'updated_at')
+        read_only_fields = ('id', 'user', 'extracted_text', 'status', 'created_at', 'updated_at')
+
+    def validate_file(self, value):
+        if not value.name.lower().endswith(SUPPORTED_EXTENSIONS):
+            raise serializers.ValidationError('Only PDF and DOCX files are supported.')
+        if value.size > settings.RESUME_MAX_FILE_MB * 1024 * 1024:
+            raise serializers.ValidationError(f'Files larger than {settings.RESUME_MAX_FILE_MB} MB are not supported.')
+        return value
 
     def create(self, validated_data):
         request = self.context['request']
@@ -25,11 +31,7 @@ class ResumeSerializer(serializers.ModelSerializer):
         if not title:
             validated_data['title'] = uploaded_file.name.rsplit('.', 1)[0]
 
-        text = extract_text_from_file(uploaded_file)
-        uploaded_file.seek(0)
-        resume = Resume.objects.create(user=user, extracted_text=text, **validated_data)
-        try:
-            index_resume(user.id, resume.id, text)
-        except Exception:
-            logger.exception('Resume indexed failed for resume_id=%s user_id=%s', resume.id, user.id)
+        # Extraction and embedding run in the task worker; clients poll /resumes/{id}/status/.
+        resume = Resume.objects.create(user=user, status=Resume.Status.PENDING, **validated_data)
+        enqueue('resumes.process_resume', resume_id=resume.id)
         return resume
@@ -1,49 +1,187 @@
+import atexit
 import logging
-import tempfile
-from typing import List
+import math
+import multiprocessing
+import os
+import threading
+import time
+import zipfile
+from typing import Dict, List
 
 import docx2txt
+from django.conf import settings
 from django.core.files.uploadedfile import UploadedFile
-from pypdf import PdfReader
+from pypdf.errors import PyPdfError
 
-from ai_engine.services.vector_store import upsert_documents
+from ai_engine.services.chunking import chunk_document
+from ai_engine.services.vector_store import delete_documents, sync_documents
+from core.timing import timed
+
+from . import extraction
+from .extraction import ExtractionError, ExtractionInterrupted
 
 logger = logging.getLogger(__name__)
 
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx')
+# How often a wait on the shared pool checks whether another extraction's timeout discarded it.
+_POLL_SECONDS = 0.5
+
+_pool_lock = threading.Lock()
+_pool = None
+_pool_pid = None
+
+
+def _get_pool():
+    """
+    Extraction pool, created on first use in each process. forkserver children start from a clean
+    interpreter, so they never inherit the worker's threads, sockets or Django state.
+    """
+    global _pool, _pool_pid
+    pid = os.getpid()
+    if _pool is None or _pool_pid != pid:
+        with _pool_lock:
+            if _pool is None or _pool_pid != pid:
+                _pool = multiprocessing.get_context('forkserver').Pool(
+                    processes=settings.RESUME_EXTRACTION_WORKERS,
+                    initializer=extraction.limit_memory,
+                    initargs=(settings.RESUME_EXTRACTION_MAX_MEMORY_MB * 1024 * 1024,),
+                    # Recycled workers give back whatever a large PDF made them allocate.
+                    maxtasksperchild=100,
+                )
+                _pool_pid = pid
+    return _pool
+
+
+def _discard_pool(pool=None) -> None:
+    # A timed-out page is still running in some worker; terminating the pool is the only way to stop it.
+    # Given ``pool``, only that pool goes: a replacement another thread already started is left alone.
+    global _pool, _pool_pid
+    with _pool_lock:
+        if pool is not None and _pool is not pool:
+            return
+        if _pool is not None and _pool_pid == os.getpid():
+            _pool.terminate()
+            _pool.join()
+        _pool = None
+        _pool_pid = None
+
+
+atexit.register(_discard_pool)
+
+
+def worker_peak_rss_kib() -> List[int]:
+    """Peak RSS of each live extraction worker (Linux only), for benchmarks."""
+    if _pool is None or _pool_pid != os.getpid():
+        return []
+    peaks = []
+    for process in _pool._pool:
+        try:
+            with open(f'/proc/{process.pid}/status', encoding='ascii') as fh:
+                peaks.extend(int(line.split()[1]) for line in fh if line.startswith('VmHWM:'))
+        except OSError:
+            continue
+    return peaks
+
+
+def _check_size(file: UploadedFile) -> None:
+    limit = settings.RESUME_MAX_FILE_MB * 1024 * 1024
+    if file.size is not None and file.size > limit:
+        raise ExtractionError(f'File is larger than {settings.RESUME_MAX_FILE_MB} MB.')
+
+
+def _wait(pool, pending, deadline: float):
+    """
+    The result of ``pending``, checked in short waits: a pool terminated for another file's timeout
+    never completes its other tasks, so those callers give up early with a retryable error.
+    """
+    while True:
+        remaining = deadline - time.monotonic()
+        try:
+            return pending.get(timeout=max(min(remaining, _POLL_SECONDS), 0))
+        except multiprocessing.TimeoutError:
+            if _pool is not pool:
+                raise ExtractionInterrupted('The extraction pool was restarted by another upload.')
+            if remaining <= _POLL_SECONDS:
+                raise
+
+
+def _extract_pdf(file: UploadedFile) -> str:
+    file.seek(0)
+    data = file.read()
+    deadline = time.monotonic() + settings.RESUME_EXTRACTION_TIMEOUT_SECONDS
+    pool = _get_pool()
+    try:
+        pages = _wait(pool, pool.apply_async(extraction.count_pdf_pages, (data,)), deadline)
+        if pages > settings.RESUME_MAX_PAGES:
+            raise ExtractionError(f'PDF has {pages} pages; the limit is {settings.RESUME_MAX_PAGES}.')
+
+        # One contiguous page range per worker; every range re-opens the document, so finer
+        # splits would spend more time parsing than they save.
+        step = max(1, math.ceil(pages / settings.RESUME_EXTRACTION_WORKERS))
+        ranges = [
+            pool.apply_async(extraction.extract_pdf_pages, (data, start, min(start + step, pages)))
+            for start in range(0, pages, step)
+        ]
+        texts: List[str] = []
+        for pending in ranges:
+            texts.extend(_wait(pool, pending, deadline))
+    except multiprocessing.TimeoutError:
+        _discard_pool(pool)
+        raise ExtractionError(f'PDF extraction took longer than {settings.RESUME_EXTRACTION_TIMEOUT_SECONDS}s.')
+    except MemoryError:
+        raise ExtractionError(f'PDF extraction needed more than {settings.RESUME_EXTRACTION_MAX_MEMORY_MB} MB.')
+    except PyPdfError as exc:
+        # A corrupt file fails the same way on every attempt.
+        raise ExtractionError(f'PDF could not be read: {exc}')
+    except ValueError as exc:
+        # apply_async on a pool another thread has just terminated: "Pool not running".
+        if _pool is not pool and not isinstance(exc, ExtractionError):
+            raise ExtractionInterrupted('The extraction pool was restarted by another upload.')
+        raise
+    return '\n'.join(texts)
+
+
+def _extract_docx(file: UploadedFile) -> str:
+    # A .docx is a zip archive; zipfile reads it straight from the upload without a temp file.
+    file.seek(0)
+    try:
+        with zipfile.ZipFile(file) as archive:
+            uncompressed = sum(info.file_size for info in archive.infolist())
+        if uncompressed > settings.RESUME_MAX_UNCOMPRESSED_MB * 1024 * 1024:
+            raise ExtractionError(f'DOCX expands to more than {settings.RESUME_MAX_UNCOMPRESSED_MB} MB.')
+        file.seek(0)
+        return docx2txt.process(file) or ''
+    except zipfile.BadZipFile:
+        raise ExtractionError('DOCX is not a valid zip archive.')
+    except KeyError:
+        # docx2txt reads word/document.xml, which every Word document has.
+        raise ExtractionError('DOCX has no document body.')
+
 
 def extract_text_from_file(file: UploadedFile) -> str:
     name = file.name.lower()
     try:
-        if name.endswith('.pdf'):
-            file.seek(0)
-            reader = PdfReader(file)
-            return '\n'.join([p.extract_text() or '' for p in reader.pages])
-        if name.endswith('.docx'):
-            file.seek(0)
-            with tempfile.NamedTemporaryFile(suffix='.docx') as tmp:
-                tmp.write(file.read())
-                tmp.flush()
-                return docx2txt.process(tmp.name) or ''
+        with timed('resume_extraction'):
+            if name.endswith('.pdf'):
+                _check_size(file)
+                return _extract_pdf(file)
+            if name.endswith('.docx'):
+                _check_size(file)
+                return _extract_docx(file)
+    except (ExtractionError, ExtractionInterrupted):
+        raise
     except Exception:
         logger.exception('Failed to parse uploaded file %s', file.name)
         raise
     raise ValueError('Only PDF and DOCX files are supported.')
 
 
-def chunk_text(text: str, chunk_size: int = 800, overlap: int = 120) -> List[str]:
-    chunks: List[str] = []
-    start = 0
-    while start < len(text):
-        end = min(start + chunk_size, len(text))
-        chunks.append(text[start:end])
-        if end == len(text):
-            break
-        start = max(0, end - overlap)
-    return chunks
-
-
-def index_resume(user_id: int, resume_id: int, text: str) -> None:
-    chunks = chunk_text(text)
+def index_resume(user_id: int, resume_id: int, text: str) -> Dict[str, int]:
+    chunks = chunk_document(text)
     metadata = [{'user_id': user_id, 'source': 'resume', 'resume_id': resume_id, 'idx': i} for i in range(len(chunks))]
     ids = [f'resume-{resume_id}-{i}' for i in range(len(chunks))]
-    upsert_documents(ids=ids, documents=chunks, metadatas=metadata)
+    return sync_documents(user_id, {'resume_id': resume_id}, ids, chunks, metadata)
+
+
+def deindex_resume(user_id: int, resume_id: int) -> None:
+    delete_documents(user_id, where={'resume_id': resume_id})
@@ -0,0 +1,37 @@
+import logging
+
+from django.utils import timezone
+
+from core.task_queue import task
+
+from .models import Resume
+from .extraction import ExtractionError
+from .services import extract_text_from_file, index_resume
+
+logger = logging.getLogger(__name__)
+
+
+def _mark_failed(resume_id: int) -> None:
+    Resume.objects.filter(id=resume_id).update(status=Resume.Status.FAILED, updated_at=timezone.now())
+
+
+@task('resumes.process_resume', on_failure=_mark_failed)
+def process_resume(resume_id: int) -> None:
+    resume = Resume.objects.filter(id=resume_id).first()
+    if resume is None:
+        logger.info('Resume %s was deleted before processing', resume_id)
+        return
+
+    Resume.objects.filter(id=resume.id).update(status=Resume.Status.EXTRACTING, updated_at=timezone.now())
+    try:
+        with resume.file.open('rb') as fh:
+            text = extract_text_from_file(fh)
+    except ExtractionError as exc:
+        # Corrupt, or over a size, page, time or memory limit: retrying would fail the same way.
+        logger.warning('Resume %s rejected: %s', resume.id, exc)
+        _mark_failed(resume.id)
+        return
+    Resume.objects.filter(id=resume.id).update(extracted_text=text, updated_at=timezone.now())
+
+    index_resume(resume.user_id, resume.id, text)
+    Resume.objects.filter(id=resume.id).update(status=Resume.Status.INDEXED, updated_at=timezone.now())
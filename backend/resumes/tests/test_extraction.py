@@ -0,0 +1,87 @@
+import io
+import tempfile
+import zipfile
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from benchmarks.synthetic_pdf import make_pdf
+from resumes import services
+from resumes.extraction import ExtractionError, ExtractionInterrupted
+from resumes.models import Resume
+from resumes.tasks import process_resume
+
+
+def _docx(parts):
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, 'w') as archive:
+        for name, content in parts.items():
+            archive.writestr(name, content)
+    return buffer.getvalue()
+
+
+@override_settings(RESUME_EXTRACTION_WORKERS=1)
+class ExtractTextTests(SimpleTestCase):
+    @classmethod
+    def tearDownClass(cls):
+        services._discard_pool()
+        super().tearDownClass()
+
+    def extract(self, name, data):
+        return services.extract_text_from_file(ContentFile(data, name=name))
+
+    def test_reads_pdf_pages(self):
+        text = self.extract('resume.pdf', make_pdf(3, seed=1))
+
+        self.assertGreater(len(text.split()), 10)
+
+    def test_corrupt_pdf_is_not_retried(self):
+        with self.assertRaisesMessage(ExtractionError, 'PDF could not be read'):
+            self.extract('resume.pdf', b'%PDF-1.4 garbage')
+
+    def test_pdf_over_page_limit(self):
+        with override_settings(RESUME_MAX_PAGES=2), self.assertRaisesMessage(ExtractionError, 'the limit is 2'):
+            self.extract('resume.pdf', make_pdf(3, seed=1))
+
+    def test_non_zip_docx_is_not_retried(self):
+        with self.assertRaisesMessage(ExtractionError, 'not a valid zip archive'):
+            self.extract('resume.docx', b'plain text, not a Word document')
+
+    def test_docx_without_document_body_is_not_retried(self):
+        with self.assertRaisesMessage(ExtractionError, 'no document body'):
+            self.extract('resume.docx', _docx({'readme.txt': 'hello'}))
+
+    def test_docx_over_uncompressed_limit(self):
+        data = _docx({'word/document.xml': ' ' * (2 * 1024 * 1024)})
+
+        with override_settings(RESUME_MAX_UNCOMPRESSED_MB=1), self.assertRaisesMessage(ExtractionError, 'expands'):
+            self.extract('resume.docx', data)
+
+    def test_interrupted_extraction_stays_retryable(self):
+        self.assertFalse(issubclass(ExtractionInterrupted, ExtractionError))
+
+
+@override_settings(RESUME_EXTRACTION_WORKERS=1)
+class ProcessResumeTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        override = override_settings(MEDIA_ROOT=media.name)
+        override.enable()
+        self.addCleanup(override.disable)
+        self.user = get_user_model().objects.create_user(email='resume@example.com', username='resume', password='x')
+
+    @classmethod
+    def tearDownClass(cls):
+        services._discard_pool()
+        super().tearDownClass()
+
+    def test_corrupt_upload_is_marked_failed_without_raising(self):
+        resume = Resume.objects.create(user=self.user, title='CV', file=ContentFile(b'%PDF-1.4 garbage', name='cv.pdf'))
+
+        process_resume(resume_id=resume.id)
+
+        resume.refresh_from_db()
+        self.assertEqual(resume.status, Resume.Status.FAILED)
+        self.assertEqual(resume.extracted_text, '')
@@ -1,9 +1,16 @@
-from rest_framework import permissions, viewsets
+import logging
+
+from rest_framework import permissions, response, status, viewsets
+from rest_framework.decorators import action
 
 from core.permissions import IsOwner
+from core.task_queue import enqueue
 
 from .models import Resume
 from .serializers import ResumeSerializer
+from .services import deindex_resume
+
+logger = logging.getLogger(__name__)
 
 
 class ResumeViewSet(viewsets.ModelViewSet):
@@ -15,3 +22,27 @@ class ResumeViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+
+    def perform_update(self, serializer):
+        if 'file' not in serializer.validated_data:
+            serializer.save()
+            return
+        # A new file is re-extracted; indexing then only touches the chunks that changed.
+        resume = serializer.save(status=Resume.Status.PENDING)
+        enqueue('resumes.process_resume', resume_id=resume.id)
+
+    def perform_destroy(self, instance):
+        user_id, resume_id = instance.user_id, instance.id
+        instance.delete()
+        try:
+            deindex_resume(user_id, resume_id)
+        except Exception:
+            logger.exception('Resume de-index failed for resume_id=%s user_id=%s', resume_id, user_id)
+
+    @action(detail=True, methods=['get'], url_path='status')
+    def processing_status(self, request, pk=None):
+        # Polled while a resume is processed; skips the full serializer and extracted text.
+        row = self.get_queryset().filter(pk=pk).values('id', 'status', 'updated_at').first()
+        if row is None:
+            return response.Response({'detail': 'Not found.'}, status=status.HTTP_404_NOT_FOUND)
+        return response.Response(row, status=status.HTTP_200_OK)
@@ -6,7 +6,16 @@ import { Sidebar } from '@/components/Sidebar'
 import { PageHeader } from '@/components/PageHeader'
 import { api } from '@/lib/api'
 
-type Resume = { id: number; title: string; created_at: string }
+type ResumeStatus = 'PENDING' | 'EXTRACTING' | 'INDEXED' | 'FAILED'
+type Resume = { id: number; title: string; status: ResumeStatus; created_at: string }
+
+const PROCESSING: ResumeStatus[] = ['PENDING', 'EXTRACTING']
+const STATUS_LABELS: Record<ResumeStatus, { label: string; color: string }> = {
+  PENDING: { label: 'Queued', color: '#64748B' },
+  EXTRACTING: { label: 'Processing...', color: '#D97706' },
+  INDEXED: { label: 'Ready', color: '#059669' },
+  FAILED: { label: 'Processing failed', color: '#DC2626' },
+}
 
 export default function ResumePage() {
   const [title, setTitle] = useState('')
@@ -27,6 +36,25 @@ export default function ResumePage() {
 
   useEffect(() => { load() }, [])
 
+  // Uploads are processed in the background; poll the lightweight status endpoint until they settle.
+  useEffect(() => {
+    const processing = resumes.filter((r) => PROCESSING.includes(r.status))
+    if (processing.length === 0) return
+
+    const timer = setInterval(async () => {
+      try {
+        const updates = await Promise.all(
+          processing.map((r) => api.get<{ id: number; status: ResumeStatus }>(`/api/resumes/${r.id}/status/`))
+        )
+        const byId = new Map(updates.map((u) => [u.data.id, u.data.status]))
+        setResumes((prev) => prev.map((r) => (byId.has(r.id) ? { ...r, status: byId.get(r.id)! } : r)))
+      } catch (err) {
+        console.error('Failed to poll resume status', err)
+      }
+    }, 2000)
+    return () => clearInterval(timer)
+  }, [resumes])
+
   const onSubmit = async (e: FormEvent) => {
     e.preventDefault()
     setError('')
@@ -121,6 +149,9 @@ export default function ResumePage() {
                   </div>
                   <p className="text-sm font-semibold truncate" style={{ color: '#0F172A' }}>{r.title}</p>
                   <p className="text-xs mt-1" style={{ color: '#94A3B8' }}>Uploaded {new Date(r.created_at).toLocaleDateString()}</p>
+                  {r.status && (
+                    <p className="text-xs mt-1 font-medium" style={{ color: STATUS_LABELS[r.status].color }}>{STATUS_LABELS[r.status].label}</p>
+                  )}
                 </div>
               ))}
             </div>